@@ -0,0 +1,19 @@
+"""
+Celery application for FREELINK.
+
+Configuration comes from Django settings with the ``CELERY_`` prefix.
+Payment tasks are routed to the ``payments`` queue so provider I/O can be
+scaled separately from web workers:
+
+    celery -A FREELINK_root worker -Q payments -l info
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'FREELINK_root.settings')
+
+app = Celery('FREELINK_root')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
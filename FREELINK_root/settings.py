@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -53,6 +56,7 @@ INSTALLED_APPS = [
     'drf_spectacular_sidecar',
     'django_filters',
     'payments',
+    'archive',
 ]
 
 MIDDLEWARE = [
@@ -200,3 +204,66 @@ LOGGING = {
 PAYSTACK_SECRET_KEY = "sk_test_66d7104381b1328c6db774c82e17db01c0b01f35"
 PAYSTACK_PUBLIC_KEY = "pk_test_dc1ea32617dae37270e4a5d4e9e49f1a228d4125"
 
+# Shared Paystack HTTP client (payments/services/client.py)
+# Point at a local stand-in with PAYSTACK_BASE_URL=http://127.0.0.1:8765 (see run_fake_paystack)
+PAYSTACK_BASE_URL = os.environ.get("PAYSTACK_BASE_URL", "https://api.paystack.co")
+PAYSTACK_CONNECT_TIMEOUT = 3.05  # seconds
+PAYSTACK_READ_TIMEOUT = 15  # seconds
+PAYSTACK_MAX_RETRIES = 2  # extra attempts for idempotent calls
+PAYSTACK_RETRY_BACKOFF = 0.25  # base seconds, doubled per attempt, full jitter
+PAYSTACK_POOL_SIZE = 20  # keep-alive connections per host
+PAYSTACK_VERIFY_LOCK_TIMEOUT = 30  # seconds one process may hold a reference's verification claim
+PAYSTACK_VERIFY_RESULT_TTL = 24 * 60 * 60  # seconds a failed/abandoned/reversed result is reused
+PAYSTACK_VERIFY_SUCCESS_TTL = 60  # seconds a success is reused (Paystack may still reverse it)
+
+# Circuit breaker around Paystack calls (payments/services/breaker.py)
+PAYSTACK_BREAKER_WINDOW = 30  # seconds of call outcomes considered
+PAYSTACK_BREAKER_MIN_CALLS = 10  # calls in the window before the breaker may open
+PAYSTACK_BREAKER_ERROR_RATE = 0.5  # share of failed calls (errors, timeouts, 429/5xx) that opens it
+PAYSTACK_BREAKER_SLOW_CALL_MS = 5000  # calls at least this slow count as slow
+PAYSTACK_BREAKER_SLOW_RATE = 0.5  # share of slow calls that opens it
+PAYSTACK_BREAKER_COOLDOWN = 15  # seconds open before a probe call is let through
+
+# Bank directory cache (payments/services/banks.py)
+BANK_DIRECTORY_TTL = 6 * 60 * 60  # seconds a fetched list is fresh
+BANK_DIRECTORY_STALE_TTL = 7 * 24 * 60 * 60  # seconds a stale list is still served while refreshing
+BANK_DIRECTORY_SNAPSHOT = True  # persist lists to the DB for cold starts
+
+
+# Celery (FREELINK_root/celery.py, payments/tasks.py)
+# With no CELERY_BROKER_URL set, tasks run inline (eager) so dev and tests need no worker.
+# With a broker, web processes poll results written by workers, so the result
+# backend must be shared (e.g. redis:// or db+postgresql://), never in-process.
+CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "memory://")
+CELERY_TASK_ALWAYS_EAGER = os.environ.get(
+    "CELERY_TASK_ALWAYS_EAGER", str("CELERY_BROKER_URL" not in os.environ)
+).lower() in ("1", "true", "yes")
+CELERY_RESULT_BACKEND = os.environ.get(
+    "CELERY_RESULT_BACKEND", "cache+memory://" if CELERY_TASK_ALWAYS_EAGER else None
+)
+if not CELERY_TASK_ALWAYS_EAGER and (
+    not CELERY_RESULT_BACKEND or CELERY_RESULT_BACKEND.startswith(("cache+memory", "rpc"))
+):
+    raise ImproperlyConfigured(
+        "CELERY_RESULT_BACKEND must be a shared result backend when tasks run on a broker."
+    )
+CELERY_TASK_STORE_EAGER_RESULT = True  # eager results can be polled like real ones
+CELERY_TASK_SERIALIZER = "json"
+CELERY_RESULT_SERIALIZER = "json"
+CELERY_ACCEPT_CONTENT = ["json"]
+CELERY_RESULT_EXPIRES = 24 * 60 * 60  # seconds a task result can be polled
+CELERY_TASK_ROUTES = {"payments.tasks.*": {"queue": "payments"}}
+
+
+# Number of recent ledger idempotency keys remembered per process
+WALLET_IDEMPOTENCY_CACHE_SIZE = 10000
+
+# Seconds a posting must be old before reconciliation checkpoints past it,
+# so postings still committing under a lower id are never skipped
+LEDGER_RECONCILE_LAG = 5 * 60
+
+# Cold storage for old transactions
+ARCHIVE_ROOT = BASE_DIR / "archive_segments"
+ARCHIVE_AFTER_DAYS = {
+    "wallet.transaction": 365,
+}
@@ -0,0 +1,190 @@
+"""Move old rows out of hot tables into compressed, date-partitioned segment files.
+
+For every archivable model, rows older than ``settings.ARCHIVE_AFTER_DAYS``
+are processed one day at a time: the day's rows are serialized (Django's JSON
+serializer format, one object per line) into a gzip segment file, then a single
+atomic block records the `ArchiveSegment`, bulk-creates the `ArchivedRecord`
+index entries and deletes the rows from the hot table.
+
+Reads stay transparent through `fetch()`, which rebuilds an (unsaved) model
+instance from its segment when the row is no longer in the database, and
+full rebuilds over a hot table fold in its archived rows via `archived_rows()`.
+Only models whose readers fall through to the archive belong in `ARCHIVABLE`.
+"""
+import gzip
+import json
+import os
+from datetime import datetime, time, timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core import serializers
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ArchivedRecord, ArchiveSegment
+
+
+def _ledger_checkpointed(queryset):
+    """Only archive postings already folded into a ledger reconciliation checkpoint."""
+    from wallet.models import LedgerCheckpoint
+
+    last = LedgerCheckpoint.objects.order_by("-last_transaction_id").first()
+    return queryset.filter(pk__lte=last.last_transaction_id if last else 0)
+
+
+# label -> how to select and key archivable rows
+ARCHIVABLE = {
+    "wallet.transaction": {
+        "date_field": "created_at",
+        "natural_key": "uuid",
+        "idempotency_key": "idempotency_key",
+        "filter": {"status__in": ["completed", "failed", "cancelled"]},
+        "guard": _ledger_checkpointed,
+    },
+}
+
+
+def archive_root():
+    return settings.ARCHIVE_ROOT
+
+
+def archive_model(label: str, *, older_than_days: int = None, batch_size: int = 1000) -> int:
+    """Archive rows of `label` older than `older_than_days`. Returns rows archived."""
+    config = ARCHIVABLE[label]
+    model = apps.get_model(label)
+    date_field = config["date_field"]
+    if older_than_days is None:
+        older_than_days = settings.ARCHIVE_AFTER_DAYS.get(label, 365)
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+
+    queryset = model.objects.filter(**{f"{date_field}__lt": cutoff}, **config.get("filter", {}))
+    if "guard" in config:
+        queryset = config["guard"](queryset)
+
+    archived = 0
+    for day in queryset.dates(date_field, "day"):
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        day_rows = queryset.filter(**{f"{date_field}__gte": start, f"{date_field}__lt": start + timedelta(days=1)})
+        archived += _archive_day(label, model, config, day, day_rows.order_by(date_field, "pk"), batch_size)
+    return archived
+
+
+def _archive_day(label, model, config, day, rows, batch_size):
+    """Write one segment for `rows` (a single day of `label`) and drop them from the hot table."""
+    relative = os.path.join(label, f"{day:%Y/%m/%d}", f"{timezone.now():%Y%m%dT%H%M%S%f}.jsonl.gz")
+    path = os.path.join(archive_root(), relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    natural_key = config.get("natural_key")
+    idempotency_key = config.get("idempotency_key")
+    records = []
+    with gzip.open(path + ".tmp", "wt", encoding="utf-8") as handle:
+        for line, obj in enumerate(rows.iterator(chunk_size=batch_size)):
+            handle.write(serializers.serialize("json", [obj])[1:-1] + "\n")
+            records.append(ArchivedRecord(
+                model=label,
+                object_pk=str(obj.pk),
+                natural_key=str(getattr(obj, natural_key)) if natural_key else None,
+                idempotency_key=getattr(obj, idempotency_key) if idempotency_key else None,
+                line=line,
+            ))
+    if not records:
+        os.remove(path + ".tmp")
+        return 0
+    os.replace(path + ".tmp", path)
+
+    try:
+        with transaction.atomic():
+            segment = ArchiveSegment.objects.create(model=label, day=day, path=relative, row_count=len(records))
+            for record in records:
+                record.segment = segment
+            ArchivedRecord.objects.bulk_create(records, batch_size=batch_size)
+            pks = [record.object_pk for record in records]
+            for offset in range(0, len(pks), batch_size):
+                model.objects.filter(pk__in=pks[offset:offset + batch_size]).delete()
+    except BaseException:
+        # Nothing points at the file once the block rolls back; don't leave it behind.
+        os.remove(path)
+        raise
+    return len(records)
+
+
+def read_segment(segment: ArchiveSegment):
+    """Yield the serialized objects (dicts) stored in `segment`, in line order."""
+    with gzip.open(os.path.join(archive_root(), segment.path), "rt", encoding="utf-8") as handle:
+        for line in handle:
+            yield json.loads(line)
+
+
+def archived_rows(label: str, *, day=None, start=None, end=None):
+    """Yield ``(pk, fields)`` for every archived row of `label`, day by day.
+
+    Only `day`'s segments are read if it is given, or those of the days in
+    ``[start, end]`` (either bound optional). `fields` is the serialized field
+    dict; datetimes come back parsed.
+    """
+    segments = ArchiveSegment.objects.filter(model=label).order_by("day", "pk")
+    if day is not None:
+        segments = segments.filter(day=day)
+    if start is not None:
+        segments = segments.filter(day__gte=start)
+    if end is not None:
+        segments = segments.filter(day__lte=end)
+    for segment in segments.iterator():
+        for data in read_segment(segment):
+            fields = data["fields"]
+            for name, value in fields.items():
+                if isinstance(value, str) and name.endswith("_at"):
+                    fields[name] = parse_datetime(value)
+            yield data["pk"], fields
+
+
+def archived_through(label: str):
+    """Latest day with archived rows of `label` (rows up to it may be in the archive), or None."""
+    return ArchiveSegment.objects.filter(model=label).order_by("-day").values_list("day", flat=True).first()
+
+
+def fetch(model, *, pk=None, natural_key=None, idempotency_key=None):
+    """Return the archived instance of `model` by pk, natural key or idempotency key, or None.
+
+    The instance is rebuilt with Django's deserializer and is not saved.
+    """
+    label = model._meta.label_lower
+    if pk is not None:
+        lookup = {"object_pk": str(pk)}
+    elif natural_key is not None:
+        lookup = {"natural_key": str(natural_key)}
+    else:
+        lookup = {"idempotency_key": idempotency_key}
+    record = ArchivedRecord.objects.select_related("segment").filter(model=label, **lookup).first()
+    if record is None:
+        return None
+    for line, data in enumerate(read_segment(record.segment)):
+        if line == record.line:
+            return next(serializers.deserialize("json", json.dumps([data]))).object
+    return None
+
+
+def get_with_archive(queryset, *, natural_key_field: str = None, **lookup):
+    """`queryset.get(**lookup)` that falls through to the archive for a missing row.
+
+    `lookup` must be a single pk (``pk=...``) or natural key (``<field>=...``
+    with `natural_key_field` naming that field). Raises ``DoesNotExist`` when
+    the row is in neither place. Other filters on `queryset` are not applied to
+    archived rows, so callers must re-check ownership on the result.
+    """
+    try:
+        return queryset.get(**lookup)
+    except queryset.model.DoesNotExist:
+        (field, value), = lookup.items()
+        if field == "pk":
+            obj = fetch(queryset.model, pk=value)
+        elif field == natural_key_field:
+            obj = fetch(queryset.model, natural_key=value)
+        else:
+            obj = None
+        if obj is None:
+            raise
+        return obj
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from archive.archiver import ARCHIVABLE, archive_model
+
+
+class Command(BaseCommand):
+    help = "Move old transactions into compressed archive segments."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", action="append", dest="models", help=f"Model label to archive (default: all of {', '.join(ARCHIVABLE)}).")
+        parser.add_argument("--older-than-days", type=int, help="Override settings.ARCHIVE_AFTER_DAYS for this run.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per fetch/insert/delete batch.")
+
+    def handle(self, *args, **options):
+        labels = options["models"] or list(ARCHIVABLE)
+        unknown = [label for label in labels if label not in ARCHIVABLE]
+        if unknown:
+            raise CommandError(f"Not archivable: {', '.join(unknown)}")
+
+        for label in labels:
+            archived = archive_model(label, older_than_days=options["older_than_days"], batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"{label}: archived {archived} rows."))
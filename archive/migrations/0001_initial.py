@@ -0,0 +1,45 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('day', models.DateField()),
+                ('path', models.CharField(max_length=255, unique=True)),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['model', 'day'],
+                'indexes': [models.Index(fields=['model', 'day'], name='archive_arc_model_9fba98_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('object_pk', models.CharField(max_length=64)),
+                ('natural_key', models.CharField(blank=True, max_length=128, null=True)),
+                ('line', models.PositiveIntegerField()),
+                ('segment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='records', to='archive.archivesegment')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model', 'natural_key'], name='archive_arc_model_47ff05_idx')],
+                'constraints': [models.UniqueConstraint(fields=('model', 'object_pk'), name='unique_archived_record')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('archive', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedrecord',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=128, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='archivedrecord',
+            index=models.Index(fields=['model', 'idempotency_key'], name='archive_idempotency_key_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import models
+
+
+class ArchiveSegment(models.Model):
+    """One compressed JSONL file holding a single day's archived rows of one model.
+
+    Files live under ``settings.ARCHIVE_ROOT`` at
+    ``<app_label.model>/<YYYY>/<MM>/<DD>/<run>.jsonl.gz``.
+    """
+
+    model = models.CharField(max_length=100)  # e.g. "wallet.transaction"
+    day = models.DateField()
+    path = models.CharField(max_length=255, unique=True)  # relative to ARCHIVE_ROOT
+    row_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["model", "day"]
+        indexes = [models.Index(fields=["model", "day"])]
+
+    def __str__(self):
+        return f"ArchiveSegment({self.model}, {self.day}, {self.row_count} rows)"
+
+
+class ArchivedRecord(models.Model):
+    """Compact index entry locating one archived row inside its segment file."""
+
+    segment = models.ForeignKey(ArchiveSegment, on_delete=models.CASCADE, related_name="records")
+    model = models.CharField(max_length=100)
+    object_pk = models.CharField(max_length=64)
+    natural_key = models.CharField(max_length=128, null=True, blank=True)  # e.g. Transaction.uuid
+    idempotency_key = models.CharField(max_length=128, null=True, blank=True)  # e.g. Transaction.idempotency_key
+    line = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["model", "object_pk"], name="unique_archived_record")]
+        indexes = [
+            models.Index(fields=["model", "natural_key"]),
+            models.Index(fields=["model", "idempotency_key"], name="archive_idempotency_key_idx"),
+        ]
+
+    def __str__(self):
+        return f"ArchivedRecord({self.model}#{self.object_pk})"
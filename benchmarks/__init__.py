@@ -0,0 +1 @@
+"""Load benchmarks for the Freelink backend (run as modules, e.g. ``python -m benchmarks.ledger_load``)."""
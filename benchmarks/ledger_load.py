@@ -0,0 +1,238 @@
+"""Concurrent ledger load benchmark for `TransactionManager`.
+
+Seeds N funded wallets and M escrow accounts in a throwaway database, then
+drives a mix of ``escrow_hold`` / ``escrow_release`` / ``payout`` postings from
+a thread pool or a process pool. Reports throughput, p50/p95/p99 latency,
+lock/deadlock retries, business rejections (insufficient funds) and the final
+balance invariants (ledger drift, negative balances) as JSON, so results can
+be diffed between releases.
+
+Usage::
+
+    BENCH_DB=sqlite python -m benchmarks.ledger_load --pool thread --workers 8 --ops 5000
+    BENCH_DB=postgres python -m benchmarks.ledger_load --pool process --workers 8 --output bench.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from decimal import Decimal
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+
+MIX = {"escrow_hold": 0.4, "escrow_release": 0.35, "payout": 0.25}
+INITIAL_DEPOSIT = Decimal("1000")
+
+
+def setup_django():
+    import django
+
+    django.setup()
+
+
+def reset_database():
+    """Drop the SQLite benchmark file (if any) and migrate a fresh schema."""
+    from django.conf import settings
+    from django.core.management import call_command
+
+    database = settings.DATABASES["default"]
+    if database["ENGINE"].endswith("sqlite3"):
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(f"{database['NAME']}{suffix}")
+            except FileNotFoundError:
+                pass
+        call_command("migrate", verbosity=0)
+    else:
+        call_command("migrate", verbosity=0)
+        call_command("flush", interactive=False, verbosity=0)
+
+
+def seed(wallets: int, escrows: int, shard_escrows: int) -> dict:
+    """Create funded wallets and escrows; return their ids."""
+    from django.contrib.auth import get_user_model
+
+    from wallet.balances import enable_sharding
+    from wallet.models import EscrowAccount, Transaction, Wallet
+
+    User = get_user_model()
+    users = User.objects.bulk_create([
+        User(email=f"bench{i}@example.com", phone=f"+2330{i:08d}", full_name=f"Bench {i}", password="!")
+        for i in range(wallets)
+    ])
+    wallet_rows = Wallet.objects.bulk_create([Wallet(user=user) for user in users])
+    Transaction.objects.post_batch([
+        {"wallet": wallet, "amount": INITIAL_DEPOSIT, "type": "deposit"} for wallet in wallet_rows
+    ])
+    escrow_rows = EscrowAccount.objects.bulk_create([EscrowAccount(reference=f"bench-{i}") for i in range(escrows)])
+    if shard_escrows:
+        for escrow in escrow_rows:
+            enable_sharding(escrow, shard_escrows)
+    return {"wallets": [w.pk for w in wallet_rows], "escrows": [e.pk for e in escrow_rows]}
+
+
+def generate_ops(ids: dict, count: int, rng: random.Random) -> list:
+    """Pre-generate (type, wallet_id, escrow_id, amount) postings."""
+    types, weights = zip(*MIX.items())
+    return [
+        (
+            rng.choices(types, weights)[0],
+            rng.choice(ids["wallets"]),
+            rng.choice(ids["escrows"]),
+            Decimal(rng.randint(1, 20)),
+        )
+        for _ in range(count)
+    ]
+
+
+def _retryable(exc) -> str:
+    """Classify lock contention errors worth retrying ("deadlock", "lock") or ""."""
+    from django.db import OperationalError
+
+    if not isinstance(exc, OperationalError):
+        return ""
+    text = str(exc).lower()
+    if "deadlock" in text:
+        return "deadlock"
+    if "locked" in text or "could not serialize" in text or "lock timeout" in text:
+        return "lock"
+    return ""
+
+
+def run_ops(ops: list, shard_escrows: int, max_retries: int) -> dict:
+    """Execute `ops` sequentially on this worker; return latencies and counters."""
+    from django.db import connections
+
+    from wallet.balances import InsufficientFunds
+    from wallet.models import EscrowAccount, Transaction, Wallet
+
+    latencies, counters = [], Counter()
+    try:
+        for type, wallet_id, escrow_id, amount in ops:
+            wallet = Wallet(pk=wallet_id)
+            escrow = EscrowAccount(pk=escrow_id, shard_count=shard_escrows)
+            started = time.perf_counter()
+            for attempt in range(max_retries + 1):
+                try:
+                    if type == "payout":
+                        Transaction.objects.create_transaction(wallet=wallet, amount=amount, type=type)
+                    else:
+                        Transaction.objects.create_transaction(wallet=wallet, escrow=escrow, amount=amount, type=type)
+                    counters[f"ok_{type}"] += 1
+                    break
+                except InsufficientFunds:
+                    counters["insufficient_funds"] += 1
+                    break
+                except Exception as exc:
+                    kind = _retryable(exc)
+                    if not kind or attempt == max_retries:
+                        counters["failed"] += 1
+                        break
+                    counters[f"{kind}_retries"] += 1
+                    time.sleep(random.uniform(0, 0.005 * (attempt + 1)))
+            latencies.append((time.perf_counter() - started) * 1000)
+    finally:
+        connections.close_all()
+    return {"latencies": latencies, "counters": dict(counters)}
+
+
+def check_invariants() -> dict:
+    """Rebuild ledger totals and count drifted or negative accounts."""
+    from django.db.models import Q
+
+    from wallet.models import EscrowAccount, Wallet
+    from wallet.reconciliation import find_drift, reconcile
+
+    reconcile(full=True)
+    return {
+        "drifted_accounts": sum(1 for _ in find_drift()),
+        "negative_wallets": Wallet.objects.filter(Q(balance__lt=0) | Q(available_balance__lt=0)).count(),
+        "negative_escrows": EscrowAccount.objects.filter(balance__lt=0).count(),
+    }
+
+
+def percentiles(latencies: list) -> dict:
+    if len(latencies) < 2:
+        value = round(latencies[0], 3) if latencies else None
+        return {"p50": value, "p95": value, "p99": value, "max": value}
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "p50": round(cuts[49], 3),
+        "p95": round(cuts[94], 3),
+        "p99": round(cuts[98], 3),
+        "max": round(max(latencies), 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pool", choices=["thread", "process"], default="thread")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--wallets", type=int, default=200)
+    parser.add_argument("--escrows", type=int, default=50)
+    parser.add_argument("--ops", type=int, default=5000)
+    parser.add_argument("--shard-escrows", type=int, default=0, help="Enable N balance shards on every escrow.")
+    parser.add_argument("--max-retries", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connections
+
+    reset_database()
+    ids = seed(args.wallets, args.escrows, args.shard_escrows)
+    ops = generate_ops(ids, args.ops, random.Random(args.seed))
+    connections.close_all()
+
+    shares = [ops[i::args.workers] for i in range(args.workers)]
+    if args.pool == "process":
+        executor = ProcessPoolExecutor(args.workers, mp_context=multiprocessing.get_context("spawn"), initializer=setup_django)
+    else:
+        executor = ThreadPoolExecutor(args.workers)
+
+    started = time.perf_counter()
+    with executor:
+        results = list(executor.map(run_ops, shares, [args.shard_escrows] * args.workers, [args.max_retries] * args.workers))
+    elapsed = time.perf_counter() - started
+
+    latencies = [value for result in results for value in result["latencies"]]
+    counters = Counter()
+    for result in results:
+        counters.update(result["counters"])
+
+    report = {
+        "benchmark": "ledger_load",
+        "backend": settings.DATABASES["default"]["ENGINE"].rsplit(".", 1)[-1],
+        "pool": args.pool,
+        "workers": args.workers,
+        "wallets": args.wallets,
+        "escrows": args.escrows,
+        "shard_escrows": args.shard_escrows,
+        "ops": args.ops,
+        "duration_s": round(elapsed, 3),
+        "throughput_ops_s": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "latency_ms": percentiles(latencies),
+        "counters": dict(sorted(counters.items())),
+        "invariants": check_invariants(),
+        "python": platform.python_version(),
+    }
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(output + "\n")
+    else:
+        sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
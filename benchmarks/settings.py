@@ -0,0 +1,39 @@
+"""Settings for benchmark runs: project settings with a throwaway database.
+
+Select the backend with ``BENCH_DB=sqlite`` (default, WAL mode) or
+``BENCH_DB=postgres`` (configured via ``BENCH_PG_NAME``, ``BENCH_PG_USER``,
+``BENCH_PG_PASSWORD``, ``BENCH_PG_HOST`` and ``BENCH_PG_PORT``).
+"""
+import os
+import tempfile
+
+from FREELINK_root.settings import *  # noqa: F401,F403
+
+BENCH_DB = os.environ.get("BENCH_DB", "sqlite")
+
+if BENCH_DB == "postgres":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("BENCH_PG_NAME", "freelink_bench"),
+            "USER": os.environ.get("BENCH_PG_USER", "postgres"),
+            "PASSWORD": os.environ.get("BENCH_PG_PASSWORD", ""),
+            "HOST": os.environ.get("BENCH_PG_HOST", "127.0.0.1"),
+            "PORT": os.environ.get("BENCH_PG_PORT", "5432"),
+        }
+    }
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("BENCH_SQLITE_PATH", os.path.join(tempfile.gettempdir(), "freelink-bench.sqlite3")),
+            "OPTIONS": {
+                "init_command": "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;",
+                "transaction_mode": "IMMEDIATE",
+                "timeout": 30,
+            },
+        }
+    }
+
+LOGGING = {"version": 1, "disable_existing_loggers": False}
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
@@ -44,7 +44,7 @@ class Dashboard(models.Model):
     """def update_metrics(self):
         metrics = {}
         if hasattr(self.user, 'wallet'):
-            metrics['balance'] = float(self.user.wallet.balance)
+            metrics['balance'] = float(self.user.wallet.total_balances()['balance'])
         if self.user.is_client:
             metrics['total_spent'] = float(Transaction.objects.filter(client=self.user, status='COMPLETED').aggregate(total=models.Sum('amount'))['total'] or 0)
             metrics['pending_transactions'] = Transaction.objects.filter(client=self.user, status='PENDING').count()
@@ -0,0 +1,93 @@
+import django_filters
+from django.db.models import Case, CharField, Count, F, Q, Value, When
+
+from .models import Job, Skill
+
+# Budget facet buckets: (label, lower bound inclusive, upper bound exclusive).
+BUDGET_BUCKETS = (
+    ("0-50", 0, 50),
+    ("50-100", 50, 100),
+    ("100-500", 100, 500),
+    ("500-1000", 500, 1000),
+    ("1000+", 1000, None),
+)
+
+
+class JobFilter(django_filters.FilterSet):
+    """
+    Filters for the job board.
+
+    - ?status=available&status=pending
+    - ?budget_min= / ?budget_max=, ?duration_min= / ?duration_max= (days)
+    - ?deadline_after= / ?deadline_before= (ISO datetimes)
+    - ?skills=python,django: jobs needing any of the named skills
+    """
+    status = django_filters.MultipleChoiceFilter(choices=Job.JOB_STATUS, distinct=False)
+    budget_min = django_filters.NumberFilter(field_name="budget", lookup_expr="gte")
+    budget_max = django_filters.NumberFilter(field_name="budget", lookup_expr="lte")
+    duration_min = django_filters.NumberFilter(field_name="duration", lookup_expr="gte")
+    duration_max = django_filters.NumberFilter(field_name="duration", lookup_expr="lte")
+    deadline_after = django_filters.IsoDateTimeFilter(field_name="deadline", lookup_expr="gte")
+    deadline_before = django_filters.IsoDateTimeFilter(field_name="deadline", lookup_expr="lte")
+    skills = django_filters.CharFilter(method="filter_skills")
+
+    class Meta:
+        model = Job
+        fields = ["status"]
+
+    def filter_skills(self, queryset, name, value):
+        names = [skill.strip() for skill in value.split(",") if skill.strip()]
+        if not names:
+            return queryset
+        matching = Q()
+        for skill in names:
+            matching |= Q(name__iexact=skill)
+        # A subquery rather than a join, so a job with several matching skills is listed once.
+        job_ids = Job.skills_required.through.objects.filter(
+            skill__in=Skill.objects.filter(matching)
+        ).values("job_id")
+        return queryset.filter(pk__in=job_ids)
+
+
+def budget_bucket():
+    """CASE expression labelling a job's budget with its `BUDGET_BUCKETS` entry."""
+    whens = []
+    for label, low, high in BUDGET_BUCKETS:
+        bounds = Q(budget__gte=low) if high is None else Q(budget__gte=low, budget__lt=high)
+        whens.append(When(bounds, then=Value(label)))
+    return Case(*whens, default=Value(""), output_field=CharField())
+
+
+def job_facets(jobs) -> dict:
+    """Facet counts for the `jobs` queryset: jobs per status, budget bucket and skill.
+
+    All three come back from one query: a grouped count per facet, joined
+    with UNION ALL.
+    """
+    jobs = jobs.order_by()
+    job_ids = jobs.values("pk")
+
+    by_status = (
+        jobs.values(key=F("status"))
+        .annotate(facet=Value("status", output_field=CharField()), count=Count("pk"))
+        .values_list("facet", "key", "count")
+    )
+    by_budget = (
+        jobs.annotate(key=budget_bucket())
+        .values("key")
+        .annotate(facet=Value("budget", output_field=CharField()), count=Count("pk"))
+        .values_list("facet", "key", "count")
+    )
+    by_skill = (
+        Job.skills_required.through.objects.filter(job_id__in=job_ids)
+        .order_by()
+        .values(key=F("skill__name"))
+        .annotate(facet=Value("skills", output_field=CharField()), count=Count("job_id"))
+        .values_list("facet", "key", "count")
+    )
+
+    facets = {"status": {}, "budget": {label: 0 for label, _, _ in BUDGET_BUCKETS}, "skills": {}}
+    for facet, key, count in by_status.union(by_budget, by_skill, all=True):
+        facets[facet][key] = count
+    facets["total"] = sum(facets["status"].values())
+    return facets
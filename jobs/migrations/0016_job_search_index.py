@@ -0,0 +1,64 @@
+from django.db import migrations
+
+# Search table for jobs.search: FTS5 on SQLite, tsvector + GIN on PostgreSQL.
+# Other databases get no table and jobs.search falls back to icontains.
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE jobs_job_fts USING fts5(
+        title, skills, description, tokenize = 'porter unicode61'
+    )
+    """,
+    """
+    INSERT INTO jobs_job_fts (rowid, title, skills, description)
+    SELECT j.id, j.title,
+           COALESCE((SELECT group_concat(s.name, ' ')
+                     FROM jobs_job_skills_required js JOIN jobs_skill s ON s.id = js.skill_id
+                     WHERE js.job_id = j.id), ''),
+           j.description
+    FROM jobs_job j
+    """,
+]
+
+POSTGRES_FORWARD = [
+    """
+    CREATE TABLE jobs_job_fts (
+        job_id bigint PRIMARY KEY REFERENCES jobs_job (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        document tsvector NOT NULL
+    )
+    """,
+    "CREATE INDEX jobs_job_fts_document_gin ON jobs_job_fts USING GIN (document)",
+    """
+    INSERT INTO jobs_job_fts (job_id, document)
+    SELECT j.id,
+           setweight(to_tsvector('english', j.title), 'A')
+           || setweight(to_tsvector('english', COALESCE(
+                  (SELECT string_agg(s.name, ' ')
+                   FROM jobs_job_skills_required js JOIN jobs_skill s ON s.id = js.skill_id
+                   WHERE js.job_id = j.id), '')), 'B')
+           || setweight(to_tsvector('english', j.description), 'C')
+    FROM jobs_job j
+    """,
+]
+
+
+def create_search_table(apps, schema_editor):
+    statements = {"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}.get(schema_editor.connection.vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor in ("sqlite", "postgresql"):
+        schema_editor.execute("DROP TABLE IF EXISTS jobs_job_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0015_remove_skill_approved'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -38,6 +38,11 @@ class Job(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Board browsing: filter by status, newest first / within a budget range.
+            models.Index(fields=['status', '-created_at'], name='job_status_created_idx'),
+            models.Index(fields=['status', 'budget'], name='job_status_budget_idx'),
+        ]
 
     def __str__(self):
         return self.title
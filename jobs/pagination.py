@@ -0,0 +1,9 @@
+from rest_framework.pagination import PageNumberPagination
+
+
+class JobSearchPagination(PageNumberPagination):
+    """Numbered pages of ranked search results; `?page_size=` up to 100."""
+
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "page_size"
@@ -0,0 +1,158 @@
+"""Full-text search over jobs.
+
+Each job's title, skill names and description are kept in the
+``jobs_job_fts`` table (created by migration 0016), which is
+
+- an FTS5 virtual table (rowid = job id) on SQLite, ranked with ``bm25``;
+- a ``(job_id, document tsvector)`` table with a GIN index on PostgreSQL,
+  ranked with ``ts_rank_cd``.
+
+Titles weigh most, then skills, then the description. The signals in
+`jobs.signals` call `index_job` / `unindex_job` whenever a job or its skills
+change. Other databases fall back to ``icontains`` matching, newest first.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Job
+
+SEARCH_TABLE = "jobs_job_fts"
+
+# Relative weights of title, skills and description in the bm25 rank (SQLite).
+BM25_WEIGHTS = (10.0, 5.0, 1.0)
+
+
+def supports_full_text() -> bool:
+    return connection.vendor in ("sqlite", "postgresql")
+
+
+def search_terms(query: str) -> list:
+    """Words of `query`, lowercased; punctuation and search syntax are dropped."""
+    return re.findall(r"\w+", query.lower())
+
+
+def _match_expression(terms):
+    """Every term must match, the last one as a prefix (search-as-you-type)."""
+    if connection.vendor == "postgresql":
+        return " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+    return " ".join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+
+
+def index_job(job_id):
+    """(Re)build the search row for `job_id` from its current title, description and skills."""
+    if not supports_full_text():
+        return
+    job = Job.objects.filter(pk=job_id).values("title", "description").first()
+    if job is None:
+        return unindex_job(job_id)
+    skills = " ".join(Job.skills_required.through.objects.filter(job_id=job_id).values_list("skill__name", flat=True))
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                f"""
+                INSERT INTO {SEARCH_TABLE} (job_id, document)
+                VALUES (%s, setweight(to_tsvector('english', %s), 'A')
+                         || setweight(to_tsvector('english', %s), 'B')
+                         || setweight(to_tsvector('english', %s), 'C'))
+                ON CONFLICT (job_id) DO UPDATE SET document = EXCLUDED.document
+                """,
+                [job_id, job["title"], skills, job["description"]],
+            )
+        else:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [job_id])
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, title, skills, description) VALUES (%s, %s, %s, %s)",
+                [job_id, job["title"], skills, job["description"]],
+            )
+
+
+def unindex_job(job_id):
+    if not supports_full_text():
+        return
+    column = "job_id" if connection.vendor == "postgresql" else "rowid"
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE {column} = %s", [job_id])
+
+
+class SearchResults:
+    """Ranked jobs matching a query, sliced lazily so pagination runs LIMIT/OFFSET in SQL.
+
+    Works as the ``object_list`` of Django's `Paginator`: ``count()`` and
+    slicing each run one query against the search table, and the page's jobs
+    are then loaded in one more query (plus prefetches), with ``.rank`` set.
+    """
+
+    def __init__(self, query, *, status=None):
+        self.terms = search_terms(query)
+        self.status = status
+
+    def _sql(self, select, tail=""):
+        params = [_match_expression(self.terms)]
+        if connection.vendor == "postgresql":
+            sql = (f"SELECT {select} FROM {SEARCH_TABLE} f JOIN jobs_job j ON j.id = f.job_id, "
+                   f"to_tsquery('english', %s) q WHERE f.document @@ q")
+        else:
+            sql = (f"SELECT {select} FROM {SEARCH_TABLE} JOIN jobs_job j ON j.id = {SEARCH_TABLE}.rowid "
+                   f"WHERE {SEARCH_TABLE} MATCH %s")
+        if self.status:
+            sql += " AND j.status = %s"
+            params.append(self.status)
+        return sql + tail, params
+
+    def _fallback(self):
+        jobs = Job.objects.all()
+        for term in self.terms:
+            jobs = jobs.filter(
+                Q(title__icontains=term) | Q(description__icontains=term) | Q(skills_required__name__icontains=term)
+            )
+        if self.status:
+            jobs = jobs.filter(status=self.status)
+        return jobs.distinct().order_by("-created_at")
+
+    def count(self):
+        if not self.terms:
+            return 0
+        if not supports_full_text():
+            return self._fallback().count()
+        sql, params = self._sql("COUNT(*)")
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        if not self.terms:
+            return []
+        if not supports_full_text():
+            return list(self._fallback()[start:stop])
+
+        if connection.vendor == "postgresql":
+            rank, no_limit = "ts_rank_cd(f.document, q)", None
+        else:
+            # bm25() is lower-is-better; negate it so a higher rank is a better match everywhere.
+            rank, no_limit = f"-bm25({SEARCH_TABLE}, {', '.join(map(str, BM25_WEIGHTS))})", -1
+        sql, params = self._sql(f"j.id, {rank} AS rank", " ORDER BY rank DESC, j.created_at DESC LIMIT %s OFFSET %s")
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + [stop - start if stop is not None else no_limit, start])
+            ranked = cursor.fetchall()
+
+        jobs = (
+            Job.objects.filter(pk__in=[pk for pk, _ in ranked])
+            .select_related("client", "freelancer")
+            .prefetch_related("skills_required")
+            .in_bulk()
+        )
+        results = []
+        for pk, score in ranked:
+            if pk in jobs:
+                jobs[pk].rank = score
+                results.append(jobs[pk])
+        return results
@@ -1,3 +1,4 @@
+from django.db.models import F
 from rest_framework import serializers
 from .models import Job, Skill
 
@@ -46,6 +47,45 @@ class JobDetailSerializer(JobSerializer):
         fields = JobSerializer.Meta.fields
 
 
+class JobSearchSerializer(JobDetailSerializer):
+    """Job search hit; `rank` is the relevance score (higher is better)."""
+    rank = serializers.FloatField(read_only=True, default=None)
+
+    class Meta(JobDetailSerializer.Meta):
+        fields = JobDetailSerializer.Meta.fields
+
+
+class JobCardSerializer(serializers.Serializer):
+    """Slim job card for board listings, built from `job_cards` rows rather than model instances."""
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    budget = serializers.DecimalField(max_digits=10, decimal_places=2)
+    status = serializers.CharField()
+    skills = serializers.ListField(child=serializers.CharField())
+    client_name = serializers.CharField()
+
+
+def job_cards(jobs):
+    """
+    `JobCardSerializer` rows for the `jobs` queryset in two queries: one
+    ``values()`` projection of the job and client columns, and one for the
+    skill names of those jobs.
+    """
+    rows = list(jobs.values("id", "title", "budget", "status", client_name=F("client__full_name")))
+    skills = {row["id"]: [] for row in rows}
+    links = (
+        Job.skills_required.through.objects.filter(job_id__in=jobs.order_by().values("pk"))
+        .order_by("skill__name")
+        .values_list("job_id", "skill__name")
+    )
+    for job_id, name in links:
+        if job_id in skills:
+            skills[job_id].append(name)
+    for row in rows:
+        row["skills"] = skills[row["id"]]
+    return rows
+
+
 class JobStatusSerializer(serializers.ModelSerializer):
     """
     Separate serializer for updating only the job status.
@@ -0,0 +1,52 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Job, Skill
+from .search import index_job, unindex_job
+
+
+@receiver(post_save, sender=Job)
+def index_saved_job(sender, instance, **kwargs):
+    index_job(instance.pk)
+
+
+@receiver(post_delete, sender=Job)
+def unindex_deleted_job(sender, instance, **kwargs):
+    unindex_job(instance.pk)
+
+
+@receiver(m2m_changed, sender=Job.skills_required.through)
+def index_job_skills(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == "pre_clear":
+        # After the clear neither pk_set nor instance.jobs says which jobs lost the skill.
+        instance._search_job_ids = list(instance.jobs.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        index_job(instance.pk)
+        return
+    # Changed from the skill side: every affected job needs its row rebuilt.
+    job_ids = pk_set if action != "post_clear" else instance.__dict__.pop("_search_job_ids", [])
+    for job_id in job_ids:
+        index_job(job_id)
+
+
+@receiver(post_save, sender=Skill)
+def index_renamed_skill(sender, instance, created, **kwargs):
+    if created:
+        return
+    for job_id in instance.jobs.values_list("pk", flat=True):
+        index_job(job_id)
+
+
+@receiver(pre_delete, sender=Skill)
+def remember_deleted_skill_jobs(sender, instance, **kwargs):
+    # The cascade removes the job links without an m2m_changed signal.
+    instance._search_job_ids = list(instance.jobs.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Skill)
+def index_deleted_skill(sender, instance, **kwargs):
+    for job_id in instance.__dict__.pop("_search_job_ids", []):
+        index_job(job_id)
@@ -1,3 +1,55 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from .models import Job, Skill
+
+
+class JobListQueryCountTests(APITestCase):
+    """The job list must cost the same number of queries however many jobs it returns."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.client_user = User.objects.create_user(
+            email="client@example.com", password="pass1234", full_name="Client", phone="0200000001", is_client=True
+        )
+        cls.freelancer = User.objects.create_user(
+            email="freelancer@example.com", password="pass1234", full_name="Freelancer", phone="0200000002",
+            is_freelancer=True,
+        )
+        cls.skills = [Skill.objects.create(name=name) for name in ("python", "django", "design")]
+
+    def setUp(self):
+        self.client.force_authenticate(self.client_user)
+
+    def make_jobs(self, count):
+        for i in range(count):
+            job = Job.objects.create(
+                client=self.client_user, freelancer=self.freelancer, title=f"Job {i}", description="Work", budget=100 + i
+            )
+            job.skills_required.set(self.skills[: i % 3 + 1])
+
+    def test_list_queries_do_not_grow_with_jobs(self):
+        self.make_jobs(3)
+        # Jobs with client and freelancer joined, then one prefetch for skills.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("job-list-create"))
+        self.assertEqual(len(response.data), 3)
+
+        self.make_jobs(20)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("job-list-create"))
+        self.assertEqual(len(response.data), 23)
+        self.assertEqual(response.data[0]["client"], str(self.client_user))
+
+    def test_card_view_queries_do_not_grow_with_jobs(self):
+        self.make_jobs(20)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("job-list-create"), {"view": "card"})
+
+        self.assertEqual(len(response.data), 20)
+        card = next(card for card in response.data if card["title"] == "Job 2")
+        self.assertEqual(card["client_name"], "Client")
+        self.assertEqual(card["skills"], ["design", "django", "python"])
+        self.assertEqual(set(card), {"id", "title", "budget", "status", "skills", "client_name"})
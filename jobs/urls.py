@@ -7,6 +7,8 @@ router.register(r'skills', views.SkillViewSet, basename='skill')
 
 urlpatterns = [
     path('', views.JobListCreateView.as_view(), name='job-list-create'),
+    path('search/', views.JobSearchView.as_view(), name='job-search'),
+    path('facets/', views.JobFacetsView.as_view(), name='job-facets'),
     path('<int:pk>/', views.JobRetrieveUpdateDestroyView.as_view(), name='job-detail'),
     path('<int:pk>/status/', views.JobUpdateStatusView.as_view(), name='job-update-status'),
 
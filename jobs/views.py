@@ -1,6 +1,18 @@
-from rest_framework import generics, permissions, viewsets
+from rest_framework import generics, permissions, status, viewsets
+from rest_framework.response import Response
+from .filters import JobFilter, job_facets
 from .models import Job, Skill
-from .serializers import JobSerializer, JobDetailSerializer, JobStatusSerializer, SkillSerializer
+from .pagination import JobSearchPagination
+from .search import SearchResults
+from .serializers import (
+    JobCardSerializer,
+    JobDetailSerializer,
+    JobSearchSerializer,
+    JobSerializer,
+    JobStatusSerializer,
+    SkillSerializer,
+    job_cards,
+)
 
 
 class IsClientUser(permissions.BasePermission):
@@ -24,18 +36,37 @@ class IsJobOwner(permissions.BasePermission):
 class JobListCreateView(generics.ListCreateAPIView):
     """
     API endpoint:
-    - GET: List all jobs.
+    - GET: List all jobs, filtered by `JobFilter` (status, budget, duration, deadline, skills).
+      ?view=card returns slim cards (id, title, budget, status, skills, client_name).
     - POST: Create a new job (only allowed for clients).
     """
     queryset = Job.objects.all()
     permission_classes = [permissions.IsAuthenticated]
+    filterset_class = JobFilter
+
+    def get_queryset(self):
+        jobs = super().get_queryset()
+        if self.request.method == 'GET':
+            # Client, freelancer and skills are serialized for every job: load them up front.
+            jobs = jobs.select_related('client', 'freelancer').prefetch_related('skills_required')
+        return jobs
 
     def get_serializer_class(self):
         # Use JobSerializer for creation, JobDetailSerializer for listing
         if self.request.method == 'POST':
             return JobSerializer
+        if self.request.query_params.get('view') == 'card':
+            return JobCardSerializer
         return JobDetailSerializer
 
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('view') != 'card':
+            return super().list(request, *args, **kwargs)
+        # Cards skip model instances entirely: values() rows plus one skills query.
+        jobs = self.filter_queryset(super().get_queryset())
+        serializer = self.get_serializer(job_cards(jobs), many=True)
+        return Response(serializer.data)
+
     def get_permissions(self):
         if self.request.method == 'POST':
             self.permission_classes = [permissions.IsAuthenticated, IsClientUser]
@@ -46,6 +77,43 @@ class JobListCreateView(generics.ListCreateAPIView):
         serializer.save(client=self.request.user)
 
 
+class JobFacetsView(generics.GenericAPIView):
+    """
+    API endpoint for job board facet counts.
+
+    - GET: takes the same filters as the job list and returns, for the matching
+      jobs, counts per status, budget bucket and skill, plus the total.
+    """
+    queryset = Job.objects.all()
+    permission_classes = [permissions.IsAuthenticated]
+    filterset_class = JobFilter
+
+    def get(self, request):
+        return Response(job_facets(self.filter_queryset(self.get_queryset())), status=status.HTTP_200_OK)
+
+
+class JobSearchView(generics.ListAPIView):
+    """
+    API endpoint for full-text job search.
+
+    - GET: ?q=<words> ranks jobs by how well their title, skills and description
+      match (every word must match; the last one may be a prefix).
+    - Optional ?status=<job status>; paginated with ?page= and ?page_size=.
+    """
+    serializer_class = JobSearchSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = JobSearchPagination
+    filter_backends = []
+
+    def get_queryset(self):
+        return SearchResults(self.request.query_params.get("q", ""), status=self.request.query_params.get("status"))
+
+    def list(self, request, *args, **kwargs):
+        if not request.query_params.get("q", "").strip():
+            return Response({"error": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+        return super().list(request, *args, **kwargs)
+
+
 class JobRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint for retrieving, updating, or deleting a job.
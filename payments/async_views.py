@@ -0,0 +1,141 @@
+"""Async payment views for the ASGI entry point (``FREELINK_root/asgi.py``).
+
+DRF's `APIView` is sync-only, so these are plain async Django views. They
+still authenticate with the configured DRF authentication classes (run in a
+worker thread) and answer with the same payloads as their sync counterparts
+in `payments.views`, but the Paystack round trip no longer holds a thread.
+"""
+import math
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .serializers import DepositSerializer
+from .services.async_paystack import ainitialize_payment, averify_many, averify_payment
+from .services.banks import BankDirectoryUnavailable, get_bank_directory
+from .services.breaker import CircuitOpen
+
+# Most references accepted by one verify-many call.
+MAX_VERIFY_REFERENCES = 100
+
+
+class AsyncAPIView(View):
+    """Async view that authenticates through DRF and exposes the DRF request as ``self.api``."""
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Like DRF, CSRF is enforced by SessionAuthentication rather than the middleware.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.api = Request(
+            request,
+            parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES],
+            authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+        )
+        try:
+            user = await sync_to_async(lambda: self.api.user)()
+        except exceptions.APIException as exc:
+            return JsonResponse({"error": str(exc.detail)}, status=exc.status_code)
+        if not user or not user.is_authenticated:
+            return JsonResponse({"error": "Authentication credentials were not provided."},
+                                status=status.HTTP_401_UNAUTHORIZED)
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except CircuitOpen as exc:
+            response = JsonResponse({"error": "Payment provider unavailable, please retry later"},
+                                    status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response["Retry-After"] = str(math.ceil(exc.retry_after))
+            return response
+
+    async def data(self):
+        """Parsed request body (JSON, form or multipart) via DRF's parsers."""
+        try:
+            return await sync_to_async(lambda: self.api.data)()
+        except (exceptions.ParseError, exceptions.UnsupportedMediaType) as exc:
+            raise ValueError(str(exc.detail))
+
+
+class AsyncInitPaymentView(AsyncAPIView):
+    """
+    Async `InitPaymentView`.
+
+    POST:
+    - Body: { "amount": <amount> }
+    """
+    async def post(self, request):
+        try:
+            data = await self.data()
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = DepositSerializer(data=data)
+        if not serializer.is_valid():
+            return JsonResponse({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        res = await ainitialize_payment(self.api.user, str(serializer.validated_data["amount"]))
+
+        return JsonResponse(res, status=status.HTTP_200_OK if res.get("status") else status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncVerifyPaymentView(AsyncAPIView):
+    """
+    Async `VerifyPaymentView`.
+
+    GET:
+    - Query: ?reference=<transaction_reference>
+    """
+    async def get(self, request):
+        reference = request.GET.get("reference")
+        result = await averify_payment(reference)
+
+        if "error" in result:
+            return JsonResponse({"error": result["error"]}, status=result["status_code"])
+        return JsonResponse(result["response"], status=result["status_code"])
+
+
+class AsyncVerifyManyPaymentsView(AsyncAPIView):
+    """
+    Verify several Paystack payments concurrently.
+
+    POST:
+    - Body: { "references": [<reference>, ...] }
+    - Returns { <reference>: { "status_code": ..., "response" | "error": ... } }.
+    """
+    async def post(self, request):
+        try:
+            data = await self.data()
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        references = data.get("references")
+        if not isinstance(references, list) or not references:
+            return JsonResponse({"error": "references must be a non-empty list"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(references) > MAX_VERIFY_REFERENCES:
+            return JsonResponse({"error": f"At most {MAX_VERIFY_REFERENCES} references per request"},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        results = await averify_many([str(reference) for reference in references])
+        return JsonResponse(results, status=status.HTTP_200_OK)
+
+
+class AsyncGetBanksView(AsyncAPIView):
+    """
+    Async `GetBanksView`.
+
+    GET:
+    - Returns list of banks and their codes (used when creating bank recipients).
+    """
+    async def get(self, request):
+        try:
+            banks = await sync_to_async(get_bank_directory)(country='ghana')
+        except BankDirectoryUnavailable as e:
+            return JsonResponse({
+                'status': False,
+                'message': str(e) or 'Failed to fetch banks'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return JsonResponse({'status': True, 'data': banks}, status=status.HTTP_200_OK)
@@ -0,0 +1,368 @@
+"""In-process stand-in for the Paystack API, for offline load and integration testing.
+
+`FakePaystack` is a plain WSGI app (standard library only) that implements
+the endpoints this project calls:
+
+- ``POST /transaction/initialize`` and ``GET /transaction/verify/<reference>``
+- ``POST /transferrecipient``
+- ``POST /transfer``, ``POST /transfer/bulk``, ``GET /transfer/<code>``,
+  ``GET /transfer/verify/<reference>``, ``GET /transfer``
+- ``GET /bank``
+
+plus signed webhooks (``charge.success`` and ``transfer.*``) delivered from a
+background thread to `webhook_url`, with the same HMAC-SHA512 signature the
+real service uses. Every request can be delayed (`latency` +/- `jitter`
+seconds) and failed with a 503 (`failure_rate`); `charge_failure_rate` and
+`transfer_failure_rate` decide the final outcome of charges and transfers.
+
+Run it with ``python manage.py run_fake_paystack`` and point Django at it
+with ``PAYSTACK_BASE_URL=http://127.0.0.1:8765``.
+"""
+import hashlib
+import hmac
+import itertools
+import json
+import queue
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+import requests
+
+BANKS = [
+    {"id": 1, "name": "Absa Bank Ghana Ltd", "code": "030100", "type": "ghipss", "currency": "GHS"},
+    {"id": 2, "name": "Access Bank", "code": "280100", "type": "ghipss", "currency": "GHS"},
+    {"id": 3, "name": "Ecobank Ghana Ltd", "code": "130100", "type": "ghipss", "currency": "GHS"},
+    {"id": 4, "name": "GCB Bank Limited", "code": "040100", "type": "ghipss", "currency": "GHS"},
+    {"id": 5, "name": "Stanbic Bank", "code": "190100", "type": "ghipss", "currency": "GHS"},
+    {"id": 6, "name": "MTN", "code": "MTN", "type": "mobile_money", "currency": "GHS"},
+    {"id": 7, "name": "Vodafone", "code": "VOD", "type": "mobile_money", "currency": "GHS"},
+    {"id": 8, "name": "AirtelTigo", "code": "ATL", "type": "mobile_money", "currency": "GHS"},
+]
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _parse_time(value):
+    """Aware datetime for an ISO 8601 timestamp or date; naive values are taken as UTC."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class FakePaystack:
+    """WSGI app emulating the subset of the Paystack API used by `payments.services`."""
+
+    def __init__(self, *, secret_key, webhook_url=None, latency=0.0, jitter=0.0, failure_rate=0.0,
+                 charge_failure_rate=0.0, transfer_failure_rate=0.0, auto_settle=True, webhook_delay=0.0, seed=None):
+        self.secret_key = secret_key
+        self.webhook_url = webhook_url
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.charge_failure_rate = charge_failure_rate
+        self.transfer_failure_rate = transfer_failure_rate
+        self.auto_settle = auto_settle
+        self.webhook_delay = webhook_delay
+        self.random = random.Random(seed)
+
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.charges = {}
+        self.recipients = {}
+        self.transfers = {}  # reference -> transfer
+        self.transfer_codes = {}  # transfer_code -> reference
+        self.stats = {}
+
+        self.webhooks = queue.Queue()
+        self.session = requests.Session()
+        threading.Thread(target=self._deliver_webhooks, daemon=True).start()
+
+        self.routes = [
+            ("POST", re.compile(r"^/transaction/initialize$"), self.initialize),
+            ("GET", re.compile(r"^/transaction/verify/(?P<reference>[^/]+)$"), self.verify),
+            ("GET", re.compile(r"^/checkout/(?P<reference>[^/]+)$"), self.checkout),
+            ("POST", re.compile(r"^/transferrecipient$"), self.create_recipient),
+            ("POST", re.compile(r"^/transfer/bulk$"), self.bulk_transfer),
+            ("POST", re.compile(r"^/transfer$"), self.transfer),
+            ("GET", re.compile(r"^/transfer/verify/(?P<reference>[^/]+)$"), self.verify_transfer),
+            ("GET", re.compile(r"^/transfer/(?P<code>[^/]+)$"), self.fetch_transfer),
+            ("GET", re.compile(r"^/transfer$"), self.list_transfers),
+            ("GET", re.compile(r"^/bank$"), self.banks),
+        ]
+
+    # -- WSGI plumbing -------------------------------------------------------
+
+    def __call__(self, environ, start_response):
+        method, path = environ["REQUEST_METHOD"], environ.get("PATH_INFO", "")
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if match and route_method == method:
+                break
+        else:
+            return self._respond(start_response, 404, {"status": False, "message": "Not found"})
+
+        self._count(handler.__name__)
+        delay = self.latency + self._uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if not environ.get("HTTP_AUTHORIZATION", "").startswith("Bearer "):
+            return self._respond(start_response, 401, {"status": False, "message": "Invalid key"})
+        if self._chance(self.failure_rate):
+            self._count("injected_failures")
+            return self._respond(start_response, 503, {"status": False, "message": "Service unavailable (injected)"})
+
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+            body = json.loads(environ["wsgi.input"].read(length) or b"{}") if length else {}
+        except ValueError:
+            return self._respond(start_response, 400, {"status": False, "message": "Invalid JSON"})
+        query = {key: values[-1] for key, values in parse_qs(environ.get("QUERY_STRING", "")).items()}
+
+        status, payload = handler(body=body, query=query, **match.groupdict())
+        return self._respond(start_response, status, payload)
+
+    def _respond(self, start_response, status, payload):
+        data = json.dumps(payload).encode()
+        reason = {200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 503: "Service Unavailable"}
+        start_response(f"{status} {reason.get(status, 'OK')}", [
+            ("Content-Type", "application/json"),
+            ("Content-Length", str(len(data))),
+        ])
+        return [data]
+
+    def _count(self, name):
+        with self.lock:
+            self.stats[name] = self.stats.get(name, 0) + 1
+
+    # random.Random is not safe to share between the server's request threads.
+    def _uniform(self, low, high):
+        with self.lock:
+            return self.random.uniform(low, high)
+
+    def _chance(self, rate):
+        if not rate:
+            return False
+        with self.lock:
+            return self.random.random() < rate
+
+    # -- charges -------------------------------------------------------------
+
+    def initialize(self, body, query):
+        if not body.get("email") or not body.get("amount"):
+            return 400, {"status": False, "message": "email and amount are required"}
+        reference = body.get("reference") or uuid.uuid4().hex[:12]
+        with self.lock:
+            if reference in self.charges:
+                return 400, {"status": False, "message": "Duplicate Transaction Reference"}
+            self.charges[reference] = {
+                "id": next(self.ids),
+                "reference": reference,
+                "amount": int(body["amount"]),
+                "currency": body.get("currency", "GHS"),
+                "status": "abandoned",
+                "customer": {"email": body["email"]},
+                "created_at": _now(),
+            }
+        if self.auto_settle:
+            self._settle_charge(reference)
+        return 200, {
+            "status": True,
+            "message": "Authorization URL created",
+            "data": {
+                "authorization_url": f"/checkout/{reference}",
+                "access_code": uuid.uuid4().hex[:15],
+                "reference": reference,
+            },
+        }
+
+    def checkout(self, body, query, reference):
+        """Simulate the customer paying at the authorization URL."""
+        if reference not in self.charges:
+            return 404, {"status": False, "message": "Transaction reference not found"}
+        self._settle_charge(reference)
+        return 200, {"status": True, "data": self.charges[reference]}
+
+    def _settle_charge(self, reference):
+        failed = self._chance(self.charge_failure_rate)
+        with self.lock:
+            charge = self.charges[reference]
+            if charge["status"] != "abandoned":
+                return
+            charge["status"] = "failed" if failed else "success"
+            charge["paid_at"] = _now()
+            event = {"event": "charge.failed" if failed else "charge.success", "data": dict(charge)}
+        self._queue_webhook(event)
+
+    def verify(self, body, query, reference):
+        charge = self.charges.get(reference)
+        if charge is None:
+            return 400, {"status": False, "message": "Transaction reference not found"}
+        return 200, {"status": True, "message": "Verification successful", "data": charge}
+
+    # -- transfers -----------------------------------------------------------
+
+    def create_recipient(self, body, query):
+        missing = [f for f in ("type", "name", "account_number", "bank_code") if not body.get(f)]
+        if missing:
+            return 400, {"status": False, "message": f"{', '.join(missing)} required"}
+        key = (body["type"], body["account_number"], body["bank_code"])
+        with self.lock:
+            recipient = self.recipients.get(key)
+            if recipient is None:
+                recipient = self.recipients[key] = {
+                    "id": next(self.ids),
+                    "recipient_code": f"RCP_{uuid.uuid4().hex[:12]}",
+                    "type": body["type"],
+                    "name": body["name"],
+                    "details": {"account_number": body["account_number"], "bank_code": body["bank_code"]},
+                    "currency": body.get("currency", "GHS"),
+                }
+        return 201, {"status": True, "message": "Transfer recipient created successfully", "data": recipient}
+
+    @staticmethod
+    def _transfer_error(item):
+        if not item.get("amount") or not item.get("recipient"):
+            return "amount and recipient are required"
+        return None
+
+    def _create_transfer(self, item):
+        """Create (or return, for a repeated reference) one transfer; returns it or an error message."""
+        error = self._transfer_error(item)
+        if error:
+            return None, error
+        reference = item.get("reference") or uuid.uuid4().hex[:12]
+        with self.lock:
+            existing = self.transfers.get(reference)
+            if existing is not None:
+                return existing, None
+            transfer = self.transfers[reference] = {
+                "id": next(self.ids),
+                "reference": reference,
+                "amount": int(item["amount"]),
+                "currency": item.get("currency", "GHS"),
+                "recipient": item["recipient"],
+                "reason": item.get("reason", ""),
+                "transfer_code": f"TRF_{uuid.uuid4().hex[:12]}",
+                "status": "pending",
+                "createdAt": _now(),
+            }
+            self.transfer_codes[transfer["transfer_code"]] = reference
+        threading.Timer(self.webhook_delay, self._finish_transfer, args=(reference,)).start()
+        return transfer, None
+
+    def _finish_transfer(self, reference):
+        failed = self._chance(self.transfer_failure_rate)
+        with self.lock:
+            transfer = self.transfers[reference]
+            transfer["status"] = "failed" if failed else "success"
+            event = {"event": "transfer.failed" if failed else "transfer.success", "data": dict(transfer)}
+        self._queue_webhook(event)
+
+    def transfer(self, body, query):
+        transfer, error = self._create_transfer(body)
+        if error:
+            return 400, {"status": False, "message": error}
+        return 200, {"status": True, "message": "Transfer has been queued", "data": transfer}
+
+    def bulk_transfer(self, body, query):
+        items = body.get("transfers") or []
+        if not items or len(items) > 100:
+            return 400, {"status": False, "message": "transfers must hold 1 to 100 items"}
+        # Like Paystack, reject the whole batch before queuing any of it.
+        for item in items:
+            error = self._transfer_error(item)
+            if error:
+                return 400, {"status": False, "message": error}
+        data = []
+        for item in items:
+            transfer, _ = self._create_transfer(item)
+            data.append({key: transfer[key] for key in ("reference", "recipient", "amount", "transfer_code", "currency", "status")})
+        return 200, {"status": True, "message": f"{len(data)} transfers queued.", "data": data}
+
+    def fetch_transfer(self, body, query, code):
+        reference = self.transfer_codes.get(code, code)
+        transfer = self.transfers.get(reference)
+        if transfer is None:
+            return 404, {"status": False, "message": "Transfer not found"}
+        return 200, {"status": True, "message": "Transfer retrieved", "data": transfer}
+
+    def verify_transfer(self, body, query, reference):
+        transfer = self.transfers.get(reference)
+        if transfer is None:
+            return 404, {"status": False, "message": "Transfer not found"}
+        return 200, {"status": True, "message": "Transfer retrieved", "data": transfer}
+
+    def list_transfers(self, body, query):
+        per_page = max(1, min(int(query.get("perPage", 50)), 100))
+        page = max(1, int(query.get("page", 1)))
+        try:
+            start, end = (_parse_time(query[key]) if query.get(key) else None for key in ("from", "to"))
+        except ValueError:
+            return 400, {"status": False, "message": "from and to must be ISO 8601 timestamps"}
+        with self.lock:
+            rows = [t for t in self.transfers.values()
+                    if (start is None or start <= _parse_time(t["createdAt"]))
+                    and (end is None or _parse_time(t["createdAt"]) < end)]
+        rows.sort(key=lambda t: t["id"], reverse=True)
+        page_count = max(1, -(-len(rows) // per_page))
+        return 200, {
+            "status": True,
+            "message": "Transfers retrieved",
+            "data": rows[(page - 1) * per_page:page * per_page],
+            "meta": {"total": len(rows), "perPage": per_page, "page": page, "pageCount": page_count},
+        }
+
+    def banks(self, body, query):
+        return 200, {"status": True, "message": "Banks retrieved", "data": BANKS}
+
+    # -- webhooks ------------------------------------------------------------
+
+    def _queue_webhook(self, event):
+        if self.webhook_url:
+            self.webhooks.put(event)
+
+    def _deliver_webhooks(self):
+        while True:
+            event = self.webhooks.get()
+            body = json.dumps(event).encode()
+            signature = hmac.new(self.secret_key.encode(), body, hashlib.sha512).hexdigest()
+            for attempt in range(3):
+                try:
+                    response = self.session.post(
+                        self.webhook_url, data=body, timeout=10,
+                        headers={"Content-Type": "application/json", "X-Paystack-Signature": signature},
+                    )
+                    if response.status_code < 500:
+                        self._count("webhooks_delivered")
+                        break
+                except requests.RequestException:
+                    pass
+                time.sleep(0.5 * (attempt + 1))
+            else:
+                self._count("webhooks_failed")
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def make_fake_server(host="127.0.0.1", port=8765, *, quiet=True, **options):
+    """Build a threaded WSGI server running `FakePaystack(**options)`; call ``serve_forever()`` on it."""
+    app = FakePaystack(**options)
+    server = make_server(host, port, app, server_class=_ThreadingWSGIServer,
+                         handler_class=_QuietHandler if quiet else WSGIRequestHandler)
+    server.app = app
+    return server
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from payments.services.webhooks import drain_inbox
+
+
+class Command(BaseCommand):
+    help = "Settle pending Paystack webhook events from the inbox in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Events claimed per batch.")
+        parser.add_argument("--loop", action="store_true", help="Keep polling the inbox instead of exiting when it is empty.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds to sleep between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            totals = drain_inbox(batch_size=options["batch_size"])
+            if any(totals.values()):
+                self.stdout.write(", ".join(f"{count} {status}" for status, count in totals.items()))
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
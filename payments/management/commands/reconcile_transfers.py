@@ -0,0 +1,44 @@
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from payments.services.reconciliation import diff, fetch_transfers, fix
+
+
+class Command(BaseCommand):
+    help = "Diff local withdrawals against Paystack's transfer listing and optionally fix statuses."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30, help="Reconcile transfers created in the last N days.")
+        parser.add_argument("--from", dest="start", help="Start date (YYYY-MM-DD); overrides --days.")
+        parser.add_argument("--to", dest="end", help="End date (YYYY-MM-DD), exclusive.")
+        parser.add_argument("--concurrency", type=int, default=8, help="Provider pages fetched in parallel.")
+        parser.add_argument("--fix", action="store_true", help="Apply provider statuses to mismatched withdrawals.")
+
+    def handle(self, *args, **options):
+        start = self._date(options["start"]) if options["start"] else timezone.now() - timedelta(days=options["days"])
+        end = self._date(options["end"]) if options["end"] else None
+
+        index = fetch_transfers(start=start, end=end, concurrency=options["concurrency"])
+        self.stdout.write(f"Fetched {len(index)} Paystack transfers.")
+
+        mismatches = list(diff(index, start=start, end=end))
+        for item in mismatches:
+            self.stdout.write(self.style.WARNING(
+                f"{item['problem']}: {item['reference']} ({item['kind'] or '-'}) "
+                f"local={item['local']} provider={item['provider']}"
+            ))
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("No mismatches found."))
+            return
+        self.stdout.write(self.style.WARNING(f"{len(mismatches)} mismatch(es) found."))
+        if options["fix"]:
+            self.stdout.write(self.style.SUCCESS(f"Fixed {fix(mismatches)} withdrawal(s)."))
+
+    def _date(self, value):
+        try:
+            return timezone.make_aware(datetime.combine(datetime.strptime(value, "%Y-%m-%d").date(), time.min))
+        except ValueError:
+            raise CommandError(f"Invalid date {value!r}; expected YYYY-MM-DD.")
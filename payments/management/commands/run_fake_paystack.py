@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from payments.fake_paystack import make_fake_server
+
+
+class Command(BaseCommand):
+    help = "Run a local stand-in for the Paystack API (point PAYSTACK_BASE_URL at it)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every response.")
+        parser.add_argument("--jitter", type=float, default=0.02, help="Random +/- seconds around --latency.")
+        parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests answered with a 503.")
+        parser.add_argument("--charge-failure-rate", type=float, default=0.0, help="Fraction of charges that fail.")
+        parser.add_argument("--transfer-failure-rate", type=float, default=0.0, help="Fraction of transfers that fail.")
+        parser.add_argument("--no-auto-settle", action="store_true",
+                            help="Leave charges unpaid until /checkout/<reference> is visited.")
+        parser.add_argument("--webhook-url", default="http://127.0.0.1:8000/api/payments/webhook/",
+                            help="Where signed webhooks are sent; empty to disable.")
+        parser.add_argument("--webhook-delay", type=float, default=0.5, help="Seconds before a transfer is finalised.")
+        parser.add_argument("--seed", type=int, default=None, help="Seed for latency and failure injection.")
+        parser.add_argument("--verbose-requests", action="store_true", help="Log every request.")
+
+    def handle(self, *args, **options):
+        server = make_fake_server(
+            options["host"],
+            options["port"],
+            quiet=not options["verbose_requests"],
+            secret_key=settings.PAYSTACK_SECRET_KEY,
+            webhook_url=options["webhook_url"] or None,
+            latency=options["latency"],
+            jitter=options["jitter"],
+            failure_rate=options["failure_rate"],
+            charge_failure_rate=options["charge_failure_rate"],
+            transfer_failure_rate=options["transfer_failure_rate"],
+            auto_settle=not options["no_auto_settle"],
+            webhook_delay=options["webhook_delay"],
+            seed=options["seed"],
+        )
+        self.stdout.write(
+            f"Fake Paystack listening on http://{options['host']}:{options['port']} "
+            f"(run Django with PAYSTACK_BASE_URL=http://{options['host']}:{options['port']})"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Request counts: {server.app.stats}")
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from payments.models import PayoutBatch
+from payments.services.payouts import collect_batch, submit_batch
+
+
+class Command(BaseCommand):
+    help = "Batch pending withdrawals, debit wallets and submit them through Paystack bulk transfers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Withdrawals per payout batch.")
+        parser.add_argument("--max-batches", type=int, default=None, help="Stop after collecting this many batches.")
+        parser.add_argument("--collect-only", action="store_true", help="Debit and batch withdrawals without submitting them.")
+
+    def handle(self, *args, **options):
+        collected = 0
+        while options["max_batches"] is None or collected < options["max_batches"]:
+            batch = collect_batch(limit=options["batch_size"])
+            if batch is None:
+                break
+            collected += 1
+            self.stdout.write(f"Collected batch {batch.uuid}: {batch.item_count} items, {batch.total_amount} GHS.")
+
+        if options["collect_only"]:
+            return
+
+        # Includes batches left unsubmitted by an earlier failed run.
+        for batch in PayoutBatch.objects.filter(status="collected").order_by("id"):
+            counts = submit_batch(batch)
+            summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items())) or "nothing to send"
+            style = self.style.WARNING if batch.error else self.style.SUCCESS
+            self.stdout.write(style(f"Submitted batch {batch.uuid}: {summary}."))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_withdrawal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaystackWebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(max_length=100)),
+                ('reference', models.CharField(blank=True, db_index=True, max_length=100, null=True)),
+                ('payload', models.JSONField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processed', 'Processed'), ('duplicate', 'Duplicate'), ('ignored', 'Ignored'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('error', models.TextField(blank=True, default='')),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'id'], name='paystack_webhook_inbox_idx')],
+            },
+        ),
+    ]
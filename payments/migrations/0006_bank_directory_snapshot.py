@@ -0,0 +1,22 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0005_transfer_recipients'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankDirectorySnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('country', models.CharField(max_length=50, unique=True)),
+                ('data', models.JSONField()),
+                ('fetched_at', models.DateTimeField()),
+            ],
+        ),
+    ]
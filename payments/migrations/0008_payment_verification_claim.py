@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0007_payment_task'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='verification',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='verified_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='verify_claimed_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
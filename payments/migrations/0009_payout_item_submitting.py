@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0008_payment_verification_claim'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payoutitem',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('submitting', 'Submitting'), ('pending', 'Pending'), ('success', 'Success'), ('failed', 'Failed'), ('reversed', 'Reversed')], default='queued', max_length=10),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0009_payout_item_submitting'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='transferrecipient',
+            name='unique_transfer_recipient',
+        ),
+        migrations.AlterField(
+            model_name='transferrecipient',
+            name='recipient_code',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.AddConstraint(
+            model_name='transferrecipient',
+            constraint=models.UniqueConstraint(fields=('created_by', 'type', 'account_number', 'bank_code'), name='unique_transfer_recipient'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-18 08:32
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_submitted_at(apps, schema_editor):
+    # Items Paystack already accepted carry a transfer code; their last update is the best estimate.
+    PayoutItem = apps.get_model("payments", "PayoutItem")
+    PayoutItem.objects.filter(transfer_code__isnull=False).update(submitted_at=F("updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0010_transfer_recipient_per_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payoutitem',
+            name='submitted_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill_submitted_at, migrations.RunPython.noop),
+    ]
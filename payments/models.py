@@ -1,3 +1,5 @@
+from uuid import uuid4
+
 from django.db import models
 from django.conf import settings
 
@@ -15,6 +17,10 @@ class Payment(models.Model):
     amount = models.PositiveIntegerField(help_text="Amount in pesewas")
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
     created_at = models.DateTimeField(auto_now_add=True)
+    # Single-flight verification across processes (payments/services/paystack.py)
+    verify_claimed_until = models.DateTimeField(blank=True, null=True)
+    verification = models.JSONField(blank=True, null=True)  # last Paystack verify response
+    verified_at = models.DateTimeField(blank=True, null=True)
 
     def __str__(self):
         return f"{self.user} - {self.amount/100} GHS - {self.status}"
@@ -43,3 +49,125 @@ class Withdrawal(models.Model):
 
     def __str__(self):
         return f"{self.user} - {self.amount} ({self.status})"
+
+
+class PaystackWebhookEvent(models.Model):
+    """Raw Paystack webhook event, stored on receipt and settled later by `drain_inbox`."""
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("processed", "Processed"),
+        ("duplicate", "Duplicate"),
+        ("ignored", "Ignored"),
+        ("failed", "Failed"),
+    ]
+
+    event = models.CharField(max_length=100)
+    reference = models.CharField(max_length=100, blank=True, null=True, db_index=True)
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    error = models.TextField(blank=True, default="")
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "id"], name="paystack_webhook_inbox_idx")]
+
+    def __str__(self):
+        return f"{self.event} {self.reference} ({self.status})"
+
+
+class PayoutBatch(models.Model):
+    """A group of queued withdrawals submitted together through Paystack's bulk transfer endpoint."""
+    STATUS_CHOICES = [
+        ("collected", "Collected"),
+        ("submitted", "Submitted"),
+        ("completed", "Completed"),
+    ]
+
+    uuid = models.UUIDField(default=uuid4, editable=False, unique=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="collected")
+    item_count = models.PositiveIntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    submitted_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"PayoutBatch {self.uuid} - {self.item_count} items ({self.status})"
+
+
+class PayoutItem(models.Model):
+    """One withdrawal inside a `PayoutBatch`, from either `payments.Withdrawal` or `wallet.Withdrawal`."""
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("submitting", "Submitting"),
+        ("pending", "Pending"),
+        ("success", "Success"),
+        ("failed", "Failed"),
+        ("reversed", "Reversed"),
+    ]
+
+    batch = models.ForeignKey(PayoutBatch, on_delete=models.CASCADE, related_name="items")
+    wallet = models.ForeignKey("wallet.Wallet", on_delete=models.PROTECT, related_name="payout_items")
+    payment_withdrawal = models.ForeignKey(
+        Withdrawal, on_delete=models.PROTECT, blank=True, null=True, related_name="payout_items"
+    )
+    wallet_withdrawal = models.ForeignKey(
+        "wallet.Withdrawal", on_delete=models.PROTECT, blank=True, null=True, related_name="payout_items"
+    )
+    reference = models.CharField(max_length=100, unique=True)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    recipient_code = models.CharField(max_length=100, blank=True, default="")
+    transfer_code = models.CharField(max_length=100, blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    submitted_at = models.DateTimeField(blank=True, null=True, db_index=True)  # when Paystack accepted it
+
+    def __str__(self):
+        return f"{self.reference} - {self.amount} GHS ({self.status})"
+
+
+class TransferRecipient(models.Model):
+    """A Paystack transfer recipient a user already registered, keyed by owner and account details."""
+    type = models.CharField(max_length=20)  # 'nuban', 'mobile_money', ...
+    account_number = models.CharField(max_length=50)
+    bank_code = models.CharField(max_length=50)
+    name = models.CharField(max_length=100)
+    # Paystack may hand back the same code when two users register one account.
+    recipient_code = models.CharField(max_length=100, db_index=True)
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, blank=True, null=True, related_name="transfer_recipients"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["created_by", "type", "account_number", "bank_code"], name="unique_transfer_recipient"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} - {self.account_number} ({self.recipient_code})"
+
+
+class BankDirectorySnapshot(models.Model):
+    """Last bank/mobile-money list fetched from Paystack per country, for cache cold starts."""
+    country = models.CharField(max_length=50, unique=True)
+    data = models.JSONField()
+    fetched_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Banks for {self.country} ({self.fetched_at:%Y-%m-%d %H:%M})"
+
+
+class PaymentTask(models.Model):
+    """Who enqueued a payment task, so only they can poll its result from any process."""
+    task_id = models.CharField(max_length=255, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="payment_tasks")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.task_id} ({self.user})"
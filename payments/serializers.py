@@ -27,4 +27,16 @@ class TransferSerializer(serializers.Serializer):
 class BankTransferRecipientSerializer(serializers.Serializer):
     name = serializers.CharField(max_length=100)
     account_number = serializers.CharField(max_length=20)
-    bank_code = serializers.CharField(max_length=50)
\ No newline at end of file
+    bank_code = serializers.CharField(max_length=50)
+
+
+class WithdrawalRequestSerializer(serializers.Serializer):
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2)
+    bank_code = serializers.CharField(max_length=20)
+    account_number = serializers.CharField(max_length=50)
+    account_name = serializers.CharField(max_length=100)
+
+    def validate_amount(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Withdrawal amount must be greater than zero.")
+        return value
@@ -0,0 +1,89 @@
+"""asyncio counterpart of `payments.services.client` built on httpx.
+
+Same timeouts, retry rules, circuit breaker and per-operation metrics as the sync client,
+but calls yield to the event loop while waiting on Paystack, so one ASGI
+worker can keep hundreds of provider calls in flight. httpx clients are bound
+to the event loop they were created on, so one client is kept per loop.
+"""
+import asyncio
+import threading
+import time
+import weakref
+
+import httpx
+
+from .client import IDEMPOTENT_METHODS, RETRY_STATUSES, BaseClient
+
+
+class AsyncPaystackClient(BaseClient):
+    """Pooled, retrying async Paystack HTTP client with per-operation metrics."""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+            limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+        )
+
+    async def request(self, method, path, *, operation, idempotent=None, **kwargs):
+        """Send a request to ``base_url + path`` and return the `httpx.Response`.
+
+        Connection failures are always retried; idempotent calls are also
+        retried on read timeouts and 429/5xx responses. Raises `CircuitOpen`
+        without calling Paystack while the breaker is open.
+        """
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+
+        for attempt in range(self.max_retries + 1):
+            last = attempt == self.max_retries
+            probe = self._before_call(operation)
+            started = time.perf_counter()
+            try:
+                response = await self.client.request(method, path, **kwargs)
+            except httpx.TransportError as exc:
+                self._record(operation, started, error=True, probe=probe)
+                # Failing to connect means nothing reached Paystack, so even a POST is safe to resend.
+                if last or not (idempotent or isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout))):
+                    raise
+                await asyncio.sleep(self._retry_delay(operation, attempt, exc))
+                continue
+
+            retryable = response.status_code in RETRY_STATUSES
+            self._record(operation, started, error=retryable or response.status_code >= 500, probe=probe)
+            if retryable and idempotent and not last:
+                await asyncio.sleep(self._retry_delay(operation, attempt, f"HTTP {response.status_code}"))
+                continue
+            return response
+
+    async def get(self, path, *, operation, **kwargs):
+        return await self.request("GET", path, operation=operation, **kwargs)
+
+    async def post(self, path, *, operation, **kwargs):
+        return await self.request("POST", path, operation=operation, **kwargs)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+_clients = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+def get_async_client() -> AsyncPaystackClient:
+    """Return the `AsyncPaystackClient` for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.get(loop)
+        if client is None:
+            client = _clients[loop] = AsyncPaystackClient()
+    return client
+
+
+def async_clients() -> list:
+    """The `AsyncPaystackClient` of every live event loop in this process."""
+    with _clients_lock:
+        return list(_clients.values())
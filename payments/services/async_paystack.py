@@ -0,0 +1,111 @@
+"""Async versions of the Paystack helpers in `payments.services.paystack`.
+
+Provider calls go through `AsyncPaystackClient`; the database side reuses
+the sync helpers (wrapped in ``sync_to_async``) so both paths record payments
+and credit wallets identically. Verification shares the sync single-flight
+state: the result cache and the claim on the Payment row, plus one
+in-flight task per reference on each event loop.
+"""
+import asyncio
+import time
+import weakref
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from payments.models import Payment
+
+from .async_client import get_async_client
+from .paystack import (
+    VERIFY_LOCK_POLL,
+    claim_verification,
+    payment_payload,
+    release_verification,
+    settle_verification,
+    verify_result_key,
+)
+
+# Upper bound on verify calls `averify_many` keeps in flight at once.
+VERIFY_CONCURRENCY = 20
+
+# event loop -> {reference: task verifying it}
+_inflight = weakref.WeakKeyDictionary()
+
+
+async def ainitialize_payment(user, amount):
+    """Async `initialize_payment`: create the Paystack transaction and a pending Payment."""
+    data = payment_payload(user, amount)
+    client = get_async_client()
+    r = await client.post("/transaction/initialize", json=data, operation="initialize_payment")
+    res = r.json()
+
+    if res.get("status"):
+        await Payment.objects.acreate(user=user, amount=Decimal(amount), reference=data["reference"])
+
+    return res
+
+
+async def averify_payment(reference):
+    """Async `verify_payment`: fetch the status from Paystack and settle locally, single-flight per reference."""
+    result = await cache.aget(verify_result_key(reference))
+    if result is not None:
+        return result
+
+    tasks = _inflight.setdefault(asyncio.get_running_loop(), {})
+    task = tasks.get(reference)
+    if task is None:
+        task = tasks[reference] = asyncio.ensure_future(_averify_once(reference))
+        task.add_done_callback(lambda _: tasks.pop(reference, None))
+    # Shielded so one caller being cancelled does not cancel the call the others wait on.
+    return await asyncio.shield(task)
+
+
+async def _averify_once(reference):
+    """Async `paystack._verify_once`."""
+    since = timezone.now()
+    deadline = time.monotonic() + settings.PAYSTACK_VERIFY_LOCK_TIMEOUT
+    claim = sync_to_async(claim_verification)
+    claimed, result = await claim(reference, since)
+    while not claimed and result is None and time.monotonic() < deadline:
+        await asyncio.sleep(VERIFY_LOCK_POLL)
+        claimed, result = await claim(reference, since)
+    if result is not None:
+        return result
+
+    try:
+        client = get_async_client()
+        r = await client.get(f"/transaction/verify/{reference}", operation="verify_payment")
+        return await sync_to_async(settle_verification)(reference, r.json())
+    finally:
+        if claimed:
+            await sync_to_async(release_verification)(reference)
+
+
+async def averify_many(references, *, concurrency=VERIFY_CONCURRENCY):
+    """Verify many references concurrently, at most `concurrency` at a time.
+
+    Returns ``{reference: result}`` where result is what `averify_payment`
+    returns, or ``{"error": ..., "status_code": 502}`` if that call failed.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def verify(reference):
+        async with semaphore:
+            try:
+                return await averify_payment(reference)
+            except Exception as e:
+                return {"error": str(e), "status_code": 502}
+
+    references = list(dict.fromkeys(references))
+    results = await asyncio.gather(*(verify(reference) for reference in references))
+    return dict(zip(references, results))
+
+
+async def aget_banks(country="ghana"):
+    """Async `Paystack.get_banks`."""
+    client = get_async_client()
+    response = await client.get("/bank", params={"country": country}, operation="get_banks")
+    return response.json()
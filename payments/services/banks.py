@@ -0,0 +1,140 @@
+"""Cached bank / mobile-money directory per country.
+
+Lookups go through three tiers: an in-process dict (L1), the configured
+Django cache (L2, shared between workers) and, when
+``settings.BANK_DIRECTORY_SNAPSHOT`` is on, a `BankDirectorySnapshot` row so a
+cold start does not have to reach Paystack.
+
+Entries are fresh for ``BANK_DIRECTORY_TTL`` seconds. After that they are
+still served, and a background thread refreshes them (stale-while-revalidate),
+until ``BANK_DIRECTORY_STALE_TTL``; only then does a caller wait for the
+provider. If the provider fails, whatever list we have is served.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from payments.models import BankDirectorySnapshot
+
+from .paystack import Paystack
+
+logger = logging.getLogger(__name__)
+
+_l1 = {}
+_l1_lock = threading.Lock()
+_refresh_locks = {}
+_failed_at = {}
+
+# Seconds to wait after a failed background refresh before trying again.
+RETRY_AFTER = 60
+
+
+class BankDirectoryUnavailable(Exception):
+    """No cached list exists and Paystack could not provide one."""
+
+
+def _cache_key(country):
+    return f"paystack:banks:{country}"
+
+
+def _ttl():
+    return getattr(settings, "BANK_DIRECTORY_TTL", 6 * 60 * 60)
+
+
+def _stale_ttl():
+    return getattr(settings, "BANK_DIRECTORY_STALE_TTL", 7 * 24 * 60 * 60)
+
+
+def _refresh_lock(country) -> threading.Lock:
+    with _l1_lock:
+        return _refresh_locks.setdefault(country, threading.Lock())
+
+
+def get_bank_directory(country: str = "ghana") -> list:
+    """Return the bank list for `country`, refreshing from Paystack as needed."""
+    entry = _lookup(country)
+    age = time.time() - entry["fetched_at"] if entry else None
+
+    if entry is not None and age < _ttl():
+        return entry["data"]
+    if entry is not None and age < _stale_ttl():
+        _refresh_in_background(country)
+        return entry["data"]
+
+    # Missing or too old to serve without asking: refresh now (one caller at a time).
+    with _refresh_lock(country):
+        latest = _l1.get(country)
+        if latest is not None and time.time() - latest["fetched_at"] < _ttl():
+            return latest["data"]
+        try:
+            return refresh(country)["data"]
+        except Exception as e:
+            if entry is not None:
+                logger.warning("Bank directory refresh for %s failed, serving stale list: %s", country, e)
+                return entry["data"]
+            raise BankDirectoryUnavailable(str(e)) from e
+
+
+def _lookup(country):
+    """Best entry across L1, L2 and the DB snapshot (promoting it to the faster tiers)."""
+    local = _l1.get(country)
+    if local is not None and time.time() - local["fetched_at"] < _ttl():
+        return local
+
+    # L1 is missing or stale: another worker may already have refreshed the shared cache.
+    entry = cache.get(_cache_key(country))
+    if local is not None and (entry is None or entry["fetched_at"] <= local["fetched_at"]):
+        return local
+    if entry is None and getattr(settings, "BANK_DIRECTORY_SNAPSHOT", True):
+        snapshot = BankDirectorySnapshot.objects.filter(country=country).first()
+        if snapshot is not None:
+            entry = {"data": snapshot.data, "fetched_at": snapshot.fetched_at.timestamp()}
+            cache.set(_cache_key(country), entry, _stale_ttl())
+    if entry is not None:
+        with _l1_lock:
+            _l1[country] = entry
+    return entry
+
+
+def refresh(country: str = "ghana") -> dict:
+    """Fetch the list from Paystack and store it in every tier. Returns the new entry."""
+    response = Paystack().get_banks(country=country)
+    if not response.get("status"):
+        raise BankDirectoryUnavailable(response.get("message", "Failed to fetch banks"))
+
+    entry = {"data": response["data"], "fetched_at": time.time()}
+    with _l1_lock:
+        _l1[country] = entry
+    cache.set(_cache_key(country), entry, _stale_ttl())
+    if getattr(settings, "BANK_DIRECTORY_SNAPSHOT", True):
+        BankDirectorySnapshot.objects.update_or_create(
+            country=country,
+            defaults={"data": entry["data"], "fetched_at": datetime.fromtimestamp(entry["fetched_at"], dt_timezone.utc)},
+        )
+    return entry
+
+
+def _refresh_in_background(country):
+    """Start one refresh thread for `country` unless one is running or one just failed."""
+    if time.time() - _failed_at.get(country, 0) < RETRY_AFTER:
+        return
+    lock = _refresh_lock(country)
+    if not lock.acquire(blocking=False):
+        return
+
+    def run():
+        try:
+            refresh(country)
+        except Exception as e:
+            _failed_at[country] = time.time()
+            logger.warning("Background bank directory refresh for %s failed: %s", country, e)
+        finally:
+            lock.release()
+            connections.close_all()
+
+    threading.Thread(target=run, name=f"bank-directory-{country}", daemon=True).start()
@@ -0,0 +1,166 @@
+"""Circuit breaker for calls to Paystack.
+
+The breaker keeps a rolling window of recent call outcomes. While *closed*
+every call goes through. Once the window holds at least ``min_calls`` and
+either the error rate or the slow-call rate reaches its threshold, it
+*opens*: calls fail immediately with `CircuitOpen` instead of waiting on a
+degraded provider. After ``cooldown`` seconds it goes *half-open* and lets a
+single probe through; a healthy probe closes it, anything else reopens it.
+`before_call` hands the probe a token, so only the probe's own outcome decides.
+
+One breaker is shared by the sync and async clients in a process, since they
+talk to the same provider. Each breaker also publishes when it is open to the
+cache, so `retry_after()` in a web process reflects a breaker opened by a
+worker (as long as ``CACHES`` is shared between them).
+"""
+import itertools
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Cache key holding the wall-clock time until which some process's breaker is open.
+SHARED_OPEN_UNTIL_KEY = "paystack:breaker:open-until"
+
+
+class CircuitOpen(Exception):
+    """Paystack calls are being short-circuited; retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after):
+        # Kept as the only arg so the exception survives Celery's result serialization.
+        super().__init__(retry_after)
+        self.retry_after = float(retry_after)
+
+    def __str__(self):
+        return f"Payment provider unavailable, retry in {self.retry_after:.0f}s"
+
+
+class CircuitBreaker:
+    """Rolling-window error/latency breaker with open and half-open states."""
+
+    def __init__(self, *, window=None, min_calls=None, error_rate=None, slow_call_ms=None,
+                 slow_rate=None, cooldown=None):
+        self.window = window or getattr(settings, "PAYSTACK_BREAKER_WINDOW", 30)
+        self.min_calls = min_calls or getattr(settings, "PAYSTACK_BREAKER_MIN_CALLS", 10)
+        self.error_rate = error_rate or getattr(settings, "PAYSTACK_BREAKER_ERROR_RATE", 0.5)
+        self.slow_call_ms = slow_call_ms or getattr(settings, "PAYSTACK_BREAKER_SLOW_CALL_MS", 5000)
+        self.slow_rate = slow_rate or getattr(settings, "PAYSTACK_BREAKER_SLOW_RATE", 0.5)
+        self.cooldown = cooldown or getattr(settings, "PAYSTACK_BREAKER_COOLDOWN", 15)
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._calls = deque()  # (finished_at, failed, slow)
+        self._failed = 0
+        self._slow = 0
+        self._probe = None  # token of the probe in flight
+        self._probe_started = None
+        self._probe_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise `CircuitOpen` if the call may not go to Paystack now.
+
+        Returns a probe token when the call is the half-open probe (pass it
+        back to `record`), otherwise None.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return None
+            now = time.monotonic()
+            remaining = self.opened_at + self.cooldown - now
+            if self.state == OPEN and remaining <= 0:
+                self.state = HALF_OPEN
+            # A probe that never reported back (e.g. its worker died) is given up after one cooldown.
+            if self.state == HALF_OPEN and (self._probe is None or now - self._probe_started > self.cooldown):
+                self._probe = next(self._probe_ids)
+                self._probe_started = now
+                return self._probe
+            self.rejected += 1
+            raise CircuitOpen(max(remaining, 1))
+
+    def record(self, *, failed, elapsed_ms, probe=None):
+        """Record the outcome of a call let through by `before_call` (with its probe token, if any)."""
+        slow = elapsed_ms >= self.slow_call_ms
+        now = time.monotonic()
+        with self._lock:
+            if self.state != CLOSED:
+                # Only the current probe decides; calls let through before the breaker opened don't count.
+                if probe is None or probe != self._probe:
+                    return
+                self._probe = self._probe_started = None
+                if failed or slow:
+                    self._open(now)
+                else:
+                    self._reset()
+                return
+
+            self._calls.append((now, failed, slow))
+            self._failed += failed
+            self._slow += slow
+            self._prune(now)
+            calls = len(self._calls)
+            if self.state == CLOSED and calls >= self.min_calls and (
+                self._failed / calls >= self.error_rate or self._slow / calls >= self.slow_rate
+            ):
+                self._open(now)
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed here or in any process sharing the cache, or 0."""
+        with self._lock:
+            local = 0 if self.state == CLOSED else max(self.opened_at + self.cooldown - time.monotonic(), 0)
+        shared = max((cache.get(SHARED_OPEN_UNTIL_KEY) or 0) - time.time(), 0)
+        return max(local, shared)
+
+    def snapshot(self) -> dict:
+        """Current state and window rates, for the metrics endpoint."""
+        with self._lock:
+            self._prune(time.monotonic())
+            calls = len(self._calls)
+            return {
+                "state": self.state,
+                "window_calls": calls,
+                "error_rate": self._failed / calls if calls else 0.0,
+                "slow_rate": self._slow / calls if calls else 0.0,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
+
+    def _prune(self, now):
+        while self._calls and self._calls[0][0] < now - self.window:
+            _, failed, slow = self._calls.popleft()
+            self._failed -= failed
+            self._slow -= slow
+
+    def _open(self, now):
+        self.state = OPEN
+        self.opened_at = now
+        self.times_opened += 1
+        cache.set(SHARED_OPEN_UNTIL_KEY, time.time() + self.cooldown, self.cooldown)
+
+    def _reset(self):
+        self.state = CLOSED
+        self._calls.clear()
+        self._failed = self._slow = 0
+        cache.delete(SHARED_OPEN_UNTIL_KEY)
+
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+
+def get_breaker() -> CircuitBreaker:
+    """Return the process-wide Paystack `CircuitBreaker`."""
+    global _breaker
+    if _breaker is None:
+        with _breaker_lock:
+            if _breaker is None:
+                _breaker = CircuitBreaker()
+    return _breaker
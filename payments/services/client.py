@@ -0,0 +1,167 @@
+"""Shared HTTP client for the Paystack API.
+
+One `requests.Session` per process keeps a keep-alive connection pool, so
+calls reuse TCP+TLS connections instead of handshaking every time. Every call
+has connect/read timeouts, idempotent calls (GET, or anything that timed out
+while connecting) are retried a bounded number of times with full-jitter exponential
+backoff, and per-operation call/error/retry counters and latency histograms
+are kept. Every attempt goes through the shared `CircuitBreaker`, so a
+degraded provider makes calls fail fast with `CircuitOpen`.
+"""
+import bisect
+import logging
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from .breaker import CircuitOpen, get_breaker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.paystack.co"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Upper bounds (ms) of the latency histogram buckets; a final +Inf bucket catches the rest.
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class BaseClient:
+    """Settings, retry backoff, breaker and per-operation metrics shared by the sync and async clients."""
+
+    def __init__(self, *, base_url=None, secret_key=None, connect_timeout=None, read_timeout=None,
+                 max_retries=None, backoff=None, pool_size=None, breaker=None):
+        self.base_url = (base_url or getattr(settings, "PAYSTACK_BASE_URL", DEFAULT_BASE_URL)).rstrip("/")
+        self.connect_timeout = connect_timeout or getattr(settings, "PAYSTACK_CONNECT_TIMEOUT", 3.05)
+        self.read_timeout = read_timeout or getattr(settings, "PAYSTACK_READ_TIMEOUT", 15)
+        self.max_retries = getattr(settings, "PAYSTACK_MAX_RETRIES", 2) if max_retries is None else max_retries
+        self.backoff = backoff or getattr(settings, "PAYSTACK_RETRY_BACKOFF", 0.25)
+        self.pool_size = pool_size or getattr(settings, "PAYSTACK_POOL_SIZE", 20)
+        self.headers = {
+            "Authorization": f"Bearer {secret_key or settings.PAYSTACK_SECRET_KEY}",
+            "Content-Type": "application/json",
+        }
+        self.breaker = breaker or get_breaker()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _operation_stats(self, operation):
+        # Caller holds self._lock.
+        return self._stats.setdefault(operation, {
+            "calls": 0, "errors": 0, "retries": 0, "rejected": 0, "total_ms": 0.0, "max_ms": 0.0,
+            "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+        })
+
+    def _before_call(self, operation):
+        """Let the breaker veto the call, counting it against `operation` if it does; returns its probe token."""
+        try:
+            return self.breaker.before_call()
+        except CircuitOpen:
+            with self._lock:
+                self._operation_stats(operation)["rejected"] += 1
+            raise
+
+    def _retry_delay(self, operation, attempt, reason) -> float:
+        """Count a retry of `operation` and return the full-jitter delay before it."""
+        delay = random.uniform(0, self.backoff * (2 ** attempt))
+        logger.warning("Paystack %s failed (%s); retry %d in %.2fs", operation, reason, attempt + 1, delay)
+        with self._lock:
+            self._stats[operation]["retries"] += 1
+        return delay
+
+    def _record(self, operation, started, *, error, probe=None):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            stats = self._operation_stats(operation)
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            stats["buckets"][bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.breaker.record(failed=error, elapsed_ms=elapsed_ms, probe=probe)
+
+    def metrics(self) -> dict:
+        """Snapshot of per-operation counters (calls, errors, retries, rejected, latency).
+
+        ``buckets`` holds a count per `LATENCY_BUCKETS_MS` bound plus +Inf, not cumulative.
+        """
+        with self._lock:
+            return {
+                operation: {
+                    **stats,
+                    "buckets": list(stats["buckets"]),
+                    "avg_ms": stats["total_ms"] / stats["calls"] if stats["calls"] else 0.0,
+                }
+                for operation, stats in self._stats.items()
+            }
+
+
+class PaystackClient(BaseClient):
+    """Pooled, retrying Paystack HTTP client with per-operation counters."""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.timeout = (self.connect_timeout, self.read_timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(self.headers)
+
+    def request(self, method, path, *, operation, idempotent=None, **kwargs):
+        """Send a request to ``base_url + path`` and return the `requests.Response`.
+
+        Connect timeouts are always retried; idempotent calls are also retried on
+        other connection errors, read timeouts and 429/5xx responses. Raises
+        `CircuitOpen` without calling Paystack while the breaker is open.
+        """
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        url = f"{self.base_url}{path}"
+        kwargs.setdefault("timeout", self.timeout)
+
+        for attempt in range(self.max_retries + 1):
+            last = attempt == self.max_retries
+            probe = self._before_call(operation)
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                self._record(operation, started, error=True, probe=probe)
+                # A connect timeout never reached Paystack, so even a POST is safe to resend.
+                if last or not (idempotent or isinstance(exc, requests.ConnectTimeout)):
+                    raise
+                time.sleep(self._retry_delay(operation, attempt, exc))
+                continue
+
+            retryable = response.status_code in RETRY_STATUSES
+            self._record(operation, started, error=retryable or response.status_code >= 500, probe=probe)
+            if retryable and idempotent and not last:
+                time.sleep(self._retry_delay(operation, attempt, f"HTTP {response.status_code}"))
+                continue
+            return response
+
+    def get(self, path, *, operation, **kwargs):
+        return self.request("GET", path, operation=operation, **kwargs)
+
+    def post(self, path, *, operation, **kwargs):
+        return self.request("POST", path, operation=operation, **kwargs)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> PaystackClient:
+    """Return the process-wide `PaystackClient`, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = PaystackClient()
+    return _client
@@ -0,0 +1,60 @@
+"""Paystack client metrics for this process, as JSON or Prometheus text.
+
+Counters and latency histograms are summed over the sync client and every
+per-event-loop async client, alongside the circuit breaker state.
+"""
+from .async_client import async_clients
+from .breaker import get_breaker
+from .client import LATENCY_BUCKETS_MS, get_client
+
+COUNTERS = ("calls", "errors", "retries", "rejected")
+
+
+def provider_metrics() -> dict:
+    """``{"breaker": ..., "buckets_ms": [...], "operations": {operation: stats}}``."""
+    operations = {}
+    for client in [get_client(), *async_clients()]:
+        for operation, stats in client.metrics().items():
+            total = operations.setdefault(operation, {
+                **{name: 0 for name in COUNTERS}, "total_ms": 0.0, "max_ms": 0.0,
+                "buckets": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+            })
+            for name in COUNTERS:
+                total[name] += stats[name]
+            total["total_ms"] += stats["total_ms"]
+            total["max_ms"] = max(total["max_ms"], stats["max_ms"])
+            total["buckets"] = [a + b for a, b in zip(total["buckets"], stats["buckets"])]
+
+    for stats in operations.values():
+        stats["avg_ms"] = stats["total_ms"] / stats["calls"] if stats["calls"] else 0.0
+    return {"breaker": get_breaker().snapshot(), "buckets_ms": list(LATENCY_BUCKETS_MS), "operations": operations}
+
+
+def prometheus_text() -> str:
+    """`provider_metrics` in the Prometheus text exposition format."""
+    metrics = provider_metrics()
+    lines = [
+        "# HELP paystack_request_duration_seconds Paystack call latency per attempt.",
+        "# TYPE paystack_request_duration_seconds histogram",
+    ]
+    bounds = [f"{ms / 1000:g}" for ms in LATENCY_BUCKETS_MS] + ["+Inf"]
+    for operation, stats in sorted(metrics["operations"].items()):
+        cumulative = 0
+        for bound, count in zip(bounds, stats["buckets"]):
+            cumulative += count
+            lines.append(f'paystack_request_duration_seconds_bucket{{operation="{operation}",le="{bound}"}} {cumulative}')
+        lines.append(f'paystack_request_duration_seconds_sum{{operation="{operation}"}} {stats["total_ms"] / 1000:g}')
+        lines.append(f'paystack_request_duration_seconds_count{{operation="{operation}"}} {stats["calls"]}')
+
+    for name in COUNTERS[1:]:
+        lines.append(f"# TYPE paystack_{name}_total counter")
+        for operation, stats in sorted(metrics["operations"].items()):
+            lines.append(f'paystack_{name}_total{{operation="{operation}"}} {stats[name]}')
+
+    breaker = metrics["breaker"]
+    lines.append("# HELP paystack_circuit_open 1 while the Paystack circuit breaker is open or half-open.")
+    lines.append("# TYPE paystack_circuit_open gauge")
+    lines.append(f"paystack_circuit_open {int(breaker['state'] != 'closed')}")
+    lines.append("# TYPE paystack_circuit_opened_total counter")
+    lines.append(f"paystack_circuit_opened_total {breaker['times_opened']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,356 @@
+"""Batched payouts through Paystack's bulk transfer endpoint.
+
+The pipeline has three steps:
+
+1. `collect_batch` claims pending withdrawals from both `payments.Withdrawal`
+   and `wallet.Withdrawal` (pending means approved for payout), groups them
+   into a `PayoutBatch` and posts all their wallet debits with one
+   `TransactionManager.post_batch` call.
+2. `submit_batch` claims the batch's queued items (status ``submitting``),
+   resolves recipient codes and sends them to ``POST /transfer/bulk``, up to
+   `BULK_TRANSFER_LIMIT` transfers per call.
+3. `settle_transfers` applies the final ``transfer.success`` /
+   ``transfer.failed`` / ``transfer.reversed`` webhook events. Failed and
+   reversed items get their debit refunded with a ``payout_reversal`` posting.
+
+Every ledger posting is keyed by the item reference, so re-running any step
+never moves funds twice.
+"""
+import logging
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from payments.models import PayoutBatch, PayoutItem, Withdrawal
+from wallet.balances import InsufficientFunds
+from wallet.models import Transaction, Wallet
+from wallet.models import Withdrawal as WalletWithdrawal
+
+from .breaker import CircuitOpen
+from .client import get_client
+from .paystack import fetch_transfer_by_reference
+from .recipients import get_or_create_recipient
+
+logger = logging.getLogger(__name__)
+
+# Paystack accepts at most this many transfers per bulk request.
+BULK_TRANSFER_LIMIT = 100
+
+# Items left ``submitting`` this long (the run died mid-submit) may be claimed again.
+SUBMIT_CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# Bank codes that are mobile money wallets rather than bank accounts.
+MOBILE_MONEY_CODES = {"mtn", "vodafone", "tigo", "MTN", "VOD", "ATL"}
+
+
+def debit_key(reference) -> str:
+    return f"payout:{reference}"
+
+
+def reversal_key(reference) -> str:
+    return f"payout:{reference}:reversal"
+
+
+def collect_batch(*, limit: int = 1000):
+    """Claim up to `limit` pending withdrawals into a new `PayoutBatch`.
+
+    Withdrawals whose wallet cannot cover the amount (or that have no wallet)
+    are marked failed instead of batched. Returns the batch, or None when
+    nothing was pending.
+    """
+    with transaction.atomic():
+        payment_rows = list(
+            Withdrawal.objects.select_for_update(skip_locked=True)
+            .filter(status="pending")
+            .order_by("id")[:limit]
+        )
+        wallet_rows = list(
+            WalletWithdrawal.objects.select_for_update(skip_locked=True)
+            .filter(status="pending", provider_reference__isnull=True)
+            .order_by("id")[:max(limit - len(payment_rows), 0)]
+        )
+        if not payment_rows and not wallet_rows:
+            return None
+
+        wallets = {w.user_id: w for w in Wallet.objects.filter(user_id__in={w.user_id for w in payment_rows})}
+        wallets_by_id = {w.pk: w for w in Wallet.objects.filter(pk__in={w.wallet_id for w in wallet_rows})}
+        batch = PayoutBatch.objects.create()
+
+        items, failed = [], []
+        for withdrawal in payment_rows:
+            wallet = wallets.get(withdrawal.user_id)
+            if wallet is None:
+                failed.append(withdrawal)
+                continue
+            items.append(PayoutItem(
+                batch=batch, wallet=wallet, payment_withdrawal=withdrawal,
+                reference=withdrawal.reference, amount=withdrawal.amount,
+            ))
+        for withdrawal in wallet_rows:
+            items.append(PayoutItem(
+                batch=batch, wallet=wallets_by_id[withdrawal.wallet_id], wallet_withdrawal=withdrawal,
+                reference=f"wd_{withdrawal.uuid.hex[:24]}", amount=withdrawal.amount,
+                recipient_code=(withdrawal.metadata or {}).get("recipient_code", ""),
+            ))
+
+        items, rejected = _post_debits(items)
+        failed += [item.payment_withdrawal or item.wallet_withdrawal for item in rejected]
+
+        PayoutItem.objects.bulk_create(items)
+        batch.item_count = len(items)
+        batch.total_amount = sum((item.amount for item in items), Decimal("0"))
+        batch.save(update_fields=["item_count", "total_amount"])
+
+        Withdrawal.objects.filter(pk__in=[i.payment_withdrawal_id for i in items if i.payment_withdrawal_id]).update(status="processing")
+        for item in items:
+            if item.wallet_withdrawal_id:
+                item.wallet_withdrawal.provider = "paystack"
+                item.wallet_withdrawal.provider_reference = item.reference
+        WalletWithdrawal.objects.bulk_update(
+            [item.wallet_withdrawal for item in items if item.wallet_withdrawal_id], ["provider", "provider_reference"]
+        )
+        _mark_failed(failed)
+    return batch
+
+
+def _post_debits(items):
+    """Debit every item's wallet in one batch; on a shortfall, fall back to one posting per item.
+
+    Returns ``(posted_items, rejected_items)``.
+    """
+    def leg(item):
+        return {
+            "wallet": item.wallet,
+            "amount": item.amount,
+            "type": "withdrawal",
+            "metadata": {"reference": item.reference, "action": "payout"},
+            "idempotency_key": debit_key(item.reference),
+        }
+
+    try:
+        with transaction.atomic():
+            Transaction.objects.post_batch([leg(item) for item in items])
+        return items, []
+    except InsufficientFunds:
+        posted, rejected = [], []
+        for item in items:
+            try:
+                with transaction.atomic():
+                    Transaction.objects.post_batch([leg(item)])
+                posted.append(item)
+            except InsufficientFunds:
+                rejected.append(item)
+        return posted, rejected
+
+
+def _mark_failed(withdrawals):
+    now = timezone.now()
+    Withdrawal.objects.filter(pk__in=[w.pk for w in withdrawals if isinstance(w, Withdrawal)]).update(status="failed")
+    WalletWithdrawal.objects.filter(pk__in=[w.pk for w in withdrawals if isinstance(w, WalletWithdrawal)]).update(
+        status="failed", processed_at=now
+    )
+
+
+def _recipient_code(item):
+    """Recipient code for `item`, registering the account with Paystack only if it is new."""
+    if item.recipient_code:
+        return item.recipient_code
+    withdrawal = item.payment_withdrawal
+    if withdrawal is None:
+        raise ValueError("Withdrawal has no recipient_code in its metadata")
+    account_type = "mobile_money" if withdrawal.bank_code in MOBILE_MONEY_CODES else "nuban"
+    recipient, _ = get_or_create_recipient(
+        account_type, withdrawal.account_name, withdrawal.account_number, withdrawal.bank_code, user=withdrawal.user
+    )
+    return recipient.recipient_code
+
+
+def submit_batch(batch) -> dict:
+    """Send the queued items of `batch` to Paystack's bulk transfer endpoint.
+
+    Items are first claimed by moving them to ``submitting``, so concurrent
+    runs never send the same item. Items that cannot be submitted (no
+    recipient) are failed and refunded. When a bulk call fails or its
+    response leaves items out, each of those items is looked up by reference:
+    Paystack may have accepted the bulk before the call timed out locally, and
+    then rejects a resubmission as duplicate references. Items it holds are
+    marked sent; the rest (and everything while the circuit breaker is open)
+    go back in the queue so the submit can be retried. Returns counts by item
+    status.
+    """
+    items = _claim_items(batch)
+    errors, ready = [], []
+    for item in items:
+        try:
+            item.recipient_code = _recipient_code(item)
+            ready.append(item)
+        except CircuitOpen as e:
+            # Paystack is being short-circuited: keep the item queued for the next run.
+            errors.append(f"{item.reference}: {e}")
+        except Exception as e:
+            item.status, item.error = "failed", str(e)
+    _refund([item for item in items if item.status == "failed"])
+
+    client = get_client()
+    for offset in range(0, len(ready), BULK_TRANSFER_LIMIT):
+        chunk = ready[offset:offset + BULK_TRANSFER_LIMIT]
+        payload = {
+            "currency": "GHS",
+            "source": "balance",
+            "transfers": [
+                {
+                    "amount": int(item.amount * 100),  # GHS → pesewas
+                    "recipient": item.recipient_code,
+                    "reference": item.reference,
+                    "reason": "User Withdrawal",
+                }
+                for item in chunk
+            ],
+        }
+        sent_at = timezone.now()
+        try:
+            res = client.post("/transfer/bulk", json=payload, operation="bulk_transfer", idempotent=True)
+            res.raise_for_status()
+            body = res.json()
+        except CircuitOpen as e:
+            errors.append(str(e))
+            continue
+        except Exception as e:
+            logger.warning("Paystack bulk transfer failed for batch %s: %s", batch.uuid, e)
+            errors.append(str(e))
+            _recover_sent(chunk, sent_at, errors)
+            continue
+
+        results = {row.get("reference"): row for row in body.get("data") or []}
+        missing = []
+        for item in chunk:
+            row = results.get(item.reference)
+            if row is None:
+                missing.append(item)
+                continue
+            _mark_sent(item, row, sent_at)
+        _recover_sent(missing, sent_at, errors)
+
+    now = timezone.now()
+    for item in items:
+        item.updated_at = now
+    PayoutItem.objects.bulk_update(
+        items, ["recipient_code", "transfer_code", "status", "error", "updated_at", "submitted_at"]
+    )
+    batch.error = "\n".join(errors)
+    if not batch.items.filter(status__in=["queued", "submitting"]).exists():
+        batch.status = "submitted"
+        batch.submitted_at = timezone.now()
+    batch.save(update_fields=["status", "submitted_at", "error"])
+    _complete([item for item in items if item.status == "success"])
+
+    counts = {}
+    for item in items:
+        counts[item.status] = counts.get(item.status, 0) + 1
+    return counts
+
+
+def _mark_sent(item, row, sent_at):
+    item.transfer_code = row.get("transfer_code")
+    item.status = "success" if row.get("status") == "success" else "pending"
+    item.submitted_at = sent_at
+
+
+def _recover_sent(items, sent_at, errors):
+    """Mark the `items` Paystack already holds by reference as sent; leave the rest queued."""
+    for item in items:
+        try:
+            row = fetch_transfer_by_reference(item.reference)
+        except Exception as e:
+            errors.append(f"{item.reference}: lookup failed: {e}")
+            continue
+        if row is None:
+            errors.append(f"{item.reference}: not found at Paystack")
+            continue
+        _mark_sent(item, row, sent_at)
+
+
+def _claim_items(batch):
+    """Move the queued (or abandoned ``submitting``) items of `batch` to ``submitting`` and return them.
+
+    The returned items are reset to ``queued`` in memory; `submit_batch`
+    saves whatever status each ends up with.
+    """
+    now = timezone.now()
+    claimable = Q(status="queued") | Q(status="submitting", updated_at__lt=now - SUBMIT_CLAIM_TIMEOUT)
+    with transaction.atomic():
+        ids = list(batch.items.select_for_update(skip_locked=True).filter(claimable).values_list("pk", flat=True))
+        PayoutItem.objects.filter(claimable, pk__in=ids).update(status="submitting", updated_at=now)
+    items = list(
+        PayoutItem.objects.filter(pk__in=ids, status="submitting", updated_at=now)
+        .select_related("payment_withdrawal", "wallet_withdrawal", "wallet")
+    )
+    for item in items:
+        item.status = "queued"
+    return items
+
+
+def settle_transfers(events) -> set:
+    """Apply final transfer outcomes (``{reference: status}``). Returns references applied.
+
+    In-flight items take any final outcome; a successful item can still be
+    reversed by the provider later, which refunds it.
+    """
+    items = list(
+        PayoutItem.objects.filter(reference__in=list(events), status__in=["queued", "submitting", "pending", "success"])
+        .select_related("payment_withdrawal", "wallet_withdrawal", "wallet")
+    )
+    done, undone = [], []
+    now = timezone.now()
+    for item in items:
+        outcome = events[item.reference]
+        if item.status == "success" and outcome != "reversed":
+            continue
+        item.updated_at = now
+        if outcome == "success":
+            item.status = "success"
+            done.append(item)
+        elif outcome in ("failed", "reversed"):
+            item.status = outcome
+            undone.append(item)
+    PayoutItem.objects.bulk_update(done + undone, ["status", "updated_at"])
+    _complete(done)
+    _refund(undone)
+    return {item.reference for item in done + undone}
+
+
+def _complete(items):
+    now = timezone.now()
+    Withdrawal.objects.filter(pk__in=[i.payment_withdrawal_id for i in items if i.payment_withdrawal_id]).update(status="successful")
+    WalletWithdrawal.objects.filter(pk__in=[i.wallet_withdrawal_id for i in items if i.wallet_withdrawal_id]).update(
+        status="completed", processed_at=now
+    )
+    _close_batches(items)
+
+
+def _refund(items):
+    """Give failed or reversed items their wallet debit back, in one batch."""
+    if not items:
+        return
+    Transaction.objects.post_batch([
+        {
+            "wallet": item.wallet,
+            "amount": item.amount,
+            "type": "payout_reversal",
+            "metadata": {"reference": f"{item.reference}-reversal", "action": "payout"},
+            "idempotency_key": reversal_key(item.reference),
+        }
+        for item in items
+    ])
+    _mark_failed([item.payment_withdrawal or item.wallet_withdrawal for item in items])
+    _close_batches(items)
+
+
+def _close_batches(items):
+    """Mark submitted batches of `items` completed once none of their items is still in flight."""
+    PayoutBatch.objects.filter(pk__in={i.batch_id for i in items}, status="submitted").exclude(
+        items__status__in=["queued", "submitting", "pending"]
+    ).update(status="completed")
@@ -1,12 +1,29 @@
+import threading
+import time
 import uuid
+from concurrent.futures import Future
+from datetime import timedelta
 from decimal import Decimal
-import requests
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
 from payments.models import Payment
-from wallet.models import Wallet
+from payments.services.client import get_client
+from payments.services.webhooks import deposit_key
+from wallet.models import Transaction, Wallet
 
 
-BASE_URL = "https://api.paystack.co"
+BASE_URL = settings.PAYSTACK_BASE_URL
+
+# Paystack transaction statuses that never change again ("success" can still be reversed).
+FINAL_STATUSES = {"failed", "abandoned", "reversed"}
+
+# Seconds between claim checks while another process verifies the same reference.
+VERIFY_LOCK_POLL = 0.05
+
+_inflight = {}
+_inflight_lock = threading.Lock()
 
 
 def initialize_payment(user, amount):
@@ -23,15 +40,23 @@ def initialize_payment(user, amount):
     Returns:
         dict: Paystack API response as JSON.
     """
-    amount_in_pesewas = int(amount) * 100  # convert GHS → pesewas
-    reference = str(uuid.uuid4()).replace("-", "")[:12]
+    data = payment_payload(user, amount)
+    r = get_client().post("/transaction/initialize", json=data, operation="initialize_payment")
+    res = r.json()
 
-    headers = {
-        "Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}",
-        "Content-Type": "application/json",
-    }
+    if res.get("status"):
+        # Save pending payment record in DB
+        Payment.objects.create(user=user, amount=Decimal(amount), reference=data["reference"])
 
-    data = {
+    return res
+
+
+def payment_payload(user, amount):
+    """Build the /transaction/initialize body with a fresh reference."""
+    amount_in_pesewas = int(Decimal(amount) * 100)  # convert GHS → pesewas
+    reference = str(uuid.uuid4()).replace("-", "")[:12]
+
+    return {
         "email": user.email,
         "amount": amount_in_pesewas,
         "currency": "GHS",
@@ -39,15 +64,6 @@ def initialize_payment(user, amount):
         "callback_url": "http://127.0.0.1:8000/api/payments/verify/",
     }
 
-    r = requests.post(f"{BASE_URL}/transaction/initialize", json=data, headers=headers)
-    res = r.json()
-
-    if res.get("status"):
-        # Save pending payment record in DB
-        Payment.objects.create(user=user, amount=Decimal(amount), reference=reference)
-
-    return res
-
 
 def verify_payment(reference):
     """
@@ -55,7 +71,12 @@ def verify_payment(reference):
 
     Fetches the payment status from Paystack using the reference, and updates:
     - Payment model (success/failed)
-    - User's Wallet balance (if success)
+    - User's Wallet balance (if success), via a ledger deposit keyed by reference
+
+    Verification is single-flight per reference: concurrent callers in this
+    process share one provider call and settlement, other processes wait on a
+    claim held on the Payment row and reuse the response recorded there, and
+    recent results are cached so later calls return without reaching Paystack.
 
     Args:
         reference (str): Unique transaction reference generated at initialization.
@@ -63,37 +84,135 @@ def verify_payment(reference):
     Returns:
         dict: Contains Paystack response and local status code (200 or 404).
     """
-    headers = {"Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}"}
-    r = requests.get(f"{BASE_URL}/transaction/verify/{reference}", headers=headers)
-    res = r.json()
+    result = cache.get(verify_result_key(reference))
+    if result is not None:
+        return result
+
+    with _inflight_lock:
+        future = _inflight.get(reference)
+        leader = future is None
+        if leader:
+            future = _inflight[reference] = Future()
+    if not leader:
+        return future.result()
+
+    try:
+        result = _verify_once(reference)
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _inflight_lock:
+            _inflight.pop(reference, None)
+
+
+def verify_result_key(reference):
+    return f"paystack:verify:{reference}"
+
+
+def claim_verification(reference, since):
+    """Take the verification claim on `reference`, unless a result is already available.
+
+    Returns ``(True, None)`` once claimed, ``(False, result)`` when the payment
+    is unknown or another process settled it after `since`, and ``(False,
+    None)`` while someone else holds the claim. The claim is a conditional
+    UPDATE on the Payment row, so it holds across processes; it lapses after
+    ``PAYSTACK_VERIFY_LOCK_TIMEOUT`` seconds.
+    """
+    payments = Payment.objects.filter(reference=reference)
+    now = timezone.now()
+    claimed = (
+        payments.filter(Q(verify_claimed_until__isnull=True) | Q(verify_claimed_until__lt=now))
+        .exclude(verified_at__gte=since)
+        .update(verify_claimed_until=now + timedelta(seconds=settings.PAYSTACK_VERIFY_LOCK_TIMEOUT))
+    )
+    if claimed:
+        return True, None
+
+    payment = payments.values("verification", "verified_at").first()
+    if payment is None:
+        return False, {"error": "Payment not found", "status_code": 404}
+    if payment["verified_at"] is not None and payment["verified_at"] >= since:
+        return False, {"response": payment["verification"], "status_code": 200}
+    return False, None
+
+
+def release_verification(reference):
+    Payment.objects.filter(reference=reference).update(verify_claimed_until=None)
+
+
+def _verify_once(reference):
+    """One provider call and settlement for `reference`, holding the cross-process claim."""
+    since = timezone.now()
+    deadline = time.monotonic() + settings.PAYSTACK_VERIFY_LOCK_TIMEOUT
+    claimed, result = claim_verification(reference, since)
+    while not claimed and result is None and time.monotonic() < deadline:
+        time.sleep(VERIFY_LOCK_POLL)
+        claimed, result = claim_verification(reference, since)
+    if result is not None:
+        return result
+    # Past the deadline we verify anyway; the ledger key still prevents a second credit.
 
+    try:
+        r = get_client().get(f"/transaction/verify/{reference}", operation="verify_payment")
+        return settle_verification(reference, r.json())
+    finally:
+        if claimed:
+            release_verification(reference)
+
+
+def settle_verification(reference, res):
+    """`apply_verification`, record the response for waiting processes and cache it while it holds.
+
+    Failed, abandoned and reversed transactions never change again and are
+    cached for ``PAYSTACK_VERIFY_RESULT_TTL``; a success can still be
+    reversed, so it is only reused for ``PAYSTACK_VERIFY_SUCCESS_TTL``.
+    """
+    result = apply_verification(reference, res)
+    if "error" in result:
+        return result
+    Payment.objects.filter(reference=reference).update(verification=res, verified_at=timezone.now())
+
+    data = (result.get("response") or {}).get("data") or {}
+    if data.get("status") in FINAL_STATUSES:
+        cache.set(verify_result_key(reference), result, settings.PAYSTACK_VERIFY_RESULT_TTL)
+    elif data.get("status") == "success":
+        cache.set(verify_result_key(reference), result, settings.PAYSTACK_VERIFY_SUCCESS_TTL)
+    return result
+
+
+def apply_verification(reference, res):
+    """Record a Paystack verify response against the local Payment and wallet."""
     try:
         payment = Payment.objects.get(reference=reference)
     except Payment.DoesNotExist:
         return {"error": "Payment not found", "status_code": 404}
 
+    payments = Payment.objects.filter(pk=payment.pk)
     if res["data"]["status"] == "success":
-        payment.status = "success"
-        payment.save()
+        payments.exclude(status="success").update(status="success")
 
         wallet, _ = Wallet.objects.get_or_create(user=payment.user)
-        wallet.balance += Decimal(res["data"]["amount"]) / Decimal(100)  # convert pesewas → GHS
-        wallet.save()
+        # Same key as the webhook inbox, so a payment seen by both is credited once.
+        Transaction.objects.create_transaction(
+            wallet=wallet,
+            amount=Decimal(res["data"]["amount"]) / Decimal(100),  # convert pesewas → GHS
+            type="deposit",
+            metadata={"reference": reference, "source": "paystack_verify"},
+            idempotency_key=deposit_key(reference),
+        )
     else:
-        payment.status = "failed"
-        payment.save()
+        # Conditional, so a payment the webhook already settled is never undone.
+        payments.exclude(status="success").update(status="failed")
 
     return {"response": res, "status_code": 200}
 
 
 def create_transfer_recipient(account_type, name, account_number, service_provider):
     """Create a transfer recipient"""
-    url = f"{BASE_URL}/transferrecipient"
-    headers = {
-        "Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}",
-        "Content-Type": "application/json",
-    }
-
     payload = {
         "type": account_type,
         "name": name,
@@ -103,7 +222,7 @@ def create_transfer_recipient(account_type, name, account_number, service_provid
     }
 
 
-    res = requests.post(url, headers=headers, json=payload)
+    res = get_client().post("/transferrecipient", json=payload, operation="create_transfer_recipient")
 
     try:
         res.raise_for_status()
@@ -114,22 +233,18 @@ def create_transfer_recipient(account_type, name, account_number, service_provid
     return res.json()["data"]["recipient_code"]
 
 
-def initiate_transfer(amount, recipient_code, reference):
-    url = f"{BASE_URL}/transfer"
-    headers = {
-        "Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}",
-        "Content-Type": "application/json"
-    }
+def initiate_transfer(amount, recipient, reference):
+    """Send `amount` GHS to `recipient` (a recipient code or a stored `TransferRecipient`)"""
     data = {
         "source": "balance",
         "amount": int(float(amount) * 100),  # GHS → pesewas
-        "recipient": recipient_code,
+        "recipient": getattr(recipient, "recipient_code", recipient),
         "reference": reference,
         "reason": "User Withdrawal",
         "currency": "GHS"
     }
 
-    res = requests.post(url, json=data, headers=headers)
+    res = get_client().post("/transfer", json=data, operation="initiate_transfer")
 
     try:
         res.raise_for_status()
@@ -140,6 +255,15 @@ def initiate_transfer(amount, recipient_code, reference):
     return res.json()
 
 
+def fetch_transfer_by_reference(reference):
+    """Return the transfer Paystack holds under `reference`, or None if it has none."""
+    res = get_client().get(f"/transfer/verify/{reference}", operation="verify_transfer_reference")
+    if res.status_code == 404:
+        return None
+    res.raise_for_status()
+    return res.json().get("data")
+
+
 """def verify_transfer(ref, *args, **kwargs):
     url = f"{BASE_URL}/transfer"
     headers = {
@@ -157,35 +281,36 @@ def initiate_transfer(amount, recipient_code, reference):
 """
 class Paystack:
     PAYSTACK_SECRET_KEY = settings.PAYSTACK_SECRET_KEY
-    base_url = "https://api.paystack.co"
+    base_url = BASE_URL
 
     def __init__(self):
         self.headers = {
             "Authorization": f"Bearer {self.PAYSTACK_SECRET_KEY}",
             "Content-Type": "application/json",
         }
+        self.client = get_client()
 
     # Existing payment verification method
 
     def get_banks(self, country='ghana'):
         """Get list of supported banks in Ghana"""
-        path = f'/bank?country={country}'
-        url = self.base_url + path
-        response = requests.get(url, headers=self.headers)
+        response = self.client.get('/bank', params={'country': country}, operation='get_banks')
         return response.json()
 
     def verify_transfer(self, transfer_code):
         """Verify transfer status"""
-        path = f'/transfer/{transfer_code}'
-        url = self.base_url + path
-        response = requests.get(url, headers=self.headers)
+        response = self.client.get(f'/transfer/{transfer_code}', operation='verify_transfer')
         return response.json()
 
-    def list_transfers(self, per_page=50, page=1):
-        """List all transfers"""
-        path = f'/transfer?perPage={per_page}&page={page}'
-        url = self.base_url + path
-        response = requests.get(url, headers=self.headers)
+    def list_transfers(self, per_page=50, page=1, start=None, end=None):
+        """List all transfers, optionally only those created between `start` and `end`"""
+        params = {'perPage': per_page, 'page': page}
+        if start:
+            params['from'] = start.isoformat()
+        if end:
+            params['to'] = end.isoformat()
+        response = self.client.get('/transfer', params=params, operation='list_transfers')
+        response.raise_for_status()
         return response.json()
 
 
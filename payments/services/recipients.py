@@ -0,0 +1,52 @@
+"""Local store of Paystack transfer recipients.
+
+`get_or_create_recipient` answers from `TransferRecipient` first and only
+calls ``POST /transferrecipient`` for an account the user has never
+registered. Recipients belong to the user who added them, so transfer views
+can authorize by ``created_by``. Creation is single-flight per
+(user, type, account_number, bank_code): concurrent
+callers in one process wait on the key's lock stripe and then find the stored
+row, and the unique constraint settles races between processes.
+"""
+import threading
+
+from django.db import IntegrityError, transaction
+
+from payments.models import TransferRecipient
+
+from .paystack import create_transfer_recipient
+
+# Fixed pool of locks shared by hashing the key, so memory stays bounded however
+# many accounts are registered; unrelated keys rarely share a stripe.
+LOCK_STRIPES = 64
+_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+
+def _lock_for(key) -> threading.Lock:
+    return _locks[hash(key) % LOCK_STRIPES]
+
+
+def get_or_create_recipient(account_type, name, account_number, bank_code, *, user=None):
+    """Return ``(recipient, created)`` for `user`'s account, registering it with Paystack at most once."""
+    key = (getattr(user, "pk", None), account_type, str(account_number), str(bank_code))
+    lookup = dict(zip(("created_by_id", "type", "account_number", "bank_code"), key))
+
+    recipient = TransferRecipient.objects.filter(**lookup).first()
+    if recipient is not None:
+        return recipient, False
+
+    with _lock_for(key):
+        # Another thread may have created it while we waited.
+        recipient = TransferRecipient.objects.filter(**lookup).first()
+        if recipient is not None:
+            return recipient, False
+
+        recipient_code = create_transfer_recipient(account_type, name, account_number, bank_code)
+        try:
+            with transaction.atomic():
+                return TransferRecipient.objects.create(
+                    **lookup, name=name, recipient_code=recipient_code
+                ), True
+        except IntegrityError:
+            # Another process stored the same account first.
+            return TransferRecipient.objects.get(**lookup), False
@@ -0,0 +1,161 @@
+"""Reconcile local withdrawals against Paystack's transfer listing.
+
+`fetch_transfers` reads page 1 of ``GET /transfer`` to learn the page count,
+then fetches the remaining pages concurrently on a bounded thread pool (the
+pooled client is thread-safe) and indexes every transfer by reference.
+`diff` walks the withdrawals Paystack accepted once, popping their provider
+row from the index, so the comparison is O(local + provider). Local rows are
+windowed on their submission time and the provider listing is fetched with
+`WINDOW_PADDING` on both sides, so clock skew between the two never turns a
+boundary transfer into a mismatch. `fix` applies provider
+outcomes through `payouts.settle_transfers` (refunding failed items) or, for
+withdrawals outside the payout pipeline, by updating their status.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from payments.models import PayoutItem, Withdrawal
+from wallet.models import Withdrawal as WalletWithdrawal
+
+from .paystack import Paystack
+from .payouts import settle_transfers
+
+PAGE_SIZE = 100
+
+# Extra provider listing fetched around the window, covering skew between our
+# submission time and Paystack's ``createdAt``.
+WINDOW_PADDING = timedelta(minutes=15)
+
+# Paystack transfer status -> final outcome ("success" / "failed" / "reversed"), or None while in flight.
+PROVIDER_OUTCOMES = {
+    "success": "success",
+    "failed": "failed",
+    "reversed": "reversed",
+    "abandoned": "failed",
+    "blocked": "failed",
+    "rejected": "failed",
+}
+
+# Local statuses per outcome, for each withdrawal model.
+LOCAL_STATUSES = {
+    "payments": {"success": "successful", "failed": "failed", "reversed": "failed"},
+    "wallet": {"success": "completed", "failed": "failed", "reversed": "failed"},
+}
+
+
+def fetch_transfers(*, start=None, end=None, concurrency: int = 8) -> dict:
+    """Return ``{reference: transfer}`` for every Paystack transfer between `start` and `end`, padded."""
+    start = start - WINDOW_PADDING if start else None
+    end = end + WINDOW_PADDING if end else None
+    paystack = Paystack()
+    first = paystack.list_transfers(per_page=PAGE_SIZE, page=1, start=start, end=end)
+    pages = [first]
+    page_count = (first.get("meta") or {}).get("pageCount") or 1
+    if page_count > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            pages += pool.map(
+                lambda page: paystack.list_transfers(per_page=PAGE_SIZE, page=page, start=start, end=end),
+                range(2, page_count + 1),
+            )
+
+    index = {}
+    for page in pages:
+        for row in page.get("data") or []:
+            if row.get("reference"):
+                index[row["reference"]] = row
+    return index
+
+
+def _local_rows(start, end):
+    """Yield ``(kind, reference, withdrawal)`` for withdrawals Paystack accepted in the window.
+
+    Queued items and items failed before submission never reached Paystack,
+    so only payout items with a submission time are considered.
+    """
+    rows = PayoutItem.objects.filter(submitted_at__isnull=False).select_related(
+        "payment_withdrawal", "wallet_withdrawal"
+    )
+    if start:
+        rows = rows.filter(submitted_at__gte=start)
+    if end:
+        rows = rows.filter(submitted_at__lt=end)
+    for item in rows.order_by("pk").iterator(chunk_size=2000):
+        if item.payment_withdrawal_id:
+            yield "payments", item.reference, item.payment_withdrawal
+        else:
+            yield "wallet", item.reference, item.wallet_withdrawal
+
+
+def _in_window(row, start, end) -> bool:
+    """Whether a provider row was created in ``[start, end)``; rows without a timestamp count as inside."""
+    created = parse_datetime(row.get("createdAt") or "")
+    if created is None:
+        return True
+    return (start is None or start <= created) and (end is None or created < end)
+
+
+def diff(index: dict, *, start=None, end=None):
+    """Yield mismatches between local withdrawals and the provider `index`.
+
+    Each item is ``{"kind": ..., "reference": ..., "problem": ..., "local": ...,
+    "provider": ...}`` where problem is ``missing_at_provider``, ``status``,
+    ``amount`` or ``missing_locally``. `index` is consumed; provider rows
+    left over from the padding are not reported.
+    """
+    for kind, reference, withdrawal in _local_rows(start, end):
+        row = index.pop(reference, None)
+        if row is None:
+            yield {"kind": kind, "reference": reference, "problem": "missing_at_provider",
+                   "local": withdrawal.status, "provider": None}
+            continue
+
+        amount = Decimal(row.get("amount") or 0) / Decimal(100)  # pesewas → GHS
+        if amount != withdrawal.amount:
+            yield {"kind": kind, "reference": reference, "problem": "amount",
+                   "local": str(withdrawal.amount), "provider": str(amount)}
+
+        outcome = PROVIDER_OUTCOMES.get(row.get("status"))
+        if outcome and LOCAL_STATUSES[kind][outcome] != withdrawal.status:
+            yield {"kind": kind, "reference": reference, "problem": "status",
+                   "local": withdrawal.status, "provider": row.get("status")}
+
+    for reference, row in index.items():
+        if not _in_window(row, start, end):
+            continue
+        yield {"kind": None, "reference": reference, "problem": "missing_locally",
+               "local": None, "provider": row.get("status")}
+
+
+def fix(mismatches) -> int:
+    """Bring local statuses in line with the provider for ``status`` mismatches. Returns rows fixed.
+
+    A payout item marked failed locally but paid by Paystack has already been
+    refunded, so it is left for manual review rather than flipped.
+    """
+    outcomes = {
+        item["reference"]: (item["kind"], PROVIDER_OUTCOMES[item["provider"]])
+        for item in mismatches
+        if item["problem"] == "status"
+    }
+    if not outcomes:
+        return 0
+
+    # Withdrawals in the payout pipeline settle (and refund) through it.
+    settled = settle_transfers({reference: outcome for reference, (_, outcome) in outcomes.items()})
+    fixed = len(settled)
+
+    now = timezone.now()
+    in_pipeline = set(PayoutItem.objects.filter(reference__in=list(outcomes)).values_list("reference", flat=True))
+    for reference, (kind, outcome) in outcomes.items():
+        if reference in settled or reference in in_pipeline:
+            continue
+        status = LOCAL_STATUSES[kind][outcome]
+        if kind == "payments":
+            fixed += Withdrawal.objects.filter(reference=reference).update(status=status)
+        else:
+            fixed += WalletWithdrawal.objects.filter(provider_reference=reference).update(status=status, processed_at=now)
+    return fixed
@@ -0,0 +1,157 @@
+"""Paystack webhook inbox: O(1) ingestion, batched settlement.
+
+The webhook view only checks the HMAC signature and stores the raw event
+(`record_event`). `drain_inbox` then claims pending events in batches,
+dedupes them by reference and posts every successful charge as a ``deposit``
+through `TransactionManager.post_batch`. Transfer outcomes are handed to
+`payouts.settle_transfers`. Each deposit's idempotency key is
+``paystack:<reference>``, the same key `verify_payment` uses, so a payment
+settled by both paths is credited once.
+"""
+import hashlib
+import hmac
+import json
+import logging
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from payments.models import Payment, PaystackWebhookEvent
+from wallet.models import Transaction, Wallet
+
+logger = logging.getLogger(__name__)
+
+SETTLED_EVENTS = {"charge.success"}
+# Final payout outcomes, applied by `payouts.settle_transfers`.
+TRANSFER_EVENTS = {"transfer.success": "success", "transfer.failed": "failed", "transfer.reversed": "reversed"}
+
+
+def deposit_key(reference) -> str:
+    """Ledger idempotency key of the deposit for a Paystack charge."""
+    return f"paystack:{reference}"
+
+
+def verify_signature(body: bytes, signature: str) -> bool:
+    """Check the ``X-Paystack-Signature`` header (HMAC-SHA512 of the raw body)."""
+    if not signature:
+        return False
+    expected = hmac.new(settings.PAYSTACK_SECRET_KEY.encode(), body, hashlib.sha512).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def record_event(body: bytes) -> PaystackWebhookEvent:
+    """Store a raw webhook event in the inbox. Raises ``ValueError`` on malformed JSON."""
+    payload = json.loads(body)
+    if not isinstance(payload, dict):
+        raise ValueError("Webhook payload must be a JSON object")
+    data = payload.get("data") or {}
+    return PaystackWebhookEvent.objects.create(
+        event=str(payload.get("event", ""))[:100],
+        reference=(str(data["reference"])[:100] if isinstance(data, dict) and data.get("reference") else None),
+        payload=payload,
+    )
+
+
+def drain_inbox(*, batch_size: int = 500, max_batches: int = None) -> dict:
+    """Process pending inbox events in batches until the inbox is empty.
+
+    Returns counts of events by outcome (``processed``, ``duplicate``,
+    ``ignored``, ``failed``).
+    """
+    totals = {"processed": 0, "duplicate": 0, "ignored": 0, "failed": 0}
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            events = list(
+                PaystackWebhookEvent.objects.select_for_update(skip_locked=True)
+                .filter(status="pending")
+                .order_by("id")[:batch_size]
+            )
+            if not events:
+                break
+            try:
+                with transaction.atomic():
+                    outcomes = _process(events)
+            except Exception:
+                logger.exception("Paystack webhook batch failed; retrying events one by one")
+                outcomes = {}
+                for event in events:
+                    try:
+                        with transaction.atomic():
+                            outcomes.update(_process([event]))
+                    except Exception as e:
+                        outcomes[event.pk] = ("failed", str(e))
+            _finish(events, outcomes)
+
+        for status, _ in outcomes.values():
+            totals[status] += 1
+        batches += 1
+    return totals
+
+
+def _process(events) -> dict:
+    """Settle a batch of events. Returns ``{event_id: (status, error)}``."""
+    from .payouts import settle_transfers
+
+    outcomes = {}
+    charges = {}
+    failed_refs = set()
+    transfers = {}
+    for event in events:
+        if event.event in SETTLED_EVENTS and event.reference:
+            if event.reference in charges:
+                outcomes[event.pk] = ("duplicate", "")
+            else:
+                charges[event.reference] = event
+        elif event.event == "charge.failed" and event.reference:
+            failed_refs.add(event.reference)
+            outcomes[event.pk] = ("processed", "")
+        elif event.event in TRANSFER_EVENTS and event.reference:
+            transfers.setdefault(event.reference, []).append(event)
+        else:
+            outcomes[event.pk] = ("ignored", "")
+
+    payments = {p.reference: p for p in Payment.objects.filter(reference__in=[*charges, *failed_refs])}
+    for reference, event in charges.items():
+        if reference not in payments:
+            outcomes[event.pk] = ("failed", "Payment not found")
+        elif event.payload["data"].get("status") != "success":
+            outcomes[event.pk] = ("ignored", "")
+    settled = {ref: event for ref, event in charges.items() if event.pk not in outcomes}
+
+    user_ids = {payments[ref].user_id for ref in settled}
+    wallets = {w.user_id: w for w in Wallet.objects.filter(user_id__in=user_ids)}
+    for user_id in user_ids - wallets.keys():
+        wallets[user_id], _ = Wallet.objects.get_or_create(user_id=user_id)
+
+    Transaction.objects.post_batch([
+        {
+            "wallet": wallets[payments[ref].user_id],
+            "amount": Decimal(event.payload["data"]["amount"]) / Decimal(100),  # convert pesewas → GHS
+            "type": "deposit",
+            "metadata": {"reference": ref, "source": "paystack_webhook"},
+            "idempotency_key": deposit_key(ref),
+        }
+        for ref, event in settled.items()
+    ])
+    Payment.objects.filter(reference__in=list(settled)).update(status="success")
+    Payment.objects.filter(reference__in=list(failed_refs), status="pending").update(status="failed")
+
+    for event in settled.values():
+        outcomes[event.pk] = ("processed", "")
+
+    matched = settle_transfers({ref: TRANSFER_EVENTS[evts[-1].event] for ref, evts in transfers.items()})
+    for ref, evts in transfers.items():
+        for event in evts:
+            outcomes[event.pk] = ("processed", "") if ref in matched else ("ignored", "")
+    return outcomes
+
+
+def _finish(events, outcomes):
+    now = timezone.now()
+    for event in events:
+        event.status, event.error = outcomes[event.pk]
+        event.processed_at = now
+    PaystackWebhookEvent.objects.bulk_update(events, ["status", "error", "processed_at"])
@@ -0,0 +1,123 @@
+"""Celery tasks for Paystack calls made on behalf of API requests.
+
+Each task returns ``{"status_code": ..., "body": ...}``, which is the response
+the synchronous view used to send, so `TaskStatusView` can replay it when the
+client polls. Connection failures, timeouts and an open circuit breaker are
+retried with backoff only where a repeat is harmless: verification and
+recipient creation are idempotent, and Paystack rejects a second transfer with
+the same reference.
+Finished verifications and transfers are also pushed to the user as a
+notification. Task owners are stored in `PaymentTask` rather than the cache,
+since the process polling a task is rarely the one that enqueued it.
+"""
+from datetime import timedelta
+
+import requests
+from celery import shared_task
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.utils import timezone
+
+from notifications.utils import create_notification
+
+from .models import PaymentTask
+from .services.breaker import CircuitOpen
+from .services.paystack import fetch_transfer_by_reference, initialize_payment, initiate_transfer, verify_payment
+from .services.recipients import get_or_create_recipient
+
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, CircuitOpen)
+RETRY_OPTIONS = {
+    "autoretry_for": TRANSIENT_ERRORS,
+    "retry_backoff": True,
+    "retry_jitter": True,
+    "max_retries": 3,
+    "acks_late": True,
+}
+
+
+def remember_owner(task_id, user):
+    """Record who enqueued `task_id` so only they can poll it; forgets owners of expired results."""
+    expired = timezone.now() - timedelta(seconds=settings.CELERY_RESULT_EXPIRES)
+    PaymentTask.objects.filter(created_at__lt=expired).delete()
+    PaymentTask.objects.create(task_id=task_id, user=user)
+
+
+def task_owner(task_id):
+    """Primary key of the user who enqueued `task_id`, or None if unknown or expired."""
+    expired = timezone.now() - timedelta(seconds=settings.CELERY_RESULT_EXPIRES)
+    return (
+        PaymentTask.objects.filter(task_id=task_id, created_at__gte=expired)
+        .values_list("user_id", flat=True)
+        .first()
+    )
+
+
+def _response(body, status_code):
+    return {"status_code": status_code, "body": body}
+
+
+def _notify(user_id, title, message):
+    if user_id is None:
+        return
+    user = get_user_model().objects.filter(pk=user_id).first()
+    if user is not None:
+        create_notification(user, title, message)
+
+
+@shared_task
+def initialize_payment_task(user_id, amount):
+    """Create the Paystack checkout for a deposit. Not retried: a repeat would open a second checkout."""
+    user = get_user_model().objects.get(pk=user_id)
+    res = initialize_payment(user, amount)
+    return _response(res, 200 if res.get("status") else 400)
+
+
+@shared_task(**RETRY_OPTIONS)
+def verify_payment_task(reference, user_id=None):
+    """Verify a payment and credit the wallet on success."""
+    result = verify_payment(reference)
+    if "error" in result:
+        return _response({"error": result["error"]}, result["status_code"])
+
+    outcome = (result["response"].get("data") or {}).get("status")
+    _notify(user_id, "Payment verified", f"Payment {reference} is {outcome}.")
+    return _response(result["response"], result["status_code"])
+
+
+@shared_task(**RETRY_OPTIONS)
+def initiate_transfer_task(amount, recipient_code, reference, user_id=None):
+    """Send a transfer. `reference` is fixed by the caller so retries cannot pay twice.
+
+    A rejected request is checked against Paystack by reference before it is
+    reported: a retry after a timeout is refused as a duplicate when the first
+    attempt was in fact accepted, and that transfer is the result.
+    """
+    try:
+        transfer_data = initiate_transfer(amount, recipient_code, reference)
+    except TRANSIENT_ERRORS:
+        raise
+    except Exception as e:
+        existing = fetch_transfer_by_reference(reference)
+        if existing is None:
+            return _response({"error": str(e)}, 400)
+        transfer_data = {"status": True, "message": "Transfer has been queued", "data": existing}
+
+    _notify(user_id, "Transfer initiated", f"Transfer {reference} of {amount} GHS has been sent to Paystack.")
+    return _response({"message": "Transfer initiated", "reference": reference, "data": transfer_data}, 200)
+
+
+@shared_task(**RETRY_OPTIONS)
+def create_recipient_task(account_type, name, account_number, bank_code, user_id=None):
+    """Register (or look up) a transfer recipient."""
+    user = get_user_model().objects.filter(pk=user_id).first() if user_id is not None else None
+    try:
+        recipient, created = get_or_create_recipient(account_type, name, account_number, bank_code, user=user)
+    except TRANSIENT_ERRORS:
+        raise
+    except Exception as e:
+        return _response({"status": "error", "details": str(e)}, 400)
+
+    return _response(
+        {"status": "success", "recipient_code": recipient.recipient_code, "recipient_id": recipient.id},
+        201 if created else 200,
+    )
@@ -6,13 +6,27 @@ from .views import (
     CreateMobileMoneyRecipientView,
     GetBanksView,
     InitiateTransferView,
+    QueueWithdrawalView,
+    PaystackWebhookView,
+    TaskStatusView,
+    ProviderMetricsView,
     # VerifyTransferView,
 )
+from .async_views import (
+    AsyncInitPaymentView,
+    AsyncVerifyPaymentView,
+    AsyncVerifyManyPaymentsView,
+    AsyncGetBanksView,
+)
 
 urlpatterns = [
     # 🔹 Payments
     path("init/", InitPaymentView.as_view(), name="init-payment"),
     path("verify/", VerifyPaymentView.as_view(), name="verify-payment"),
+    path("webhook/", PaystackWebhookView.as_view(), name="paystack-webhook"),
+    path("tasks/<str:task_id>/", TaskStatusView.as_view(), name="payment-task"),
+    path("metrics/", ProviderMetricsView.as_view(), name="provider-metrics"),
+    path("metrics/prometheus/", ProviderMetricsView.as_view(), {"prometheus": True}, name="provider-metrics-prometheus"),
 
     # 🔹 Recipients
     path("create-bank-recipient/", CreateBankRecipientView.as_view(), name="create-bank-recipient"),
@@ -23,5 +37,12 @@ urlpatterns = [
 
     # 🔹 Transfers
     path("initiate-transfer/", InitiateTransferView.as_view(), name="init-transfer"),
+    path("withdrawals/", QueueWithdrawalView.as_view(), name="queue-withdrawal"),
     # path("verify-transfer/<str:transfer_code>/", VerifyTransferView.as_view(), name="verify-transfer"),
+
+    # 🔹 Async (serve through FREELINK_root.asgi)
+    path("async/init/", AsyncInitPaymentView.as_view(), name="async-init-payment"),
+    path("async/verify/", AsyncVerifyPaymentView.as_view(), name="async-verify-payment"),
+    path("async/verify-many/", AsyncVerifyManyPaymentsView.as_view(), name="async-verify-many"),
+    path("async/get-banks/", AsyncGetBanksView.as_view(), name="async-get-banks"),
 ]
@@ -1,18 +1,79 @@
+import math
 import uuid
+from celery.result import AsyncResult
+from django.http import HttpResponse
+from django.urls import reverse
 from rest_framework.views import APIView
 from rest_framework import status
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
-from .serializers import DepositSerializer, TransferSerializer
+from .models import TransferRecipient, Withdrawal
+from .serializers import DepositSerializer, TransferSerializer, WithdrawalRequestSerializer
 from .serializers import BankTransferRecipientSerializer, MobileMoneyRecipientSerializer
-from .services.paystack import (
-    initialize_payment,
-    verify_payment,
-    Paystack,
-    initiate_transfer,
-    create_transfer_recipient
+from .services.banks import BankDirectoryUnavailable, get_bank_directory
+from .services.breaker import CircuitOpen, get_breaker
+from .services.metrics import prometheus_text, provider_metrics
+from .services.webhooks import record_event, verify_signature
+from .tasks import (
+    create_recipient_task,
+    initialize_payment_task,
+    initiate_transfer_task,
+    remember_owner,
+    task_owner,
+    verify_payment_task,
 )
 
 
+def enqueue(request, task, *args, **kwargs):
+    """
+    Queue `task` for the requesting user and return `task_response` for it.
+
+    When tasks run eagerly (no broker configured) the task has already
+    finished, so the caller gets the final response straight away. While the
+    Paystack circuit breaker is open nothing is queued and a 503 is returned.
+    """
+    retry_after = get_breaker().retry_after()
+    if retry_after:
+        return provider_unavailable(retry_after)
+
+    result = task.delay(*args, **kwargs)
+    remember_owner(result.id, request.user)
+    return task_response(result)
+
+
+def task_response(result):
+    """
+    The response a payment task produced, 502 if it failed (503 if the
+    circuit breaker stopped it), or while it is still queued a 202 handle:
+    { "task_id", "status", "poll_url" }.
+    """
+    if result.successful():
+        return Response(result.result["body"], status=result.result["status_code"])
+    if result.failed() and isinstance(result.result, CircuitOpen):
+        return provider_unavailable(result.result.retry_after)
+    if result.failed():
+        return Response(
+            {"error": "Payment provider request failed", "details": str(result.result)},
+            status=status.HTTP_502_BAD_GATEWAY,
+        )
+    return Response(
+        {
+            "task_id": result.id,
+            "status": "retrying" if result.state == "RETRY" else "pending",
+            "poll_url": reverse("payment-task", args=[result.id]),
+        },
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
+def provider_unavailable(retry_after):
+    """503 telling the client Paystack calls are short-circuited and when to retry."""
+    response = Response({"error": "Payment provider unavailable, please retry later"},
+                        status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    response["Retry-After"] = str(math.ceil(retry_after))
+    return response
+
+
 class InitPaymentView(APIView):
     """
     Initialize a Paystack payment for a user.
@@ -21,15 +82,15 @@ class InitPaymentView(APIView):
     - Body: { "amount": <amount> }
     - Uses logged-in user's email for Paystack.
     - Creates a Payment record and returns the Paystack payment link.
+    - Runs as a Celery task: returns 202 with a `task_id` to poll while it is pending.
     """
     serializer_class = DepositSerializer
 
     def post(self, request):
-        user = request.user
-        amount = request.data.get("amount")
-        res = initialize_payment(user, amount)
-
-        return Response(res, status=status.HTTP_200_OK if res.get("status") else status.HTTP_400_BAD_REQUEST)
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return enqueue(request, initialize_payment_task, request.user.pk, str(serializer.validated_data["amount"]))
 
 
 class VerifyPaymentView(APIView):
@@ -39,14 +100,13 @@ class VerifyPaymentView(APIView):
     GET:
     - Query: ?reference=<transaction_reference>
     - Confirms transaction status and updates user's wallet balance if successful.
+    - Runs as a Celery task: returns 202 with a `task_id` to poll while it is pending.
     """
     def get(self, request):
         reference = request.query_params.get("reference")
-        result = verify_payment(reference)
-
-        if "error" in result:
-            return Response({"error": result["error"]}, status=result["status_code"])
-        return Response(result["response"], status=result["status_code"])
+        if not reference:
+            return Response({"error": "reference is required"}, status=status.HTTP_400_BAD_REQUEST)
+        return enqueue(request, verify_payment_task, reference, user_id=request.user.pk)
 
 
 class CreateBankRecipientView(APIView):
@@ -55,26 +115,22 @@ class CreateBankRecipientView(APIView):
 
     POST:
     - Body: { "name": <account_name>, "account_number": <account_no>, "bank_code": <bank_code> }
-    - Returns a `recipient_code` used for initiating transfers.
+    - Returns a `recipient_code` used for initiating transfers (or a 202 `task_id` to poll).
     """
     serializer_class = BankTransferRecipientSerializer
 
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
-            try:
-                recipient_code = create_transfer_recipient(
-                    'nuban',
-                    serializer.validated_data["name"],
-                    serializer.validated_data["account_number"],
-                    str(serializer.validated_data["bank_code"]),
-                )
-                return Response(
-                    {"status": "success", "recipient_code": recipient_code},
-                    status=status.HTTP_201_CREATED,
-                )
-            except Exception as e:
-                return Response({"status": "error", "details": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return enqueue(
+                request,
+                create_recipient_task,
+                'nuban',
+                serializer.validated_data["name"],
+                serializer.validated_data["account_number"],
+                str(serializer.validated_data["bank_code"]),
+                user_id=request.user.pk,
+            )
         return Response({"status": "error", "errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -84,26 +140,22 @@ class CreateMobileMoneyRecipientView(APIView):
 
     POST:
     - Body: { "name": <account_name>, "account_number": <wallet_number>, "service_provider": <momo_provider_code> }
-    - Returns a `recipient_code` used for initiating transfers.
+    - Returns a `recipient_code` used for initiating transfers (or a 202 `task_id` to poll).
     """
     serializer_class = MobileMoneyRecipientSerializer
 
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
-            try:
-                recipient_code = create_transfer_recipient(
-                    'mobile_money',
-                    serializer.validated_data["name"],
-                    serializer.validated_data["account_number"],
-                    serializer.validated_data["service_provider"],
-                )
-                return Response(
-                    {"status": "success", "recipient_code": recipient_code},
-                    status=status.HTTP_201_CREATED,
-                )
-            except Exception as e:
-                return Response({"status": "error", "details": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return enqueue(
+                request,
+                create_recipient_task,
+                'mobile_money',
+                serializer.validated_data["name"],
+                serializer.validated_data["account_number"],
+                serializer.validated_data["service_provider"],
+                user_id=request.user.pk,
+            )
         return Response({"status": "error", "errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -113,48 +165,145 @@ class InitiateTransferView(APIView):
 
     POST:
     - Body: { "amount": <amount>, "recipient_code": <recipient_code> }
+      or { "amount": <amount>, "recipient_id": <stored recipient id> }
     - Generates a unique transaction reference.
-    - Returns Paystack transfer response data.
+    - Returns Paystack transfer response data, or a 202 `task_id` to poll while it is pending.
     """
     serializer_class = TransferSerializer
 
     def post(self, request):
         amount = request.data.get("amount")
-        recipient_code = request.data.get("recipient_code")
+        recipient = request.data.get("recipient_code")
+        recipient_id = request.data.get("recipient_id")
 
-        if not amount or not recipient_code:
+        if recipient_id and not recipient:
+            try:
+                recipient_id = int(recipient_id)
+            except (TypeError, ValueError):
+                return Response({"error": "Invalid recipient_id"}, status=status.HTTP_400_BAD_REQUEST)
+            # Only recipients this user registered; anyone else's is reported as missing.
+            recipient = TransferRecipient.objects.filter(pk=recipient_id, created_by=request.user).first()
+            if recipient is None:
+                return Response({"error": "Recipient not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        if not amount or not recipient:
             return Response({"error": "Amount and recipient_code are required"}, status=status.HTTP_400_BAD_REQUEST)
 
+        try:
+            amount = float(amount)
+        except (TypeError, ValueError):
+            return Response({"error": "Invalid amount"}, status=status.HTTP_400_BAD_REQUEST)
+
         reference = str(uuid.uuid4()).replace("-", "")[:12]
+        recipient_code = getattr(recipient, "recipient_code", recipient)
+        return enqueue(request, initiate_transfer_task, amount, recipient_code, reference, user_id=request.user.pk)
 
-        try:
-            transfer_data = initiate_transfer(float(amount), recipient_code, reference)
-            return Response(
-                {"message": "Transfer initiated", "reference": reference, "data": transfer_data},
-                status=status.HTTP_200_OK
-            )
-        except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+class QueueWithdrawalView(APIView):
+    """
+    Queue a withdrawal for the next bulk payout run.
+
+    POST:
+    - Body: { "amount": <amount>, "bank_code": <code>, "account_number": <no>, "account_name": <name> }
+    - The wallet is debited and the transfer sent when `run_payouts` picks it up.
+    """
+    serializer_class = WithdrawalRequestSerializer
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response({"status": "error", "errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        wallet = getattr(request.user, "wallet", None)
+        if wallet is None or wallet.available_balance < serializer.validated_data["amount"]:
+            return Response({"error": "Insufficient available balance"}, status=status.HTTP_400_BAD_REQUEST)
+
+        withdrawal = Withdrawal.objects.create(
+            user=request.user,
+            reference=str(uuid.uuid4()).replace("-", "")[:12],
+            **serializer.validated_data,
+        )
+        return Response(
+            {"message": "Withdrawal queued", "reference": withdrawal.reference, "status": withdrawal.status},
+            status=status.HTTP_202_ACCEPTED,
+        )
 
 
 class GetBanksView(APIView):
     """
-    Fetch the list of available banks for Ghana from Paystack.
+    Fetch the list of available banks for Ghana (cached, see `services.banks`).
 
     GET:
     - Returns list of banks and their codes (used when creating bank recipients).
     """
     def get(self, request):
-        paystack = Paystack()
-        response = paystack.get_banks(country='ghana')
-
-        if response['status']:
-            return Response({
-                'status': True,
-                'data': response['data']
-            }, status=status.HTTP_200_OK)
-        else:
+        try:
+            banks = get_bank_directory(country='ghana')
+        except BankDirectoryUnavailable as e:
             return Response({
                 'status': False,
-                'message': response.get('message', 'Failed to fetch banks')
+                'message': str(e) or 'Failed to fetch banks'
             }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'status': True,
+            'data': banks
+        }, status=status.HTTP_200_OK)
+
+
+class PaystackWebhookView(APIView):
+    """
+    Receive Paystack webhook events.
+
+    POST:
+    - Header: X-Paystack-Signature (HMAC-SHA512 of the body with the secret key).
+    - Stores the raw event in the inbox and returns immediately; settlement
+      happens in `drain_paystack_webhooks`.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    throttle_classes = []
+
+    def post(self, request):
+        body = request.body
+        if not verify_signature(body, request.headers.get("X-Paystack-Signature", "")):
+            return Response({"error": "Invalid signature"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            record_event(body)
+        except ValueError:
+            return Response({"error": "Invalid payload"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"status": "received"}, status=status.HTTP_200_OK)
+
+
+class TaskStatusView(APIView):
+    """
+    Poll a queued payment task.
+
+    GET:
+    - Path: tasks/<task_id>/ (the `task_id` returned with a 202 response).
+    - 202 while the task is pending or retrying; once finished, the response
+      the original endpoint would have returned.
+    """
+    def get(self, request, task_id):
+        if task_owner(task_id) != request.user.pk:
+            return Response({"error": "Task not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        return task_response(AsyncResult(task_id))
+
+
+class ProviderMetricsView(APIView):
+    """
+    Paystack client metrics for this process (admin only).
+
+    GET:
+    - Per-operation calls, errors, retries, breaker rejections and latency
+      histograms, plus the circuit breaker state.
+    - metrics/prometheus/ serves the same data in the Prometheus text format.
+    """
+    permission_classes = [IsAdminUser]
+    throttle_classes = []
+
+    def get(self, request, prometheus=False):
+        if prometheus:
+            return HttpResponse(prometheus_text(), content_type="text/plain; version=0.0.4")
+        return Response(provider_metrics(), status=status.HTTP_200_OK)
@@ -0,0 +1,196 @@
+"""Single-statement balance mutations for wallets and escrow accounts.
+
+Every balance move is one guarded ``UPDATE``: the sufficiency check lives in
+the WHERE clause (``balance >= amount``) so there is no read-then-write race,
+and the new balances come back through ``RETURNING`` on backends that support
+it (PostgreSQL). Other backends (SQLite) fall back to the affected row count
+plus a single refresh of the changed columns.
+
+Hot accounts can opt into sharding (`shard_count > 0`): pure credits are then
+spread over `BalanceShard` rows and summed on read, while debits run against
+the account row after folding the shards back in when needed.
+"""
+import random
+import zlib
+from decimal import Decimal
+
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+
+class InsufficientFunds(ValueError):
+    """Raised when a guarded update matched no row because funds were short.
+
+    Subclasses ``ValueError`` so existing callers that catch ``ValueError``
+    keep working.
+    """
+
+
+def supports_update_returning(connection) -> bool:
+    """Whether `connection` can return columns from an UPDATE statement."""
+    return connection.vendor == "postgresql"
+
+
+def apply_deltas(instance, deltas: dict, *, guards: dict = None, message: str = "Insufficient funds", shard_key: str = None) -> None:
+    """Atomically add `deltas` to balance columns of `instance` in one UPDATE.
+
+    - `deltas` maps field name -> signed Decimal amount to add.
+    - `guards` maps field name -> minimum value the column must currently hold
+      for the update to apply (e.g. ``{"available_balance": amount}``).
+    - `shard_key` picks the shard by hash for sharded accounts (random otherwise).
+
+    The in-memory instance is updated with the new column values. Raises
+    `InsufficientFunds` (with `message`) when a guard rejects the update.
+    """
+    if getattr(instance, "shard_count", 0):
+        deltas = {name: Decimal(amount) for name, amount in deltas.items()}
+        if not guards and all(amount > 0 for amount in deltas.values()):
+            _credit_shard(instance, deltas, pick_shard(instance.shard_count, shard_key))
+            return
+        try:
+            _apply(instance, deltas, guards, message)
+        except InsufficientFunds:
+            # Funds may still be sitting in shards: fold them in and retry once.
+            compact_shards(instance)
+            _apply(instance, deltas, guards, message)
+        return
+
+    _apply(instance, deltas, guards, message)
+
+
+def _apply(instance, deltas, guards, message):
+    """Guarded single-row UPDATE of `instance` itself (no shard routing)."""
+    model = type(instance)
+    guards = guards or {}
+    deltas = {name: Decimal(amount) for name, amount in deltas.items()}
+    fields = list(deltas)
+    now = timezone.now()
+
+    connection = connections[router.db_for_write(model, instance=instance)]
+    if supports_update_returning(connection):
+        row = _update_returning(connection, model, instance.pk, deltas, guards, now)
+        if row is None:
+            raise InsufficientFunds(message)
+        for name, value in zip(fields, row):
+            setattr(instance, name, model._meta.get_field(name).to_python(value))
+        instance.updated_at = now
+        return
+
+    lookups = {f"{name}__gte": Decimal(minimum) for name, minimum in guards.items()}
+    updated = model.objects.filter(pk=instance.pk, **lookups).update(
+        updated_at=now, **{name: F(name) + amount for name, amount in deltas.items()}
+    )
+    if not updated:
+        raise InsufficientFunds(message)
+    instance.refresh_from_db(fields=fields + ["updated_at"])
+
+
+def _update_returning(connection, model, pk, deltas, guards, now):
+    """Run ``UPDATE ... WHERE <guards> RETURNING <fields>`` and return the row (or None)."""
+    qn = connection.ops.quote_name
+    meta = model._meta
+
+    def column(name):
+        return qn(meta.get_field(name).column)
+
+    assignments = [f"{column(name)} = {column(name)} + %s" for name in deltas]
+    assignments.append(f"{column('updated_at')} = %s")
+    conditions = [f"{qn(meta.pk.column)} = %s"]
+    conditions += [f"{column(name)} >= %s" for name in guards]
+    params = [*deltas.values(), now, pk, *(Decimal(v) for v in guards.values())]
+
+    sql = "UPDATE {table} SET {assignments} WHERE {conditions} RETURNING {returning}".format(
+        table=qn(meta.db_table),
+        assignments=", ".join(assignments),
+        conditions=" AND ".join(conditions),
+        returning=", ".join(column(name) for name in deltas),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchone()
+
+
+def pick_shard(count: int, key: str = None) -> int:
+    """Choose a shard index: by stable hash of `key` if given, else at random."""
+    if key is not None:
+        return zlib.crc32(str(key).encode()) % count
+    return random.randrange(count)
+
+
+def _owner(instance) -> str:
+    """Name of the BalanceShard foreign key pointing at `instance`."""
+    return "escrow" if instance._meta.model_name == "escrowaccount" else "wallet"
+
+
+def _shard_fields(instance):
+    return ("balance", "available_balance") if _owner(instance) == "wallet" else ("balance",)
+
+
+def _credit_shard(instance, deltas, index):
+    """Add positive `deltas` to one shard row of `instance`, creating it if missing."""
+    from .models import BalanceShard
+
+    lookup = {_owner(instance): instance, "index": index}
+    changes = {name: F(name) + amount for name, amount in deltas.items()}
+    if BalanceShard.objects.filter(**lookup).update(updated_at=timezone.now(), **changes):
+        return
+    try:
+        with transaction.atomic():
+            BalanceShard.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Another writer created the shard first.
+        BalanceShard.objects.filter(**lookup).update(updated_at=timezone.now(), **changes)
+
+
+def enable_sharding(instance, count: int) -> None:
+    """Switch `instance` to sharded mode with `count` sub-balance rows."""
+    from .models import BalanceShard
+
+    owner = _owner(instance)
+    with transaction.atomic():
+        BalanceShard.objects.bulk_create(
+            [BalanceShard(**{owner: instance, "index": index}) for index in range(count)],
+            ignore_conflicts=True,
+        )
+        type(instance).objects.filter(pk=instance.pk).update(shard_count=count)
+    instance.shard_count = count
+
+
+def compact_shards(instance) -> dict:
+    """Fold the shard balances of `instance` back into the account row.
+
+    Each shard is decremented by exactly the amount read under the lock, so
+    credits that land while compaction runs are never lost. Returns the folded
+    amounts per field.
+    """
+    from .models import BalanceShard
+
+    fields = _shard_fields(instance)
+    with transaction.atomic():
+        shards = list(
+            BalanceShard.objects.select_for_update()
+            .filter(**{_owner(instance): instance})
+            .order_by("index")
+        )
+        folded = {field: sum((getattr(shard, field) for shard in shards), Decimal("0")) for field in fields}
+        for shard in shards:
+            taken = {field: getattr(shard, field) for field in fields if getattr(shard, field)}
+            if taken:
+                BalanceShard.objects.filter(pk=shard.pk).update(**{field: F(field) - amount for field, amount in taken.items()})
+        changes = {field: amount for field, amount in folded.items() if amount}
+        if changes:
+            _apply(instance, changes, None, "Insufficient funds")
+    return folded
+
+
+def sharded_totals(instance) -> dict:
+    """Account balances plus everything still held in its shards."""
+    from .models import BalanceShard
+
+    fields = _shard_fields(instance)
+    totals = {field: getattr(instance, field) for field in fields}
+    if not instance.shard_count:
+        return totals
+    sums = BalanceShard.objects.filter(**{_owner(instance): instance}).aggregate(**{field: Sum(field) for field in fields})
+    return {field: totals[field] + (sums[field] or Decimal("0")) for field in fields}
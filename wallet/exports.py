@@ -0,0 +1,130 @@
+"""Constant-memory streaming exports of `Transaction` rows (CSV or JSONL, optionally gzipped).
+
+Rows are pulled with ``values_list(...).iterator(chunk_size=...)`` (a
+server-side cursor on PostgreSQL), encoded into ~64 KiB text chunks and
+optionally compressed on the fly, so an export never holds more than one
+chunk of rows in memory regardless of the date range. Transactions moved to
+the archive are read back from their segments (`archived_export_rows`) and
+merged in by ``created_at``.
+"""
+import csv
+import heapq
+import io
+import itertools
+import json
+import zlib
+from decimal import Decimal
+
+from django.utils import timezone
+
+from archive.archiver import archived_rows
+
+EXPORT_FIELDS = (
+    "created_at",
+    "uuid",
+    "reference",
+    "type",
+    "status",
+    "amount",
+    "wallet_id",
+    "escrow_id",
+    "related_object_type",
+    "related_object_id",
+)
+FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+FLUSH_AT = 64 * 1024
+
+
+def export_rows(queryset, *, chunk_size: int = 2000, archived=()):
+    """Stream `EXPORT_FIELDS` tuples of `queryset` in (created_at, id) order, merged with `archived` rows."""
+    rows = queryset.order_by("created_at", "id").values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    return heapq.merge(archived, rows, key=lambda row: row[0])
+
+
+def archived_export_rows(*, wallet_id=None, escrow_id=None, start=None, end=None):
+    """`EXPORT_FIELDS` tuples of the archived transactions of a wallet or escrow, in (created_at, id) order.
+
+    `start`/`end` are optional aware datetime bounds. Segments are read one day
+    at a time, so memory is bounded by a single day of the account's rows.
+    """
+    def wanted(fields):
+        if wallet_id is not None and fields["wallet"] != wallet_id:
+            return False
+        if escrow_id is not None and fields["escrow"] != escrow_id:
+            return False
+        return (start is None or fields["created_at"] >= start) and (end is None or fields["created_at"] <= end)
+
+    rows = archived_rows(
+        "wallet.transaction",
+        start=timezone.localdate(start) if start else None,
+        end=timezone.localdate(end) if end else None,
+    )
+    rows = ((pk, fields) for pk, fields in rows if wanted(fields))
+    for _, day_rows in itertools.groupby(rows, key=lambda row: timezone.localdate(row[1]["created_at"])):
+        for pk, fields in sorted(day_rows, key=lambda row: (row[1]["created_at"], row[0])):
+            yield (
+                fields["created_at"], fields["uuid"], fields["reference"], fields["type"], fields["status"],
+                Decimal(fields["amount"]), fields["wallet"], fields["escrow"],
+                fields["related_object_type"], fields["related_object_id"],
+            )
+
+
+def _text(value):
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _json(value):
+    if value is None or isinstance(value, (int, str)):
+        return value
+    return _text(value)
+
+
+def csv_chunks(rows):
+    """Encode rows as CSV (with header), yielding ~64 KiB strings."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        writer.writerow([_text(value) for value in row])
+        if buffer.tell() >= FLUSH_AT:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def jsonl_chunks(rows):
+    """Encode rows as one JSON object per line, yielding ~64 KiB strings."""
+    parts, size = [], 0
+    for row in rows:
+        line = json.dumps({field: _json(value) for field, value in zip(EXPORT_FIELDS, row)}) + "\n"
+        parts.append(line)
+        size += len(line)
+        if size >= FLUSH_AT:
+            yield "".join(parts)
+            parts, size = [], 0
+    yield "".join(parts)
+
+
+def gzip_chunks(chunks):
+    """Gzip-compress a stream of text chunks on the fly."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(queryset, file_format: str, *, compress: bool = False, chunk_size: int = 2000, archived=()):
+    """Return an iterator of response chunks for `queryset` (plus `archived` rows) in `file_format`."""
+    encode = csv_chunks if file_format == "csv" else jsonl_chunks
+    chunks = encode(export_rows(queryset, chunk_size=chunk_size, archived=archived))
+    return gzip_chunks(chunks) if compress else chunks
@@ -0,0 +1,40 @@
+"""In-process cache of recently used ledger idempotency keys.
+
+The unique index on `Transaction.idempotency_key` is the source of truth; this
+bounded LRU only lets hot retries (a gateway re-sending the same request after
+a timeout) return the original transaction without a database round trip.
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class RecentKeys:
+    """Thread-safe LRU mapping idempotency key -> completed Transaction."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            tx = self._items.get(key)
+            if tx is not None:
+                self._items.move_to_end(key)
+            return tx
+
+    def put(self, key, tx):
+        with self._lock:
+            self._items[key] = tx
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+recent_keys = RecentKeys(getattr(settings, "WALLET_IDEMPOTENCY_CACHE_SIZE", 10000))
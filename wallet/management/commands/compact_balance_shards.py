@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from wallet.balances import compact_shards
+from wallet.models import EscrowAccount, Wallet
+
+
+class Command(BaseCommand):
+    help = "Fold sharded sub-balances back into their wallet and escrow rows (run periodically)."
+
+    def handle(self, *args, **options):
+        compacted = 0
+        for model in (Wallet, EscrowAccount):
+            for account in model.objects.filter(shard_count__gt=0).iterator():
+                folded = compact_shards(account)
+                if any(folded.values()):
+                    compacted += 1
+        self.stdout.write(self.style.SUCCESS(f"Compacted {compacted} sharded account(s)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from wallet.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute WalletDailyRollup rows from the Transaction log (backfill or repair)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows inserted per bulk_create.")
+
+    def handle(self, *args, **options):
+        written = rebuild_rollups(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} rollup rows."))
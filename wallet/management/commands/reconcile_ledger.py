@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from wallet.reconciliation import find_drift, reconcile
+
+
+class Command(BaseCommand):
+    help = "Fold new ledger postings into checkpointed totals and report balance drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows fetched per cursor round trip.")
+        parser.add_argument("--checkpoint-every", type=int, default=50000, help="Transactions folded between checkpoints.")
+        parser.add_argument("--full", action="store_true", help="Discard ledger totals and rescan the whole Transaction log.")
+        parser.add_argument("--lag", type=float, default=None, help="Seconds a posting must be old to be checkpointed (default: settings.LEDGER_RECONCILE_LAG).")
+
+    def handle(self, *args, **options):
+        summary = reconcile(
+            chunk_size=options["chunk_size"],
+            checkpoint_every=options["checkpoint_every"],
+            full=options["full"],
+            lag=options["lag"],
+        )
+        self.stdout.write(
+            f"Scanned {summary['scanned']} transactions up to id {summary['last_transaction_id']} "
+            f"({summary['checkpoints']} checkpoints written)."
+        )
+
+        drifted = 0
+        for item in find_drift(chunk_size=options["chunk_size"]):
+            drifted += 1
+            details = ", ".join(
+                f"{field} stored={values['stored']} ledger={values['ledger']}"
+                for field, values in item["fields"].items()
+            )
+            self.stdout.write(self.style.WARNING(f"{item['account']} {item['id']}: {details}"))
+
+        if drifted:
+            self.stdout.write(self.style.WARNING(f"{drifted} account(s) drifted from the ledger."))
+        else:
+            self.stdout.write(self.style.SUCCESS("No drift found."))
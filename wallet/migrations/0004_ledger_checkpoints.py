@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:25
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0003_currency_escrowaccount_transaction_withdrawal_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_transaction_id', models.BigIntegerField()),
+                ('transactions_scanned', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-last_transaction_id'],
+                'get_latest_by': 'last_transaction_id',
+            },
+        ),
+        migrations.CreateModel(
+            name='LedgerBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('balance', models.DecimalField(decimal_places=6, default=Decimal('0.0'), max_digits=18)),
+                ('available_balance', models.DecimalField(decimal_places=6, default=Decimal('0.0'), max_digits=18)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('escrow', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ledger_balance', to='wallet.escrowaccount')),
+                ('wallet', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ledger_balance', to='wallet.wallet')),
+            ],
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:26
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0004_ledger_checkpoints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='escrowaccount',
+            name='shard_count',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Number of BalanceShard rows credits are spread over (0 = unsharded)'),
+        ),
+        migrations.AddField(
+            model_name='wallet',
+            name='shard_count',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Number of BalanceShard rows credits are spread over (0 = unsharded)'),
+        ),
+        migrations.CreateModel(
+            name='BalanceShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveSmallIntegerField()),
+                ('balance', models.DecimalField(decimal_places=6, default=Decimal('0.0'), max_digits=18)),
+                ('available_balance', models.DecimalField(decimal_places=6, default=Decimal('0.0'), max_digits=18)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('escrow', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='shards', to='wallet.escrowaccount')),
+                ('wallet', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='shards', to='wallet.wallet')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('wallet', 'index'), name='unique_wallet_shard'), models.UniqueConstraint(fields=('escrow', 'index'), name='unique_escrow_shard')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0005_balance_shards'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['wallet', '-created_at', '-id'], name='wallet_tx_history_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0006_transaction_history_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=128, null=True, unique=True),
+        ),
+    ]
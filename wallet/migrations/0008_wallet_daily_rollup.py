@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:28
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0007_transaction_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WalletDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('type', models.CharField(choices=[('deposit', 'Deposit'), ('escrow_hold', 'Escrow Hold'), ('escrow_release', 'Escrow Release'), ('payout', 'Payout'), ('withdrawal', 'Withdrawal'), ('refund', 'Refund'), ('fee', 'Fee'), ('adjustment', 'Adjustment'), ('transfer', 'Internal Transfer')], max_length=32)),
+                ('total', models.DecimalField(decimal_places=6, default=Decimal('0.0'), max_digits=18)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('wallet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='wallet.wallet')),
+            ],
+            options={
+                'ordering': ['day', 'type'],
+                'constraints': [models.UniqueConstraint(fields=('wallet', 'day', 'type'), name='unique_wallet_daily_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0008_wallet_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['escrow', '-created_at', '-id'], name='escrow_tx_history_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0010_transfer_transaction_types'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transaction',
+            name='type',
+            field=models.CharField(choices=[('deposit', 'Deposit'), ('escrow_hold', 'Escrow Hold'), ('escrow_release', 'Escrow Release'), ('payout', 'Payout'), ('withdrawal', 'Withdrawal'), ('payout_reversal', 'Payout Reversal'), ('refund', 'Refund'), ('fee', 'Fee'), ('adjustment', 'Adjustment'), ('transfer', 'Internal Transfer'), ('transfer_out', 'Internal Transfer (Out)'), ('transfer_in', 'Internal Transfer (In)')], max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='walletdailyrollup',
+            name='type',
+            field=models.CharField(choices=[('deposit', 'Deposit'), ('escrow_hold', 'Escrow Hold'), ('escrow_release', 'Escrow Release'), ('payout', 'Payout'), ('withdrawal', 'Withdrawal'), ('payout_reversal', 'Payout Reversal'), ('refund', 'Refund'), ('fee', 'Fee'), ('adjustment', 'Adjustment'), ('transfer', 'Internal Transfer'), ('transfer_out', 'Internal Transfer (Out)'), ('transfer_in', 'Internal Transfer (In)')], max_length=32),
+        ),
+    ]
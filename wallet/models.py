@@ -3,10 +3,12 @@ from uuid import uuid4
 
 from django.conf import settings
 from django.core.validators import MinValueValidator
-from django.db import models, transaction
-from django.db.models import F
+from django.db import IntegrityError, models, transaction
 from django.utils import timezone
 
+from .balances import apply_deltas, sharded_totals
+from .idempotency import recent_keys
+
 User = settings.AUTH_USER_MODEL
 
 
@@ -15,12 +17,16 @@ TRANSACTION_TYPE_CHOICES = [
     ("deposit", "Deposit"),
     ("escrow_hold", "Escrow Hold"),
     ("escrow_release", "Escrow Release"),
+    ("escrow_settlement", "Escrow Settlement"),
     ("payout", "Payout"),
     ("withdrawal", "Withdrawal"),
+    ("payout_reversal", "Payout Reversal"),
     ("refund", "Refund"),
     ("fee", "Fee"),
     ("adjustment", "Adjustment"),
     ("transfer", "Internal Transfer"),
+    ("transfer_out", "Internal Transfer (Out)"),
+    ("transfer_in", "Internal Transfer (In)"),
 ]
 
 TRANSACTION_STATUS_CHOICES = [
@@ -64,6 +70,7 @@ class Wallet(models.Model):
     currency = models.ForeignKey(Currency, on_delete=models.PROTECT, null=True, blank=True)
     balance = models.DecimalField(max_digits=18, decimal_places=6, default=Decimal("0.0"))
     available_balance = models.DecimalField(max_digits=18, decimal_places=6, default=Decimal("0.0"))
+    shard_count = models.PositiveSmallIntegerField(default=0, help_text="Number of BalanceShard rows credits are spread over (0 = unsharded)")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -77,6 +84,14 @@ class Wallet(models.Model):
         """Reload balances from DB. Useful inside transactions."""
         self.refresh_from_db(fields=["balance", "available_balance"])
 
+    def total_balances(self) -> dict:
+        """Return balances including any credits still sitting in balance shards.
+
+        For sharded wallets `balance`/`available_balance` only hold the compacted
+        part; shard credits are added on read.
+        """
+        return sharded_totals(self)
+
     def can_debit(self, amount: Decimal, require_available: bool = True) -> bool:
         """Check whether wallet has enough funds.
 
@@ -92,17 +107,14 @@ class Wallet(models.Model):
 
         Positive `amount` increments balance; negative decrements. This method
         only updates the `balance` field — callers should also change
-        `available_balance` when placing/removing holds.
+        `available_balance` when placing/removing holds. The funds check is
+        part of the UPDATE itself, so concurrent debits cannot overdraw.
         """
-        if not allow_negative and Decimal(amount) < 0:
-            # ensure we have enough funds
-            if self.balance + Decimal(amount) < Decimal("0.0"):
-                raise ValueError("Insufficient funds")
-
-        # Use F expressions to avoid race conditions
-        Wallet.objects.filter(pk=self.pk).update(balance=F("balance") + Decimal(amount), updated_at=timezone.now())
-        # refresh local instance
-        self.refresh_from_db_balances()
+        amount = Decimal(amount)
+        guards = None
+        if not allow_negative and amount < 0:
+            guards = {"balance": -amount}
+        apply_deltas(self, {"balance": amount}, guards=guards)
 
     def place_hold(self, amount: Decimal):
         """Move funds from available_balance into hold (reduce available).
@@ -110,15 +122,17 @@ class Wallet(models.Model):
         This doesn't change `balance`, but prevents available funds from being
         spent. Typical for escrow_hold.
         """
-        if self.available_balance < Decimal(amount):
-            raise ValueError("Insufficient available funds to place hold")
-        Wallet.objects.filter(pk=self.pk).update(available_balance=F("available_balance") - Decimal(amount), updated_at=timezone.now())
-        self.refresh_from_db_balances()
+        amount = Decimal(amount)
+        apply_deltas(
+            self,
+            {"available_balance": -amount},
+            guards={"available_balance": amount},
+            message="Insufficient available funds to place hold",
+        )
 
     def release_hold(self, amount: Decimal):
         """Release a previously placed hold back to available_balance."""
-        Wallet.objects.filter(pk=self.pk).update(available_balance=F("available_balance") + Decimal(amount), updated_at=timezone.now())
-        self.refresh_from_db_balances()
+        apply_deltas(self, {"available_balance": Decimal(amount)})
 
 
 class EscrowAccount(models.Model):
@@ -132,6 +146,7 @@ class EscrowAccount(models.Model):
     reference = models.CharField(max_length=128, blank=True, null=True)  # e.g. contract-{id}-milestone-{id}
     currency = models.ForeignKey(Currency, on_delete=models.PROTECT, null=True, blank=True)
     balance = models.DecimalField(max_digits=18, decimal_places=6, default=Decimal("0.0"))
+    shard_count = models.PositiveSmallIntegerField(default=0, help_text="Number of BalanceShard rows credits are spread over (0 = unsharded)")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -141,37 +156,68 @@ class EscrowAccount(models.Model):
     def __str__(self):
         return f"EscrowAccount({self.reference}, {self.balance})"
 
+    def total_balances(self) -> dict:
+        """Return the escrow balance including credits still sitting in balance shards."""
+        return sharded_totals(self)
+
     def credit(self, amount: Decimal):
-        with transaction.atomic():
-            EscrowAccount.objects.filter(pk=self.pk).update(balance=F("balance") + Decimal(amount), updated_at=timezone.now())
-            self.refresh_from_db(fields=["balance"])  # refresh the instance
+        apply_deltas(self, {"balance": Decimal(amount)})
 
     def debit(self, amount: Decimal):
-        with transaction.atomic():
-            self.refresh_from_db(fields=["balance"])
-            if self.balance < Decimal(amount):
-                raise ValueError("Insufficient escrow balance")
-            EscrowAccount.objects.filter(pk=self.pk).update(balance=F("balance") - Decimal(amount), updated_at=timezone.now())
-            self.refresh_from_db(fields=["balance"])  # refresh
+        amount = Decimal(amount)
+        apply_deltas(self, {"balance": -amount}, guards={"balance": amount}, message="Insufficient escrow balance")
+
+
+# Balance effect of each transaction type once completed: side -> {field: sign}.
+# Types not listed here (e.g. "adjustment") are recorded without moving money.
+LEG_EFFECTS = {
+    "deposit": {"wallet": {"balance": 1, "available_balance": 1}},
+    "escrow_hold": {"wallet": {"available_balance": -1}, "escrow": {"balance": 1}},
+    "escrow_release": {"wallet": {"balance": 1}, "escrow": {"balance": -1}},
+    # A release spent in the same settlement (fee / payout) is available at once.
+    "escrow_settlement": {"wallet": {"balance": 1, "available_balance": 1}, "escrow": {"balance": -1}},
+    "payout": {"wallet": {"balance": -1, "available_balance": -1}},
+    "withdrawal": {"wallet": {"balance": -1, "available_balance": -1}},
+    "payout_reversal": {"wallet": {"balance": 1, "available_balance": 1}},
+    "refund": {"wallet": {"balance": 1, "available_balance": 1}, "escrow": {"balance": -1}},
+    "fee": {"wallet": {"balance": -1, "available_balance": -1}},
+    "transfer_out": {"wallet": {"balance": -1, "available_balance": -1}},
+    "transfer_in": {"wallet": {"balance": 1, "available_balance": 1}},
+}
+
+
+class BalanceShard(models.Model):
+    """One of N sub-balance rows of a hot (sharded) wallet or escrow account.
+
+    Credits to an account with `shard_count > 0` land on a random (or hashed)
+    shard instead of the account row, so concurrent postings don't queue on a
+    single row lock. Debits always go against the account row; shards are
+    folded back into it by `wallet.balances.compact_shards`.
+    """
 
+    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, null=True, blank=True, related_name="shards")
+    escrow = models.ForeignKey(EscrowAccount, on_delete=models.CASCADE, null=True, blank=True, related_name="shards")
+    index = models.PositiveSmallIntegerField()
+    balance = models.DecimalField(max_digits=18, decimal_places=6, default=Decimal("0.0"))
+    available_balance = models.DecimalField(max_digits=18, decimal_places=6, default=Decimal("0.0"))
+    updated_at = models.DateTimeField(auto_now=True)
 
-class TransactionManager(models.Manager):
-    def create_transaction(self, *, wallet: Wallet = None, escrow: EscrowAccount = None, amount: Decimal, type: str, status: str = "pending", metadata: dict = None, related_object=None):
-        """Creates a transaction record and performs bookkeeping.
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["wallet", "index"], name="unique_wallet_shard"),
+            models.UniqueConstraint(fields=["escrow", "index"], name="unique_escrow_shard"),
+        ]
 
-        - For deposits: increase wallet.balance and available_balance
-        - For escrow_hold: move available_balance -> escrow (via wallet.place_hold and escrow.credit)
-        - For escrow_release: move escrow -> wallet (escrow.debit then wallet.adjust)
+    def __str__(self):
+        return f"BalanceShard({self.wallet_id or self.escrow_id}#{self.index}, {self.balance})"
 
-        The `related_object` field is generic contextual reference (e.g. Contract, Milestone id)
-        """
-        if amount == 0:
-            raise ValueError("Transaction amount cannot be zero")
 
+class TransactionManager(models.Manager):
+    def _build(self, *, wallet=None, escrow=None, amount, type, status="pending", metadata=None, idempotency_key=None):
+        """Instantiate (without saving) a Transaction row for one posting leg."""
         metadata = metadata or {}
-
-        # Ensure either wallet or escrow is provided, depending on type
-        tx = self.model(
+        return self.model(
+            idempotency_key=idempotency_key,
             uuid=uuid4(),
             wallet=wallet,
             escrow=escrow,
@@ -185,17 +231,104 @@ class TransactionManager(models.Manager):
             reference=metadata.get("reference") or str(uuid4())[:32],
         )
 
+    def _replayed(self, idempotency_key):
+        """Return the transaction already posted under `idempotency_key`, if any."""
+        tx = recent_keys.get(idempotency_key)
+        if tx is None:
+            tx = self.filter(idempotency_key=idempotency_key).first()
+            if tx is not None:
+                recent_keys.put(idempotency_key, tx)
+        return tx
+
+    def _archived(self, keys):
+        """``{key: transaction}`` for keys whose transaction was moved to cold storage.
+
+        The hot table's unique index no longer covers those keys, so they are
+        checked against the archive index before posting.
+        """
+        from archive.archiver import fetch
+        from archive.models import ArchivedRecord
+
+        found = ArchivedRecord.objects.filter(model="wallet.transaction", idempotency_key__in=keys)
+        return {
+            key: fetch(self.model, idempotency_key=key)
+            for key in found.values_list("idempotency_key", flat=True)
+        }
+
+    def _remember(self, txs):
+        """Cache keyed transactions once the surrounding transaction commits."""
+        keyed = [tx for tx in txs if tx.idempotency_key]
+        if keyed:
+            transaction.on_commit(lambda: [recent_keys.put(tx.idempotency_key, tx) for tx in keyed])
+
+    def create_transaction(self, *, wallet: Wallet = None, escrow: EscrowAccount = None, amount: Decimal, type: str, status: str = "pending", metadata: dict = None, related_object=None, idempotency_key: str = None):
+        """Creates a transaction record and performs bookkeeping.
+
+        - For deposits: increase wallet.balance and available_balance
+        - For escrow_hold: move available_balance -> escrow (via wallet.place_hold and escrow.credit)
+        - For escrow_release: move escrow -> wallet (escrow.debit then wallet.adjust)
+        - For escrow_settlement: move escrow -> wallet, available at once
+
+        The `related_object` field is generic contextual reference (e.g. Contract, Milestone id)
+
+        If `idempotency_key` was already used, the original transaction is
+        returned and no balances are touched. Recent keys are answered from an
+        in-process LRU; otherwise the unique index rejects the insert before any
+        balance moves, and the original row is fetched. Only when the insert
+        goes through (the key is not in the hot table) is the archive index
+        consulted, still before any balance moves.
+        """
+        if amount == 0:
+            raise ValueError("Transaction amount cannot be zero")
+        if type in ("transfer", "transfer_out", "transfer_in"):
+            raise ValueError("Internal transfers must be posted with Transaction.objects.transfer()")
+
+        if idempotency_key:
+            cached = recent_keys.get(idempotency_key)
+            if cached is not None:
+                return cached
+
+        # Ensure either wallet or escrow is provided, depending on type
+        tx = self._build(wallet=wallet, escrow=escrow, amount=amount, type=type, status=status, metadata=metadata, idempotency_key=idempotency_key)
+
+        try:
+            posted = self._post(tx, wallet=wallet, escrow=escrow, amount=amount, type=type)
+        except IntegrityError:
+            original = idempotency_key and self._replayed(idempotency_key)
+            if not original:
+                raise
+            return original
+        if posted is not tx:
+            return posted
+
+        self._remember([tx])
+        return tx
+
+    def _post(self, tx, *, wallet, escrow, amount, type):
+        """Insert `tx` and perform the balance moves for its type.
+
+        Returns `tx`, or the archived transaction already posted under its
+        idempotency key, in which case the insert is rolled back.
+        """
+        from .rollups import record_rollups
+
         # Business logic: perform balance moves inside atomic block
         with transaction.atomic():
             tx.save()
 
+            if tx.idempotency_key:
+                # The hot table's unique index let the key through; it may still be archived.
+                archived = self._archived([tx.idempotency_key]).get(tx.idempotency_key)
+                if archived is not None:
+                    transaction.set_rollback(True)
+                    return archived
+
             # handle common types
             if type == "deposit":
                 if not wallet:
                     raise ValueError("Deposit requires a wallet")
                 # increment both balance and available balance
-                Wallet.objects.filter(pk=wallet.pk).update(balance=F("balance") + Decimal(amount), available_balance=F("available_balance") + Decimal(amount), updated_at=timezone.now())
-                wallet.refresh_from_db_balances()
+                apply_deltas(wallet, {"balance": Decimal(amount), "available_balance": Decimal(amount)})
                 tx.status = "completed"
                 tx.save(update_fields=["status"])
 
@@ -213,8 +346,15 @@ class TransactionManager(models.Manager):
                     raise ValueError("Escrow release requires wallet and escrow")
                 # move from escrow to wallet
                 escrow.debit(amount)
-                Wallet.objects.filter(pk=wallet.pk).update(balance=F("balance") + Decimal(amount), updated_at=timezone.now())
-                wallet.refresh_from_db_balances()
+                wallet.adjust_balance(amount)
+                tx.status = "completed"
+                tx.save(update_fields=["status"])
+
+            elif type == "escrow_settlement":
+                if not wallet or not escrow:
+                    raise ValueError("Escrow settlement requires wallet and escrow")
+                escrow.debit(amount)
+                apply_deltas(wallet, {"balance": Decimal(amount), "available_balance": Decimal(amount)})
                 tx.status = "completed"
                 tx.save(update_fields=["status"])
 
@@ -222,11 +362,20 @@ class TransactionManager(models.Manager):
                 if not wallet:
                     raise ValueError("Payout/withdrawal requires wallet")
                 # debit wallet.balance (payouts reduce balance and available)
-                wallet.refresh_from_db_balances()
-                if wallet.available_balance < Decimal(amount):
-                    raise ValueError("Insufficient available balance for payout")
-                Wallet.objects.filter(pk=wallet.pk).update(balance=F("balance") - Decimal(amount), available_balance=F("available_balance") - Decimal(amount), updated_at=timezone.now())
-                wallet.refresh_from_db_balances()
+                apply_deltas(
+                    wallet,
+                    {"balance": -Decimal(amount), "available_balance": -Decimal(amount)},
+                    guards={"available_balance": Decimal(amount)},
+                    message="Insufficient available balance for payout",
+                )
+                tx.status = "completed"
+                tx.save(update_fields=["status"])
+
+            elif type == "payout_reversal":
+                # a payout the provider failed or reversed: give the funds back
+                if not wallet:
+                    raise ValueError("Payout reversal requires wallet")
+                apply_deltas(wallet, {"balance": Decimal(amount), "available_balance": Decimal(amount)})
                 tx.status = "completed"
                 tx.save(update_fields=["status"])
 
@@ -235,8 +384,7 @@ class TransactionManager(models.Manager):
                 if not wallet or not escrow:
                     raise ValueError("Refund requires wallet and escrow")
                 escrow.debit(amount)
-                Wallet.objects.filter(pk=wallet.pk).update(balance=F("balance") + Decimal(amount), available_balance=F("available_balance") + Decimal(amount), updated_at=timezone.now())
-                wallet.refresh_from_db_balances()
+                apply_deltas(wallet, {"balance": Decimal(amount), "available_balance": Decimal(amount)})
                 tx.status = "completed"
                 tx.save(update_fields=["status"])
 
@@ -244,21 +392,177 @@ class TransactionManager(models.Manager):
                 # fees reduce a wallet and are held by platform; platform accounting handled externally
                 if not wallet:
                     raise ValueError("Fee requires wallet")
-                wallet.refresh_from_db_balances()
-                if wallet.available_balance < Decimal(amount):
-                    raise ValueError("Insufficient available balance for fee")
-                Wallet.objects.filter(pk=wallet.pk).update(balance=F("balance") - Decimal(amount), available_balance=F("available_balance") - Decimal(amount), updated_at=timezone.now())
-                wallet.refresh_from_db_balances()
+                apply_deltas(
+                    wallet,
+                    {"balance": -Decimal(amount), "available_balance": -Decimal(amount)},
+                    guards={"available_balance": Decimal(amount)},
+                    message="Insufficient available balance for fee",
+                )
                 tx.status = "completed"
                 tx.save(update_fields=["status"])
 
             else:
-                # generic transfer/adjustment
+                # generic adjustment
                 tx.status = "completed"
                 tx.save(update_fields=["status"])
 
+            record_rollups([tx])
         return tx
 
+    def transfer(self, *, source: Wallet, destination: Wallet, amount: Decimal, metadata: dict = None, idempotency_key: str = None):
+        """Move `amount` from `source` to `destination` wallet in one atomic posting.
+
+        Returns the ``(transfer_out, transfer_in)`` transaction pair.
+        """
+        return self.transfer_batch([{
+            "source": source,
+            "destination": destination,
+            "amount": amount,
+            "metadata": metadata,
+            "idempotency_key": idempotency_key,
+        }])[0]
+
+    def transfer_batch(self, transfers):
+        """Post several wallet-to-wallet transfers atomically.
+
+        Each item is ``{"source": Wallet, "destination": Wallet, "amount": ...,
+        "metadata": {...}, "idempotency_key": ...}`` and becomes a
+        ``transfer_out`` leg on the source and a ``transfer_in`` leg on the
+        destination. All involved wallet rows are locked with
+        ``select_for_update`` in primary-key order before any balance moves, so
+        concurrent (even opposite-direction) transfers cannot deadlock; the
+        moves themselves are guarded conditional updates via `post_batch`.
+
+        Returns a list of ``(transfer_out, transfer_in)`` pairs, in input order.
+        """
+        legs = []
+        for item in transfers:
+            source, destination = item["source"], item["destination"]
+            if source.pk == destination.pk:
+                raise ValueError("Cannot transfer to the same wallet")
+            metadata = item.get("metadata") or {}
+            reference = metadata.get("reference") or uuid4().hex[:24]
+            key = item.get("idempotency_key")
+            legs.append({
+                "wallet": source,
+                "amount": item["amount"],
+                "type": "transfer_out",
+                "metadata": {**metadata, "reference": f"{reference}-out", "counterparty_wallet": destination.pk},
+                "idempotency_key": key and f"{key}:out",
+            })
+            legs.append({
+                "wallet": destination,
+                "amount": item["amount"],
+                "type": "transfer_in",
+                "metadata": {**metadata, "reference": f"{reference}-in", "counterparty_wallet": source.pk},
+                "idempotency_key": key and f"{key}:in",
+            })
+
+        wallet_ids = sorted({leg["wallet"].pk for leg in legs})
+        with transaction.atomic():
+            list(Wallet.objects.select_for_update().filter(pk__in=wallet_ids).order_by("pk").values_list("pk", flat=True))
+            txs = self.post_batch(legs)
+        return [(txs[i], txs[i + 1]) for i in range(0, len(txs), 2)]
+
+    def post_batch(self, legs, *, _retry=True):
+        """Apply several posting legs (hold, release, fee, payout, ...) in one atomic block.
+
+        Each leg is a dict with the same keys as `create_transaction`:
+        ``{"wallet": ..., "escrow": ..., "amount": ..., "type": ..., "metadata": {...}}``.
+
+        Balance changes are netted per wallet/escrow and applied with one
+        guarded UPDATE per account (in primary-key order, so concurrent batches
+        lock rows in the same order). Transaction rows are then written with a
+        single `bulk_create`, already marked completed. If any account would go
+        negative the whole batch is rolled back with `InsufficientFunds`.
+
+        Legs may carry an ``"idempotency_key"``: legs whose key was already
+        posted are skipped (checked in one query) and the original transaction
+        is returned in their place.
+
+        Returns the list of transactions, in leg order.
+        """
+        if not legs:
+            return []
+
+        keys = [leg["idempotency_key"] for leg in legs if leg.get("idempotency_key")]
+        posted = {}
+        for key in keys:
+            cached = recent_keys.get(key)
+            if cached is not None:
+                posted[key] = cached
+        missing = [key for key in keys if key not in posted]
+        if missing:
+            posted.update({tx.idempotency_key: tx for tx in self.filter(idempotency_key__in=missing)})
+            missing = [key for key in missing if key not in posted]
+        if missing:
+            posted.update(self._archived(missing))
+
+        fresh = [leg for leg in legs if leg.get("idempotency_key") not in posted]
+        try:
+            created = iter(self._post_legs(fresh))
+        except IntegrityError:
+            if not (keys and _retry):
+                raise
+            # A concurrent batch posted one of our keys first; retry without it.
+            return self.post_batch(legs, _retry=False)
+
+        return [posted[leg["idempotency_key"]] if leg.get("idempotency_key") in posted else next(created) for leg in legs]
+
+    def _post_legs(self, legs):
+        """Net, apply and record `legs` (see `post_batch`); returns the new transactions."""
+        from .rollups import record_rollups
+
+        if not legs:
+            return []
+
+        wallet_deltas, escrow_deltas = {}, {}
+        wallets, escrows = {}, {}
+        txs = []
+
+        for leg in legs:
+            amount = Decimal(leg["amount"])
+            type = leg["type"]
+            wallet, escrow = leg.get("wallet"), leg.get("escrow")
+            if amount <= 0:
+                raise ValueError("Transaction amount must be positive")
+
+            effects = LEG_EFFECTS.get(type, {})
+            if ("wallet" in effects and not wallet) or ("escrow" in effects and not escrow):
+                raise ValueError(f"{type} requires {' and '.join(effects)}")
+
+            for side, account, deltas, instances in (
+                ("wallet", wallet, wallet_deltas, wallets),
+                ("escrow", escrow, escrow_deltas, escrows),
+            ):
+                if side not in effects:
+                    continue
+                instances.setdefault(account.pk, []).append(account)
+                totals = deltas.setdefault(account.pk, {})
+                for field, sign in effects[side].items():
+                    totals[field] = totals.get(field, Decimal("0")) + sign * amount
+
+            txs.append(self._build(wallet=wallet, escrow=escrow, amount=amount, type=type, status="completed", metadata=leg.get("metadata"), idempotency_key=leg.get("idempotency_key")))
+
+        with transaction.atomic():
+            for deltas, instances in ((wallet_deltas, wallets), (escrow_deltas, escrows)):
+                for pk in sorted(deltas):
+                    changes = {field: delta for field, delta in deltas[pk].items() if delta}
+                    if not changes:
+                        continue
+                    guards = {field: -delta for field, delta in changes.items() if delta < 0}
+                    first, *others = instances[pk]
+                    apply_deltas(first, changes, guards=guards, message=f"Insufficient funds in {first._meta.model_name} {pk}")
+                    for other in others:
+                        for field in [*changes, "updated_at"]:
+                            setattr(other, field, getattr(first, field))
+
+            self.bulk_create(txs)
+            record_rollups(txs)
+
+        self._remember(txs)
+        return txs
+
 
 class Transaction(models.Model):
     """Record of every monetary event affecting wallets and escrows.
@@ -270,6 +574,8 @@ class Transaction(models.Model):
 
     uuid = models.UUIDField(default=uuid4, editable=False, unique=True)
     reference = models.CharField(max_length=128, unique=True)
+    # client-supplied key making retries of the same posting return the original row
+    idempotency_key = models.CharField(max_length=128, unique=True, null=True, blank=True)
 
     wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, null=True, blank=True, related_name="transactions")
     escrow = models.ForeignKey(EscrowAccount, on_delete=models.CASCADE, null=True, blank=True, related_name="transactions")
@@ -291,7 +597,15 @@ class Transaction(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
-        indexes = [models.Index(fields=["reference"]), models.Index(fields=["wallet"]), models.Index(fields=["escrow"])]
+        indexes = [
+            models.Index(fields=["reference"]),
+            models.Index(fields=["wallet"]),
+            models.Index(fields=["escrow"]),
+            # keyset pagination of a wallet's history: WHERE wallet = ? ORDER BY created_at DESC, id DESC
+            models.Index(fields=["wallet", "-created_at", "-id"], name="wallet_tx_history_idx"),
+            # date-range exports of an escrow's postings
+            models.Index(fields=["escrow", "-created_at", "-id"], name="escrow_tx_history_idx"),
+        ]
 
     def __str__(self):
         return f"Tx({self.reference}, {self.type}, {self.amount}, {self.status})"
@@ -323,3 +637,62 @@ class Withdrawal(models.Model):
         return f"Withdrawal({self.wallet.user}, {self.amount}, {self.status})"
 
 
+
+
+class LedgerCheckpoint(models.Model):
+    """Cursor written by the ledger reconciliation job.
+
+    Each row records how far (by Transaction id) the `Transaction` log has been
+    folded into `LedgerBalance`, so later runs only scan newer postings.
+    """
+
+    last_transaction_id = models.BigIntegerField()
+    transactions_scanned = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-last_transaction_id"]
+        get_latest_by = "last_transaction_id"
+
+    def __str__(self):
+        return f"LedgerCheckpoint(<= {self.last_transaction_id})"
+
+
+class LedgerBalance(models.Model):
+    """Running totals of completed transactions for one wallet or escrow account.
+
+    These are the balances the `Transaction` log says an account should have as
+    of the latest `LedgerCheckpoint`; drift is any difference from the stored
+    `Wallet`/`EscrowAccount` balances.
+    """
+
+    wallet = models.OneToOneField(Wallet, on_delete=models.CASCADE, null=True, blank=True, related_name="ledger_balance")
+    escrow = models.OneToOneField(EscrowAccount, on_delete=models.CASCADE, null=True, blank=True, related_name="ledger_balance")
+    balance = models.DecimalField(max_digits=18, decimal_places=6, default=Decimal("0.0"))
+    available_balance = models.DecimalField(max_digits=18, decimal_places=6, default=Decimal("0.0"))
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"LedgerBalance({self.wallet_id or self.escrow_id}, {self.balance})"
+
+
+class WalletDailyRollup(models.Model):
+    """Per-day totals of completed transactions for one wallet and transaction type.
+
+    Maintained incrementally as postings complete (see `wallet.rollups`), so
+    statements and "balance at date X" queries read a few rollup rows instead
+    of aggregating the full `Transaction` history.
+    """
+
+    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name="daily_rollups")
+    day = models.DateField()
+    type = models.CharField(max_length=32, choices=TRANSACTION_TYPE_CHOICES)
+    total = models.DecimalField(max_digits=18, decimal_places=6, default=Decimal("0.0"))
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["day", "type"]
+        constraints = [models.UniqueConstraint(fields=["wallet", "day", "type"], name="unique_wallet_daily_rollup")]
+
+    def __str__(self):
+        return f"WalletDailyRollup({self.wallet_id}, {self.day}, {self.type}, {self.total})"
@@ -0,0 +1,212 @@
+"""Ledger reconciliation: check stored balances against the Transaction log.
+
+`reconcile()` streams completed transactions newer than the last
+`LedgerCheckpoint` (with ``iterator(chunk_size=...)``), folds them into per
+account running sums and periodically flushes those sums into `LedgerBalance`
+together with a new checkpoint. Memory is bounded by the number of accounts
+touched between two checkpoints, not by the size of the log. A full rescan
+also folds in the postings already moved to the archive.
+
+Ids are allocated before commit, so a posting can become visible after a
+higher id was already checkpointed. The scan therefore stops at the first
+posting younger than ``LEDGER_RECONCILE_LAG`` seconds, keeping the checkpoint
+behind anything that may still be committing.
+
+`find_drift()` then merge-joins wallets and escrows with their ledger totals
+(both ordered by id, both streamed), adds the postings after the latest
+checkpoint, and yields every account whose stored balance (including any
+sharded sub-balances) disagrees with the ledger, e.g. credits made with
+``wallet.balance += ...`` outside `TransactionManager`.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from archive.archiver import archived_rows
+
+from .models import LEG_EFFECTS, BalanceShard, EscrowAccount, LedgerBalance, LedgerCheckpoint, Transaction, Wallet
+
+ZERO = Decimal("0")
+
+# Ledger fields tracked per account side.
+SIDE_FIELDS = {
+    "wallet": ("balance", "available_balance"),
+    "escrow": ("balance",),
+}
+
+
+def reconcile(*, chunk_size: int = 2000, checkpoint_every: int = 50000, full: bool = False, lag: float = None) -> dict:
+    """Fold new completed transactions into `LedgerBalance` and write checkpoints.
+
+    - `chunk_size`: rows fetched per server-side cursor round trip.
+    - `checkpoint_every`: number of transactions folded between checkpoints.
+    - `full`: discard existing ledger totals and rescan the whole log.
+    - `lag`: seconds a posting must be old before it is folded in
+      (default ``settings.LEDGER_RECONCILE_LAG``).
+
+    Returns a summary dict with the number of transactions scanned, the number
+    of checkpoints written and the last transaction id folded in.
+    """
+    if lag is None:
+        lag = settings.LEDGER_RECONCILE_LAG
+    cutoff = timezone.now() - timedelta(seconds=lag)
+    start = 0 if full else _checkpointed_id()
+
+    rows = (
+        Transaction.objects.filter(status="completed", pk__gt=start)
+        .order_by("pk")
+        .values_list("pk", "created_at", "type", "amount", "wallet_id", "escrow_id")
+        .iterator(chunk_size=chunk_size)
+    )
+
+    pending = {"wallet": {}, "escrow": {}}
+    scanned = since_checkpoint = checkpoints = 0
+    last_id = start
+    # A full run replaces the old totals and checkpoints in its first flush, so
+    # a failed run leaves the previous state intact.
+    reset = full
+
+    if full:
+        # Archived postings are gone from the hot table but still part of every balance.
+        for pk, fields in archived_rows("wallet.transaction"):
+            if fields["status"] != "completed":
+                continue
+            _fold(pending, fields["type"], Decimal(fields["amount"]), fields["wallet"], fields["escrow"])
+            last_id = max(last_id, pk)
+            scanned += 1
+            since_checkpoint += 1
+
+    for pk, created_at, type, amount, wallet_id, escrow_id in rows:
+        if created_at > cutoff:
+            # Lower ids may still be committing; pick up from here next run.
+            break
+        _fold(pending, type, amount, wallet_id, escrow_id)
+
+        last_id = pk
+        scanned += 1
+        since_checkpoint += 1
+        if since_checkpoint >= checkpoint_every:
+            _flush(pending, last_id, since_checkpoint, reset=reset)
+            reset = False
+            pending = {"wallet": {}, "escrow": {}}
+            since_checkpoint = 0
+            checkpoints += 1
+
+    if since_checkpoint or full:
+        _flush(pending, last_id, since_checkpoint, reset=reset)
+        checkpoints += 1
+
+    return {"scanned": scanned, "checkpoints": checkpoints, "last_transaction_id": last_id}
+
+
+def _checkpointed_id() -> int:
+    last = LedgerCheckpoint.objects.order_by("-last_transaction_id").first()
+    return last.last_transaction_id if last else 0
+
+
+def _fold(pending: dict, type: str, amount: Decimal, wallet_id, escrow_id) -> None:
+    """Add one posting's effects to the per-account running sums in `pending`."""
+    effects = LEG_EFFECTS.get(type, {})
+    for side, account_id in (("wallet", wallet_id), ("escrow", escrow_id)):
+        if side not in effects or account_id is None:
+            continue
+        sums = pending[side].setdefault(account_id, dict.fromkeys(SIDE_FIELDS[side], ZERO))
+        for field, sign in effects[side].items():
+            sums[field] += sign * amount
+
+
+def _flush(pending: dict, last_id: int, scanned: int, batch_size: int = 500, *, reset: bool = False) -> None:
+    """Add pending per-account sums into `LedgerBalance` and record a checkpoint atomically.
+
+    With `reset`, existing ledger totals and checkpoints are deleted first, in the same transaction.
+    """
+    with transaction.atomic():
+        if reset:
+            LedgerBalance.objects.all().delete()
+            LedgerCheckpoint.objects.all().delete()
+        for side, sums in pending.items():
+            fields = SIDE_FIELDS[side]
+            account_ids = list(sums)
+            for offset in range(0, len(account_ids), batch_size):
+                batch = account_ids[offset:offset + batch_size]
+                existing = {
+                    getattr(row, f"{side}_id"): row
+                    for row in LedgerBalance.objects.filter(**{f"{side}_id__in": batch})
+                }
+                to_create = []
+                for account_id in batch:
+                    row = existing.get(account_id)
+                    if row is None:
+                        row = LedgerBalance(**{f"{side}_id": account_id})
+                        to_create.append(row)
+                    for field in fields:
+                        setattr(row, field, getattr(row, field) + sums[account_id][field])
+                LedgerBalance.objects.bulk_update(existing.values(), fields)
+                LedgerBalance.objects.bulk_create(to_create)
+
+        LedgerCheckpoint.objects.create(last_transaction_id=last_id, transactions_scanned=scanned)
+
+
+def find_drift(*, chunk_size: int = 2000):
+    """Yield accounts whose stored balances differ from their ledger totals.
+
+    Each item is a dict ``{"account": "wallet"|"escrow", "id": pk, "fields":
+    {field: {"stored": ..., "ledger": ...}}}``. Ledger totals are the latest
+    checkpoint plus the completed postings after it, which are few as long as
+    `reconcile()` runs regularly.
+    """
+    tail = {"wallet": {}, "escrow": {}}
+    recent = (
+        Transaction.objects.filter(status="completed", pk__gt=_checkpointed_id())
+        .values_list("type", "amount", "wallet_id", "escrow_id")
+        .iterator(chunk_size=chunk_size)
+    )
+    for type, amount, wallet_id, escrow_id in recent:
+        _fold(tail, type, amount, wallet_id, escrow_id)
+
+    for side, model in (("wallet", Wallet), ("escrow", EscrowAccount)):
+        fields = SIDE_FIELDS[side]
+        totals = {f"total_{field}": F(field) + _shard_sum(side, field) for field in fields}
+        accounts = model.objects.order_by("pk").annotate(**totals).values_list("pk", *totals).iterator(chunk_size=chunk_size)
+        ledger = (
+            LedgerBalance.objects.filter(**{f"{side}__isnull": False})
+            .order_by(f"{side}_id")
+            .values_list(f"{side}_id", *fields)
+            .iterator(chunk_size=chunk_size)
+        )
+        yield from _merge_drift(side, fields, accounts, ledger, tail[side])
+
+
+def _shard_sum(side, field):
+    """Subquery summing `field` over the balance shards of each outer account."""
+    shards = (
+        BalanceShard.objects.filter(**{side: OuterRef("pk")})
+        .values(side)
+        .annotate(total=Sum(field))
+        .values("total")
+    )
+    output = DecimalField(max_digits=18, decimal_places=6)
+    return Coalesce(Subquery(shards, output_field=output), Value(ZERO), output_field=output)
+
+
+def _merge_drift(side, fields, accounts, ledger, tail):
+    """Merge-join two id-ordered row streams, add `tail` sums and yield mismatching accounts."""
+    current = next(ledger, None)
+    for pk, *stored in accounts:
+        while current is not None and current[0] < pk:
+            current = next(ledger, None)
+        expected = current[1:] if current is not None and current[0] == pk else (ZERO,) * len(fields)
+        if pk in tail:
+            expected = [value + tail[pk][field] for field, value in zip(fields, expected)]
+        diffs = {
+            field: {"stored": value, "ledger": ledger_value}
+            for field, value, ledger_value in zip(fields, stored, expected)
+            if value != ledger_value
+        }
+        if diffs:
+            yield {"account": side, "id": pk, "fields": diffs}
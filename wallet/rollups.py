@@ -0,0 +1,133 @@
+"""Daily per-wallet rollups of completed transactions and as-of balance queries.
+
+`record_rollups()` is called inside the posting transaction and adds each
+completed wallet transaction to its ``(wallet, day, type)`` row. Balances at
+any instant are then the signed sum of the rollups before that day plus the
+same-day tail of transactions, read through the ``(wallet, -created_at)``
+index. Archived transactions keep their rollup rows, and `rebuild_rollups()`
+reads them back from the archive.
+"""
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from archive.archiver import archived_rows
+
+from .models import LEG_EFFECTS, Transaction, WalletDailyRollup
+
+ZERO = Decimal("0")
+BALANCE_FIELDS = ("balance", "available_balance")
+
+
+def record_rollups(txs) -> None:
+    """Add completed wallet transactions in `txs` to their daily rollup rows."""
+    groups = {}
+    for tx in txs:
+        if tx.status != "completed" or tx.wallet_id is None:
+            continue
+        key = (tx.wallet_id, timezone.localdate(tx.created_at), tx.type)
+        total, count = groups.get(key, (ZERO, 0))
+        groups[key] = (total + Decimal(tx.amount), count + 1)
+
+    for (wallet_id, day, type), (total, count) in sorted(groups.items()):
+        lookup = {"wallet_id": wallet_id, "day": day, "type": type}
+        increments = {"total": F("total") + total, "count": F("count") + count}
+        if WalletDailyRollup.objects.filter(**lookup).update(**increments):
+            continue
+        try:
+            with transaction.atomic():
+                WalletDailyRollup.objects.create(**lookup, total=total, count=count)
+        except IntegrityError:
+            # Another posting created today's row first.
+            WalletDailyRollup.objects.filter(**lookup).update(**increments)
+
+
+def _fold(totals, type, amount):
+    for field, sign in LEG_EFFECTS.get(type, {}).get("wallet", {}).items():
+        totals[field] += sign * amount
+
+
+def balance_as_of(wallet, at) -> dict:
+    """Return ``{"balance": ..., "available_balance": ...}`` of `wallet` at instant `at`.
+
+    Reads the rollups for all days before `at`'s day (one grouped query) and
+    the completed transactions of that day up to `at`, hot or archived.
+    """
+    day = timezone.localdate(at)
+    totals = dict.fromkeys(BALANCE_FIELDS, ZERO)
+
+    rollups = (
+        WalletDailyRollup.objects.filter(wallet=wallet, day__lt=day)
+        .values("type")
+        .annotate(sum=Sum("total"))
+        .values_list("type", "sum")
+    )
+    for type, amount in rollups:
+        _fold(totals, type, amount)
+
+    day_start = timezone.make_aware(datetime.combine(day, time.min))
+    tail = Transaction.objects.filter(
+        wallet=wallet, status="completed", created_at__gte=day_start, created_at__lte=at
+    ).values_list("type", "amount")
+    for type, amount in tail:
+        _fold(totals, type, amount)
+    for _, fields in archived_rows("wallet.transaction", day=day):
+        if (fields["wallet"] == wallet.pk and fields["status"] == "completed"
+                and day_start <= fields["created_at"] <= at):
+            _fold(totals, fields["type"], Decimal(fields["amount"]))
+
+    return totals
+
+
+def daily_flows(wallet, start, end):
+    """Return the rollup rows of `wallet` for days in ``[start, end]`` as dicts."""
+    return list(
+        WalletDailyRollup.objects.filter(wallet=wallet, day__gte=start, day__lte=end)
+        .order_by("day", "type")
+        .values("day", "type", "total", "count")
+    )
+
+
+def rebuild_rollups(*, batch_size: int = 1000) -> int:
+    """Recompute every rollup row from the `Transaction` log and its archive. Returns rows written."""
+    grouped = (
+        Transaction.objects.filter(status="completed", wallet__isnull=False)
+        .annotate(day=TruncDate("created_at"))
+        .values("wallet_id", "day", "type")
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by()
+    )
+    archived = {}
+    for _, fields in archived_rows("wallet.transaction"):
+        if fields["status"] != "completed" or fields["wallet"] is None:
+            continue
+        key = (fields["wallet"], timezone.localdate(fields["created_at"]), fields["type"])
+        total, count = archived.get(key, (ZERO, 0))
+        archived[key] = (total + Decimal(fields["amount"]), count + 1)
+
+    written = 0
+    with transaction.atomic():
+        WalletDailyRollup.objects.all().delete()
+        batch = []
+        for row in grouped.iterator(chunk_size=batch_size):
+            total, count = archived.pop((row["wallet_id"], row["day"], row["type"]), (ZERO, 0))
+            row["total"] += total
+            row["count"] += count
+            batch.append(WalletDailyRollup(**row))
+            if len(batch) >= batch_size:
+                WalletDailyRollup.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        for (wallet_id, day, type), (total, count) in archived.items():
+            batch.append(WalletDailyRollup(wallet_id=wallet_id, day=day, type=type, total=total, count=count))
+            if len(batch) >= batch_size:
+                WalletDailyRollup.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        WalletDailyRollup.objects.bulk_create(batch)
+        written += len(batch)
+    return written
@@ -1,6 +1,6 @@
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
-from .models import Wallet, Currency
+from .models import Wallet, Currency, Transaction
 
 
 class WalletSerializer(ModelSerializer):
@@ -29,8 +29,37 @@ class WalletSerializer(ModelSerializer):
             "user",
         ]
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Sharded wallets hold recent credits in their shards until compaction.
+        if instance.shard_count:
+            totals = instance.total_balances()
+            for field in ("balance", "available_balance"):
+                data[field] = self.fields[field].to_representation(totals[field])
+        return data
+
 
 class CurrencySerializer(ModelSerializer):
     class Meta:
         model = Currency
         fields = "__all__"
+
+
+class TransactionSerializer(ModelSerializer):
+    escrow = serializers.SlugRelatedField(slug_field="uuid", read_only=True)
+
+    class Meta:
+        model = Transaction
+        fields = [
+            "uuid",
+            "reference",
+            "type",
+            "status",
+            "amount",
+            "escrow",
+            "related_object_type",
+            "related_object_id",
+            "metadata",
+            "created_at",
+        ]
+        read_only_fields = fields
@@ -1,3 +1,52 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from .models import EscrowAccount, Transaction, Wallet
+from .utility import fund_escrow_from_wallet, settle_escrow_release
+
+
+class SettleEscrowReleaseTests(TestCase):
+    """Releasing escrow and paying out in one settlement must not depend on funds already in the wallet."""
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        client_user = User.objects.create_user(
+            email="client@example.com", password="pass1234", full_name="Client", phone="0200000001", is_client=True
+        )
+        freelancer = User.objects.create_user(
+            email="freelancer@example.com", password="pass1234", full_name="Freelancer", phone="0200000002",
+            is_freelancer=True,
+        )
+        cls.client_wallet, _ = Wallet.objects.get_or_create(user=client_user)
+        cls.freelancer_wallet, _ = Wallet.objects.get_or_create(user=freelancer)
+
+    def setUp(self):
+        self.escrow = EscrowAccount.objects.create(reference="contract-1")
+        Transaction.objects.create_transaction(wallet=self.client_wallet, amount=Decimal("100"), type="deposit")
+        fund_escrow_from_wallet(self.client_wallet, self.escrow, Decimal("100"))
+
+    def test_fee_and_payout_from_zero_balance(self):
+        self.assertEqual(self.freelancer_wallet.available_balance, Decimal("0"))
+
+        txs = settle_escrow_release(
+            self.escrow, self.freelancer_wallet, Decimal("100"), fee=Decimal("10"), payout=Decimal("90"),
+            idempotency_key="settle-1",
+        )
+
+        self.assertEqual([tx.type for tx in txs], ["escrow_settlement", "fee", "payout"])
+        self.freelancer_wallet.refresh_from_db()
+        self.escrow.refresh_from_db()
+        self.assertEqual(self.freelancer_wallet.balance, Decimal("0"))
+        self.assertEqual(self.freelancer_wallet.available_balance, Decimal("0"))
+        self.assertEqual(self.escrow.balance, Decimal("0"))
+
+    def test_release_without_spending_stays_unavailable(self):
+        txs = settle_escrow_release(self.escrow, self.freelancer_wallet, Decimal("40"))
+
+        self.assertEqual([tx.type for tx in txs], ["escrow_release"])
+        self.freelancer_wallet.refresh_from_db()
+        self.assertEqual(self.freelancer_wallet.balance, Decimal("40"))
+        self.assertEqual(self.freelancer_wallet.available_balance, Decimal("0"))
@@ -1,4 +1,4 @@
-from .views import WalletView, CurrencyViewSet
+from .views import WalletView, CurrencyViewSet, TransactionHistoryView, TransactionDetailView, WalletBalanceAsOfView, WalletStatementView, TransactionExportView
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
@@ -7,6 +7,12 @@ router.register("currencies", CurrencyViewSet, basename="currency")
 
 urlpatterns = [
     path('wallet/', WalletView.as_view(), name='wallet'),
+    path('transactions/', TransactionHistoryView.as_view(), name='wallet-transactions'),
+    path('transactions/export/', TransactionExportView.as_view(), name='wallet-transactions-export'),
+    path('transactions/<uuid:uuid>/', TransactionDetailView.as_view(), name='wallet-transaction-detail'),
+    path('escrows/<uuid:escrow_uuid>/transactions/export/', TransactionExportView.as_view(), name='escrow-transactions-export'),
+    path('balance-as-of/', WalletBalanceAsOfView.as_view(), name='wallet-balance-as-of'),
+    path('statement/', WalletStatementView.as_view(), name='wallet-statement'),
     path("", include(router.urls)),
 
 ]
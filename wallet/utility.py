@@ -3,24 +3,66 @@ from decimal import Decimal
 from .models import Transaction, EscrowAccount, Wallet
 
 
-def fund_escrow_from_wallet(client_wallet: Wallet, escrow: EscrowAccount, amount: Decimal, *, reference: str = None, metadata: dict = None):
+def fund_escrow_from_wallet(client_wallet: Wallet, escrow: EscrowAccount, amount: Decimal, *, reference: str = None, metadata: dict = None, idempotency_key: str = None):
     """Convenience service to place a hold on client wallet and credit an escrow account.
 
     Creates a single `escrow_hold` transaction record and executes the movements
-    atomically using the TransactionManager.
+    atomically using the TransactionManager. Passing the same `idempotency_key`
+    again returns the original transaction without moving funds twice.
     """
     metadata = metadata or {}
     metadata.update({"action": "fund_escrow"})
-    return Transaction.objects.create_transaction(wallet=client_wallet, escrow=escrow, amount=amount, type="escrow_hold", metadata={"reference": reference, **(metadata or {})})
+    return Transaction.objects.create_transaction(wallet=client_wallet, escrow=escrow, amount=amount, type="escrow_hold", metadata={"reference": reference, **(metadata or {})}, idempotency_key=idempotency_key)
 
 
-def release_escrow_to_wallet(escrow: EscrowAccount, recipient_wallet: Wallet, amount: Decimal, *, reference: str = None, metadata: dict = None):
+def release_escrow_to_wallet(escrow: EscrowAccount, recipient_wallet: Wallet, amount: Decimal, *, reference: str = None, metadata: dict = None, idempotency_key: str = None):
     metadata = metadata or {}
     metadata.update({"action": "release_escrow"})
-    return Transaction.objects.create_transaction(wallet=recipient_wallet, escrow=escrow, amount=amount, type="escrow_release", metadata={"reference": reference, **(metadata or {})})
+    return Transaction.objects.create_transaction(wallet=recipient_wallet, escrow=escrow, amount=amount, type="escrow_release", metadata={"reference": reference, **(metadata or {})}, idempotency_key=idempotency_key)
 
 
-def refund_escrow_to_client(escrow: EscrowAccount, client_wallet: Wallet, amount: Decimal, *, reference: str = None, metadata: dict = None):
+def refund_escrow_to_client(escrow: EscrowAccount, client_wallet: Wallet, amount: Decimal, *, reference: str = None, metadata: dict = None, idempotency_key: str = None):
     metadata = metadata or {}
     metadata.update({"action": "refund"})
-    return Transaction.objects.create_transaction(wallet=client_wallet, escrow=escrow, amount=amount, type="refund", metadata={"reference": reference, **(metadata or {})})
+    return Transaction.objects.create_transaction(wallet=client_wallet, escrow=escrow, amount=amount, type="refund", metadata={"reference": reference, **(metadata or {})}, idempotency_key=idempotency_key)
+
+
+def settle_escrow_release(escrow: EscrowAccount, recipient_wallet: Wallet, amount: Decimal, *, fee: Decimal = None, payout: Decimal = None, reference: str = None, metadata: dict = None, idempotency_key: str = None):
+    """Release escrow to a wallet, charge the platform fee and pay out, as one batched posting.
+
+    Builds the release, optional `fee` and optional `payout` legs and applies
+    them with `TransactionManager.post_batch`, so the whole settlement
+    costs one UPDATE per account plus a single insert of the ledger rows.
+    With `idempotency_key`, each leg gets a derived key so a retried settlement
+    skips legs that were already posted. When a fee or payout follows, the
+    release is posted as `escrow_settlement`, which also credits
+    `available_balance`, since those legs spend available funds.
+    """
+    metadata = {**(metadata or {}), "action": "settle_release"}
+    release_type = "escrow_settlement" if fee or payout else "escrow_release"
+    legs = [{"wallet": recipient_wallet, "escrow": escrow, "amount": amount, "type": release_type, "metadata": {**metadata, "reference": reference}, "idempotency_key": idempotency_key and f"{idempotency_key}:release"}]
+    if fee:
+        legs.append({"wallet": recipient_wallet, "amount": fee, "type": "fee", "metadata": {**metadata, "reference": reference and f"{reference}-fee"}, "idempotency_key": idempotency_key and f"{idempotency_key}:fee"})
+    if payout:
+        legs.append({"wallet": recipient_wallet, "amount": payout, "type": "payout", "metadata": {**metadata, "reference": reference and f"{reference}-payout"}, "idempotency_key": idempotency_key and f"{idempotency_key}:payout"})
+    return Transaction.objects.post_batch(legs)
+
+
+def split_payment(source_wallet: Wallet, shares, *, reference: str = None, metadata: dict = None, idempotency_key: str = None):
+    """Split a payment from one wallet across several wallets (e.g. an agency paying its team).
+
+    `shares` is a list of ``(wallet, amount)`` pairs. All transfers are posted
+    atomically by `TransactionManager.transfer_batch`; either every member is
+    paid or nothing moves.
+    """
+    metadata = {**(metadata or {}), "action": "split_payment"}
+    return Transaction.objects.transfer_batch([
+        {
+            "source": source_wallet,
+            "destination": wallet,
+            "amount": amount,
+            "metadata": {**metadata, "reference": reference and f"{reference}-{index}"},
+            "idempotency_key": idempotency_key and f"{idempotency_key}:{index}",
+        }
+        for index, (wallet, amount) in enumerate(shares)
+    ])
@@ -1,11 +1,22 @@
-from rest_framework.exceptions import ValidationError
+from datetime import datetime, time
+
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status, viewsets, permissions
+from rest_framework import generics, status, viewsets, permissions
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.throttling import UserRateThrottle
-from .models import Wallet, Currency
-from .serializers import CurrencySerializer,WalletSerializer
+from archive.archiver import archived_through, get_with_archive
+
+from .exports import FORMATS, archived_export_rows, stream_export
+from .models import Wallet, Currency, Transaction, EscrowAccount
+from .pagination import KeysetPagination
+from .rollups import balance_as_of, daily_flows
+from .serializers import CurrencySerializer, TransactionSerializer, WalletSerializer
 
 import logging
 
@@ -52,6 +63,169 @@ class WalletView(APIView):
             )
 
 
+class TransactionHistoryView(generics.ListAPIView):
+    """
+    List the authenticated user's wallet transactions, newest first.
+
+    - Cursor (keyset) pagination: follow the `next` link; `?page_size=` up to 200.
+    - Filters: `?type=<transaction type>` and `?status=<status>`.
+    - Archived transactions are not listed. `archived_through` is the last day
+      that may have some (null if none); they are still served by uuid and in exports.
+    """
+    serializer_class = TransactionSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [UserRateThrottle]
+    pagination_class = KeysetPagination
+    filterset_fields = ["type", "status"]
+
+    def get_queryset(self):
+        return Transaction.objects.filter(wallet__user=self.request.user).select_related("escrow")
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data["archived_through"] = archived_through("wallet.transaction")
+        return response
+
+
+class TransactionDetailView(generics.RetrieveAPIView):
+    """
+    Retrieve one of the authenticated user's wallet transactions by uuid.
+
+    Transactions moved to cold storage are served transparently from the archive.
+    """
+    serializer_class = TransactionSerializer
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [UserRateThrottle]
+
+    def get_object(self):
+        try:
+            tx = get_with_archive(Transaction.objects.all(), natural_key_field="uuid", uuid=self.kwargs["uuid"])
+        except Transaction.DoesNotExist:
+            raise NotFound("Transaction not found")
+        if tx.wallet_id is None or tx.wallet_id != getattr(getattr(self.request.user, "wallet", None), "pk", None):
+            raise NotFound("Transaction not found")
+        return tx
+
+
+class WalletBalanceAsOfView(APIView):
+    """
+    Return the authenticated user's wallet balance at a past instant.
+
+    GET:
+    - Query: ?at=<ISO datetime> (defaults to now)
+    - Computed from daily rollups plus the same-day tail of transactions.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [UserRateThrottle]
+
+    def get(self, request):
+        at = timezone.now()
+        if request.query_params.get("at"):
+            try:
+                at = parse_datetime(request.query_params["at"])
+            except ValueError:  # well formed but impossible, e.g. 2024-02-30
+                at = None
+            if at is None:
+                return Response({'error': 'Invalid "at" datetime'}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(at):
+                at = timezone.make_aware(at)
+        try:
+            wallet = request.user.wallet
+        except Wallet.DoesNotExist:
+            return Response({'error': 'Wallet not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"at": at, **balance_as_of(wallet, at)}, status=status.HTTP_200_OK)
+
+
+class WalletStatementView(APIView):
+    """
+    Statement for the authenticated user's wallet over a date range.
+
+    GET:
+    - Query: ?start=<YYYY-MM-DD>&end=<YYYY-MM-DD>
+    - Returns opening/closing balances and per-day inflows/outflows by type.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [UserRateThrottle]
+
+    def get(self, request):
+        try:
+            start = parse_date(request.query_params.get("start", ""))
+            end = parse_date(request.query_params.get("end", ""))
+        except ValueError:  # well formed but impossible, e.g. 2024-02-30
+            start = end = None
+        if not start or not end or start > end:
+            return Response({'error': 'Valid "start" and "end" dates are required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            wallet = request.user.wallet
+        except Wallet.DoesNotExist:
+            return Response({'error': 'Wallet not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        opening_at = timezone.make_aware(datetime.combine(start, time.min))
+        closing_at = timezone.make_aware(datetime.combine(end, time.max))
+        return Response({
+            "start": start,
+            "end": end,
+            "opening": balance_as_of(wallet, opening_at),
+            "closing": balance_as_of(wallet, closing_at),
+            "days": daily_flows(wallet, start, end),
+        }, status=status.HTTP_200_OK)
+
+
+class TransactionExportView(APIView):
+    """
+    Stream a full transaction export for the user's wallet, or for an escrow (staff only).
+
+    GET:
+    - Query: ?file_format=csv|jsonl (default csv), ?gzip=1, ?start=<YYYY-MM-DD>, ?end=<YYYY-MM-DD>
+    - Rows are streamed from a database cursor, so exports run in constant memory.
+    - Archived transactions are included, read back from their archive segments.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [UserRateThrottle]
+
+    def get(self, request, escrow_uuid=None):
+        file_format = request.query_params.get("file_format", "csv")
+        if file_format not in FORMATS:
+            return Response({'error': f'file_format must be one of {", ".join(FORMATS)}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if escrow_uuid is not None:
+            if not request.user.is_staff:
+                return Response({'error': 'Only staff can export escrow transactions'}, status=status.HTTP_403_FORBIDDEN)
+            escrow = get_object_or_404(EscrowAccount, uuid=escrow_uuid)
+            queryset = Transaction.objects.filter(escrow=escrow)
+            account = {"escrow_id": escrow.pk}
+            name = f"escrow-{escrow.uuid}"
+        else:
+            try:
+                wallet = request.user.wallet
+            except Wallet.DoesNotExist:
+                return Response({'error': 'Wallet not found'}, status=status.HTTP_404_NOT_FOUND)
+            queryset = Transaction.objects.filter(wallet=wallet)
+            account = {"wallet_id": wallet.pk}
+            name = f"wallet-{wallet.pk}"
+
+        bounds = {}
+        for param, lookup, bound in (("start", "created_at__gte", time.min), ("end", "created_at__lte", time.max)):
+            if request.query_params.get(param):
+                try:
+                    day = parse_date(request.query_params[param])
+                except ValueError:  # well formed but impossible, e.g. 2024-02-30
+                    day = None
+                if day is None:
+                    return Response({'error': f'Invalid "{param}" date'}, status=status.HTTP_400_BAD_REQUEST)
+                bounds[param] = timezone.make_aware(datetime.combine(day, bound))
+                queryset = queryset.filter(**{lookup: bounds[param]})
+
+        compress = request.query_params.get("gzip") in ("1", "true")
+        filename = f"{name}-transactions.{file_format}" + (".gz" if compress else "")
+        response = StreamingHttpResponse(
+            stream_export(queryset, file_format, compress=compress, archived=archived_export_rows(**account, **bounds)),
+            content_type="application/gzip" if compress else FORMATS[file_format],
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
 class IsAdminUser(permissions.BasePermission):
     """Allow access only to admin (staff) users."""
 